@@ -0,0 +1 @@
+"""Benchmarks of the hot paths, run with ``python -m benchmarks --help``"""
@@ -0,0 +1,78 @@
+import argparse
+import fnmatch
+import sys
+from pathlib import Path
+
+from .harness import run_benchmark, save_results, load_results, compare
+from .suites import SUITES, YEARS, YEARS_QUICK
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the Clock, indicators & simulation on synthetic data",
+    )
+    p.add_argument("-s", "--suite", choices=sorted(SUITES), action="append")
+    p.add_argument("-k", "--filter", default="*", help="glob over benchmark names")
+    p.add_argument("--quick", action="store_true", help="only run the 1 year cases")
+    p.add_argument("--no-memory", action="store_true", help="skip peak memory")
+    p.add_argument("-o", "--output", default="bench_output.json")
+    p.add_argument("--baseline", default=str(BASELINE))
+    p.add_argument(
+        "--update-baseline", action="store_true", help="store results as baseline"
+    )
+    p.add_argument(
+        "--no-compare", action="store_true", help="don't compare with the baseline"
+    )
+    p.add_argument("--tolerance", type=float, default=0.25)
+    p.add_argument("--memory-tolerance", type=float, default=0.25)
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    years = YEARS_QUICK if args.quick else YEARS
+    # Only the selected benchmarks are built, with their data
+    selected = [
+        lb
+        for suite in args.suite or sorted(SUITES)
+        for lb in SUITES[suite](years)
+        if fnmatch.fnmatch(lb.name, args.filter)
+    ]
+
+    results = []
+    for lb in selected:
+        r = run_benchmark(lb.make(), memory=not args.no_memory)
+        results.append(r)
+        print(
+            f"{r.name:<40} {r.seconds * 1e3:>10.2f}ms {r.throughput:>14,.0f} bars/s "
+            f"{r.peak_bytes / 2**20:>9.1f}MiB"
+        )
+    save_results(results, args.output)
+
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+    if args.no_compare:
+        return 0
+    if not Path(args.baseline).exists():
+        print(
+            f"No baseline at {args.baseline}, run with --update-baseline to create "
+            "it or --no-compare to skip the comparison",
+            file=sys.stderr,
+        )
+        return 1
+
+    regressions = compare(
+        results, load_results(args.baseline), args.tolerance, args.memory_tolerance
+    )
+    for reg in regressions:
+        print(f"REGRESSION {reg}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""A minimal benchmark harness: times a benchmark, measures its peak memory and
+compares the results against a stored baseline
+"""
+
+import json
+import platform
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, NamedTuple, Union
+
+
+@dataclass
+class Benchmark:
+    """A single benchmark
+
+    Args:
+        name(str): unique name, e.g "clock.1m.5y"
+        setup(Callable): builds the input of ``run``, not timed. Called before
+            every repeat so caches (e.g ``PriceAction.active_smas``) start cold
+        run(Callable): the timed function, receives the output of ``setup``
+        units(int): amount of units (bars) processed by a single ``run``, used to
+            calculate the throughput
+        repeat(int): amount of timed repeats, the fastest one is reported
+    """
+
+    name: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+    units: int
+    repeat: int = 3
+
+
+class LazyBenchmark(NamedTuple):
+    """A benchmark that is only built (with its data) once it's selected"""
+
+    name: str
+    make: Callable[[], Benchmark]
+
+
+class BenchResult(NamedTuple):
+    name: str
+    seconds: float  # fastest repeat
+    throughput: float  # units per second
+    peak_bytes: int  # peak traced memory of a single run
+    units: int
+
+
+class Regression(NamedTuple):
+    name: str
+    metric: str  # "seconds" / "peak_bytes"
+    baseline: float
+    current: float
+
+    def __str__(self) -> str:
+        ratio = self.current / self.baseline if self.baseline else float("inf")
+        return (
+            f"{self.name}: {self.metric} regressed {ratio:.2f}x "
+            f"({self.baseline:.4g} -> {self.current:.4g})"
+        )
+
+
+def run_benchmark(b: Benchmark, memory: bool = True) -> BenchResult:
+    """Time |b| ``repeat`` times, then (optionally) run it once more under
+    ``tracemalloc`` to measure the peak memory. Tracing slows the run down, so the
+    timing is never taken from the traced run
+    """
+    best = float("inf")
+    for _ in range(b.repeat):
+        state = b.setup()
+        t0 = time.perf_counter()
+        b.run(state)
+        best = min(best, time.perf_counter() - t0)
+
+    peak = 0
+    if memory:
+        state = b.setup()
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            b.run(state)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    throughput = b.units / best if best > 0 else float("inf")
+    return BenchResult(b.name, best, throughput, peak, b.units)
+
+
+def save_results(results: list[BenchResult], path: Union[str, Path]):
+    data = {
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "results": {r.name: r._asdict() for r in results},
+    }
+    Path(path).write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def load_results(path: Union[str, Path]) -> dict[str, BenchResult]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {k: BenchResult(**v) for k, v in data["results"].items()}
+
+
+def compare(
+    results: list[BenchResult],
+    baseline: dict[str, BenchResult],
+    tolerance: float = 0.25,
+    memory_tolerance: float = 0.25,
+) -> list[Regression]:
+    """Find the benchmarks that got slower (or use more memory) than |baseline| by
+    more than |tolerance| (0.25 -> 25%). Benchmarks missing from the baseline are
+    ignored
+    """
+    ret = []
+    for r in results:
+        base = baseline.get(r.name)
+        if base is None:
+            continue
+        if r.seconds > base.seconds * (1 + tolerance):
+            ret.append(Regression(r.name, "seconds", base.seconds, r.seconds))
+        if base.peak_bytes and r.peak_bytes > base.peak_bytes * (1 + memory_tolerance):
+            ret.append(Regression(r.name, "peak_bytes", base.peak_bytes, r.peak_bytes))
+    return ret
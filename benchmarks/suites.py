@@ -0,0 +1,187 @@
+"""The benchmarks of the ``Clock``, the indicators and the simulation.
+Everything runs on synthetic data, no network access is needed
+"""
+
+from collections.abc import Callable
+from datetime import datetime
+from functools import lru_cache, partial
+from typing import Any
+
+from src.backtests.core import Clock, PriceAction, SyntheticClient
+from src.backtests.core.clock import get_schedule
+from src.backtests.trader import ExecutionModel
+
+from .harness import Benchmark, LazyBenchmark
+
+INTERVALS = ["1m", "5m", "10m", "30m", "1h", "1d", "7d", "1w"]
+YEARS = (1, 5, 20)
+YEARS_QUICK = (1,)
+SMA_LENGTHS = (10, 50, 200)
+SMA_CROSSES = ((10, 50), (50, 200))
+
+_END = datetime(2025, 1, 1)
+# Benchmarks that process more units than this are only timed once
+_LARGE = 500_000
+
+
+@lru_cache(maxsize=2)
+def synthetic_price_action(years: int, interval: str = "1m") -> PriceAction:
+    """|years| of synthetic bars on the ``Clock`` schedule, shared by the
+    benchmarks of the same data (never modify it, copy it in ``setup``)
+    """
+    start = _END.replace(year=_END.year - years)
+    return SyntheticClient(seed=0).get_price_action("SYNTH", start, _END, interval)
+
+
+def _repeat(units: int) -> int:
+    return 1 if units > _LARGE else 3
+
+
+def _copy(base: PriceAction) -> PriceAction:
+    # A fresh PriceAction so the indicators are never cached
+    return PriceAction(base.ticker, base.data.copy(), base.start, base.end, None)
+
+
+def _schedule(name: str, start: datetime) -> Benchmark:
+    return Benchmark(
+        name,
+        # Cold schedules, as before they were cached
+        setup=get_schedule.cache_clear,
+        run=lambda _: Clock(start, _END, "1d"),
+        units=len(Clock(start, _END, "1d")),
+    )
+
+
+def _bars(name: str, start: datetime, interval: str) -> Benchmark:
+    units = len(Clock(start, _END, interval))
+    return Benchmark(
+        name,
+        setup=lambda: Clock(start, _END, interval),
+        run=lambda c: sum(1 for _ in c),
+        units=units,
+        repeat=_repeat(units),
+    )
+
+
+def clock_benchmarks(years: tuple[int, ...] = YEARS) -> list[LazyBenchmark]:
+    ret = []
+    for y in years:
+        start = _END.replace(year=_END.year - y)
+        name = f"clock.schedule.{y}y"
+        ret.append(LazyBenchmark(name, partial(_schedule, name, start)))
+        for i in INTERVALS:
+            name = f"clock.bars.{i}.{y}y"
+            ret.append(LazyBenchmark(name, partial(_bars, name, start, i)))
+    return ret
+
+
+def _sma_cross(pa: PriceAction, cross: tuple[int, int]):
+    return pa.get_sma_cross(*cross)
+
+
+def _indicator(name: str, years: int, fn: Callable[[PriceAction], Any]) -> Benchmark:
+    base = synthetic_price_action(years)
+    return Benchmark(name, setup=lambda: _copy(base), run=fn, units=len(base.data))
+
+
+def indicator_benchmarks(years: tuple[int, ...] = YEARS) -> list[LazyBenchmark]:
+    ret = []
+    for y in years:
+        for length in SMA_LENGTHS:
+            name = f"indicators.sma_{length}.{y}y"
+            fn = partial(PriceAction.get_sma, period=length)
+            ret.append(LazyBenchmark(name, partial(_indicator, name, y, fn)))
+        for cross in SMA_CROSSES:
+            name = f"indicators.sma_cross_{cross[0]}_{cross[1]}.{y}y"
+            fn = partial(_sma_cross, cross=cross)
+            ret.append(LazyBenchmark(name, partial(_indicator, name, y, fn)))
+    return ret
+
+
+def smas_cross_loop(pa: PriceAction, cash: float = 1000.0) -> float:
+    """The bar by bar simulation of ``sketch.smas_cross``, on an offline
+    ``PriceAction``. Kept as the reference point of the vectorized simulation
+    """
+    pa.calc_return("Daily_Return")
+    cross = pa.get_sma_cross(50, 100)
+    d = pa.data
+    d["Holdings"] = 0.0
+    d["Cash"] = cash
+    d["Total"] = cash
+    col_hold = d.columns.get_loc("Holdings")
+    col_cash = d.columns.get_loc("Cash")
+    col_ret = d.columns.get_loc("Daily_Return")
+    col_total = d.columns.get_loc("Total")
+    for i in range(1, len(d)):
+        prev = i - 1
+        sig = cross.position.iat[i]
+        prev_cash = d.iat[prev, col_cash]
+        prev_hold = d.iat[prev, col_hold]
+        day_ret = d.iat[i, col_ret]
+        if sig == 1:
+            d.iat[i, col_cash] = 0.0
+            d.iat[i, col_hold] = prev_cash * (1 + day_ret)
+        elif sig == -1:
+            d.iat[i, col_cash] = prev_hold
+            d.iat[i, col_hold] = 0.0
+        else:
+            d.iat[i, col_cash] = prev_cash
+            d.iat[i, col_hold] = prev_hold * (1 + day_ret)
+        d.iat[i, col_total] = d.iat[i, col_hold] + d.iat[i, col_cash]
+    return d.iat[-1, col_total]
+
+
+def smas_cross_vectorized(pa: PriceAction, cash: float = 1000.0) -> float:
+    cross = pa.get_sma_cross(50, 100)
+    sim = ExecutionModel(fill_at="close").simulate(pa, cross.position, cash)
+    return sim.equity.iat[-1]
+
+
+def _simulation(
+    name: str, years: int, interval: str, fn: Callable[[PriceAction], Any]
+) -> Benchmark:
+    base = synthetic_price_action(years, interval)
+    n = len(base.data)
+    repeat = _repeat(n) if fn is smas_cross_loop else 3
+    return Benchmark(name, setup=lambda: _copy(base), run=fn, units=n, repeat=repeat)
+
+
+def simulation_benchmarks(years: tuple[int, ...] = YEARS) -> list[LazyBenchmark]:
+    ret = []
+    for y in years:
+        for tag in ("1d", "1m"):
+            if tag == "1d":  # The loop is way too slow for minute bars
+                name = f"simulation.loop.{tag}.{y}y"
+                make = partial(_simulation, name, y, tag, smas_cross_loop)
+                ret.append(LazyBenchmark(name, make))
+            name = f"simulation.vectorized.{tag}.{y}y"
+            make = partial(_simulation, name, y, tag, smas_cross_vectorized)
+            ret.append(LazyBenchmark(name, make))
+    return ret
+
+
+def _synthetic(name: str, start: datetime, interval: str) -> Benchmark:
+    return Benchmark(
+        name,
+        setup=lambda: SyntheticClient(seed=0),
+        run=lambda c: c.get_price_action("SYNTH", start, _END, interval),
+        units=len(Clock(start, _END, interval)),
+    )
+
+
+def synthetic_benchmarks(years: tuple[int, ...] = YEARS) -> list[LazyBenchmark]:
+    ret = []
+    for y in years:
+        start = _END.replace(year=_END.year - y)
+        for i in ("1m", "1d"):
+            name = f"synthetic.{i}.{y}y"
+            ret.append(LazyBenchmark(name, partial(_synthetic, name, start, i)))
+    return ret
+
+
+SUITES = {
+    "clock": clock_benchmarks,
+    "indicators": indicator_benchmarks,
+    "simulation": simulation_benchmarks,
+    "synthetic": synthetic_benchmarks,
+}
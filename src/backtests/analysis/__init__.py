@@ -0,0 +1,35 @@
+from typing import TYPE_CHECKING
+
+from ..lazy import lazy_exports
+
+_EXPORTS = {
+    "robustness": [
+        "MonteCarlo",
+        "MonteCarloResult",
+        "block_bootstrap",
+        "shuffle",
+        "equity_curves",
+        "drawdowns",
+        "summarize",
+        "perturb_params",
+        "run_perturbed",
+    ],
+    "metrics": ["Metrics", "StreamingMetrics", "compute_metrics"],
+    "results": ["TradeLog", "BacktestResult", "ResultsStore"],
+}
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .robustness import (
+        MonteCarlo,
+        MonteCarloResult,
+        block_bootstrap,
+        shuffle,
+        equity_curves,
+        drawdowns,
+        summarize,
+        perturb_params,
+        run_perturbed,
+    )
+    from .metrics import Metrics, StreamingMetrics, compute_metrics
+    from .results import TradeLog, BacktestResult, ResultsStore
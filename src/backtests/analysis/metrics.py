@@ -0,0 +1,204 @@
+"""Vectorized performance metrics of equity curves.
+
+The functions work on a single equity curve (1-D) or on many of them at once
+(2-D, one curve per row). ``StreamingMetrics`` computes the same metrics
+incrementally, while a run is still streaming bars.
+"""
+
+import math
+import numpy as np
+from dataclasses import dataclass, asdict, field
+from typing import Optional
+
+PERIODS_PER_YEAR = 252
+
+
+@dataclass(frozen=True)
+class Metrics:
+    cagr: float
+    sharpe: float
+    sortino: float
+    max_drawdown: float  # positive fraction (0.2 -> -20%)
+    max_drawdown_duration: int  # in bars
+    exposure: float  # fraction of the bars in the market
+    turnover: float  # annualized traded notional / average equity
+
+    def as_dict(self) -> dict[str, float]:
+        return asdict(self)
+
+
+def returns(equity: np.ndarray) -> np.ndarray:
+    """Per bar returns of |equity| (one less bar than |equity|)"""
+    equity = np.asarray(equity, dtype=np.float64)
+    return equity[..., 1:] / equity[..., :-1] - 1
+
+
+def cagr(equity: np.ndarray, periods_per_year: int = PERIODS_PER_YEAR) -> np.ndarray:
+    equity = np.asarray(equity, dtype=np.float64)
+    n = equity.shape[-1] - 1
+    if n <= 0:
+        return np.zeros(equity.shape[:-1])
+    return (equity[..., -1] / equity[..., 0]) ** (periods_per_year / n) - 1
+
+
+def sharpe(equity: np.ndarray, periods_per_year: int = PERIODS_PER_YEAR) -> np.ndarray:
+    r = returns(equity)
+    std = r.std(axis=-1, ddof=1) if r.shape[-1] > 1 else np.zeros(r.shape[:-1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = r.mean(axis=-1) / std * math.sqrt(periods_per_year)
+    return np.nan_to_num(ret, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def sortino(equity: np.ndarray, periods_per_year: int = PERIODS_PER_YEAR) -> np.ndarray:
+    r = returns(equity)
+    downside = np.sqrt((np.minimum(r, 0) ** 2).mean(axis=-1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = r.mean(axis=-1) / downside * math.sqrt(periods_per_year)
+    return np.nan_to_num(ret, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def max_drawdown(equity: np.ndarray) -> np.ndarray:
+    equity = np.asarray(equity, dtype=np.float64)
+    peak = np.maximum.accumulate(equity, axis=-1)
+    return (1 - equity / peak).max(axis=-1)
+
+
+def max_drawdown_duration(equity: np.ndarray) -> np.ndarray:
+    """The longest amount of bars spent below a previous peak"""
+    equity = np.asarray(equity, dtype=np.float64)
+    peak = np.maximum.accumulate(equity, axis=-1)
+    bars = np.broadcast_to(np.arange(equity.shape[-1]), equity.shape)
+    last_peak = np.maximum.accumulate(np.where(equity >= peak, bars, 0), axis=-1)
+    return (bars - last_peak).max(axis=-1)
+
+
+def exposure(position: np.ndarray) -> np.ndarray:
+    """The fraction of bars with a non zero |position|"""
+    return (np.asarray(position) != 0).mean(axis=-1)
+
+
+def turnover(
+    traded: np.ndarray,
+    equity: np.ndarray,
+    periods_per_year: int = PERIODS_PER_YEAR,
+) -> np.ndarray:
+    """Annualized total |traded| notional divided by the average equity"""
+    equity = np.asarray(equity, dtype=np.float64)
+    n = equity.shape[-1]
+    total = np.abs(np.asarray(traded, dtype=np.float64)).sum(axis=-1)
+    return total / equity.mean(axis=-1) * periods_per_year / max(n, 1)
+
+
+def compute_metrics(
+    equity: np.ndarray,
+    position: Optional[np.ndarray] = None,
+    traded: Optional[np.ndarray] = None,
+    periods_per_year: int = PERIODS_PER_YEAR,
+) -> Metrics:
+    """Compute all the metrics of a single equity curve
+
+    Args:
+        equity(np.ndarray): portfolio value per bar
+        position(optional, np.ndarray): the position per bar, used for exposure
+        traded(optional, np.ndarray): the notional of every trade, for turnover
+        periods_per_year(int): amount of bars in a year, 252 for daily bars
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    return Metrics(
+        cagr=float(cagr(equity, periods_per_year)),
+        sharpe=float(sharpe(equity, periods_per_year)),
+        sortino=float(sortino(equity, periods_per_year)),
+        max_drawdown=float(max_drawdown(equity)) if len(equity) else 0.0,
+        max_drawdown_duration=int(max_drawdown_duration(equity)) if len(equity) else 0,
+        exposure=float(exposure(position)) if position is not None else 0.0,
+        turnover=(
+            float(turnover(traded, equity, periods_per_year))
+            if traded is not None
+            else 0.0
+        ),
+    )
+
+
+# pylint: disable=R0902
+@dataclass
+class StreamingMetrics:
+    """Compute ``Metrics`` incrementally, in O(1) per bar, while bars stream in.
+    ``metrics()`` can be called at any point and gives the same results as
+    ``compute_metrics`` over the bars seen so far
+    """
+
+    periods_per_year: int = PERIODS_PER_YEAR
+
+    bars: int = field(default=0, init=False)
+    first: float = field(default=math.nan, init=False)
+    last: float = field(default=math.nan, init=False)
+    # Welford's running mean & variance of the returns
+    _mean: float = field(default=0.0, init=False)
+    _m2: float = field(default=0.0, init=False)
+    _down_sq: float = field(default=0.0, init=False)
+    _equity_sum: float = field(default=0.0, init=False)
+    _peak: float = field(default=-math.inf, init=False)
+    _peak_bar: int = field(default=0, init=False)
+    _max_dd: float = field(default=0.0, init=False)
+    _max_dd_bars: int = field(default=0, init=False)
+    _exposed: int = field(default=0, init=False)
+    _traded: float = field(default=0.0, init=False)
+
+    def update(self, equity: float, position: float = 0.0, traded: float = 0.0):
+        """Register a new bar"""
+        if self.bars == 0:
+            self.first = equity
+        else:
+            r = equity / self.last - 1
+            n = self.bars  # amount of returns, including this one
+            delta = r - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (r - self._mean)
+            self._down_sq += min(r, 0.0) ** 2
+
+        if equity >= self._peak:
+            self._peak, self._peak_bar = equity, self.bars
+        else:
+            self._max_dd = max(self._max_dd, 1 - equity / self._peak)
+        self._max_dd_bars = max(self._max_dd_bars, self.bars - self._peak_bar)
+
+        self._exposed += position != 0
+        self._traded += abs(traded)
+        self._equity_sum += equity
+        self.last = equity
+        self.bars += 1
+
+    def update_many(
+        self,
+        equity: np.ndarray,
+        position: Optional[np.ndarray] = None,
+        traded: Optional[np.ndarray] = None,
+    ):
+        """Register a chunk of bars"""
+        n = len(equity)
+        position = np.zeros(n) if position is None else position
+        traded = np.zeros(n) if traded is None else traded
+        for e, p, t in zip(equity.tolist(), np.asarray(position).tolist(), traded):
+            self.update(e, p, t)
+
+    def metrics(self) -> Metrics:
+        n = self.bars - 1  # amount of returns
+        if n <= 0:
+            return Metrics(0.0, 0.0, 0.0, 0.0, 0, 0.0, 0.0)
+        std = math.sqrt(self._m2 / (n - 1)) if n > 1 else 0.0
+        downside = math.sqrt(self._down_sq / n)
+        ann = math.sqrt(self.periods_per_year)
+        return Metrics(
+            cagr=(self.last / self.first) ** (self.periods_per_year / n) - 1,
+            sharpe=self._mean / std * ann if std > 0 else 0.0,
+            sortino=self._mean / downside * ann if downside > 0 else 0.0,
+            max_drawdown=self._max_dd,
+            max_drawdown_duration=self._max_dd_bars,
+            exposure=self._exposed / self.bars,
+            turnover=(
+                self._traded
+                / (self._equity_sum / self.bars)
+                * self.periods_per_year
+                / self.bars
+            ),
+        )
@@ -0,0 +1,264 @@
+"""Compact, array backed backtest results and an on-disk store for them.
+
+A result is persisted as a single compressed NPZ file (or Parquet, if ``pyarrow``
+is installed), and the store keeps a flat metrics table of every result, so
+comparing thousands of sweep results is a single table read.
+"""
+
+import fcntl
+import json
+import os
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from ..core import PriceAction
+from ..exceptions import ResultNotFoundError
+from ..trader.execution import SimulationResult
+from ..utils import index_to_ns
+from .metrics import Metrics, compute_metrics, PERIODS_PER_YEAR
+
+TRADE_DTYPE = np.dtype(
+    [
+        ("bar", np.int64),
+        ("time", "datetime64[ns]"),
+        ("side", np.int8),
+        ("qty", np.float64),
+        ("price", np.float64),
+        ("commission", np.float64),
+    ]
+)
+
+METRICS_FILE = "metrics.csv"
+LOCK_FILE = ".lock"
+
+
+def _as_ns(index: pd.Index) -> np.ndarray:
+    """Convert a DatetimeIndex to int64 UTC nanoseconds"""
+    return index_to_ns(index).copy()
+
+
+@dataclass
+class TradeLog:
+    """Array backed trade log, one record (``TRADE_DTYPE``) per fill"""
+
+    records: np.ndarray = field(default_factory=lambda: np.empty(0, TRADE_DTYPE))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def notional(self) -> np.ndarray:
+        return self.records["qty"] * self.records["price"]
+
+    @classmethod
+    def from_simulation(cls, pa: PriceAction, sim: SimulationResult) -> "TradeLog":
+        fills = sim.fills
+        rec = np.empty(len(fills.index), TRADE_DTYPE)
+        rec["bar"] = fills.index
+        rec["time"] = _as_ns(pa.data.index)[fills.index].astype("datetime64[ns]")
+        rec["side"] = fills.side
+        # The n-th buy & the n-th sell both belong to the n-th round trip
+        trip = np.cumsum(fills.side == 1) - 1
+        rec["qty"] = sim.shares[trip] if len(trip) else []
+        rec["price"] = fills.price
+        rec["commission"] = sim.commissions
+        return cls(rec)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.records)
+
+
+@dataclass
+class BacktestResult:
+    """The outcome of a single backtest
+
+    Args:
+        name(str): unique name of the result inside a store
+        time(np.ndarray): int64 UTC nanoseconds of every bar
+        equity(np.ndarray): portfolio value per bar
+        position(np.ndarray): position per bar (e.g 1 long, 0 flat)
+        trades(TradeLog): every fill of the backtest
+        params(dict): the parameters of the run (ticker, strategy params, etc.),
+            must be JSON serializable
+        periods_per_year(int): amount of bars in a year
+    """
+
+    name: str
+    time: np.ndarray
+    equity: np.ndarray
+    position: np.ndarray
+    trades: TradeLog = field(default_factory=TradeLog)
+    params: dict[str, Any] = field(default_factory=dict)
+    periods_per_year: int = PERIODS_PER_YEAR
+
+    _metrics: Optional[Metrics] = field(default=None, init=False, repr=False)
+
+    @classmethod
+    def from_simulation(
+        cls,
+        name: str,
+        pa: PriceAction,
+        sim: SimulationResult,
+        params: Optional[dict[str, Any]] = None,
+        periods_per_year: int = PERIODS_PER_YEAR,
+    ) -> "BacktestResult":
+        """Build a result out of ``ExecutionModel.simulate``"""
+        n = len(sim.equity)
+        # +1 from the entry fill up to (excluding) the exit fill
+        delta = np.zeros(n + 1, dtype=np.int8)
+        np.add.at(delta, sim.fills.index, sim.fills.side)
+        position = np.cumsum(delta[:n], dtype=np.int8)
+        return cls(
+            name=name,
+            time=_as_ns(pa.data.index),
+            equity=sim.equity.to_numpy(dtype=np.float64),
+            position=position,
+            trades=TradeLog.from_simulation(pa, sim),
+            params={"ticker": pa.ticker, **(params or {})},
+            periods_per_year=periods_per_year,
+        )
+
+    @property
+    def metrics(self) -> Metrics:
+        if self._metrics is None:
+            self._metrics = compute_metrics(
+                self.equity,
+                self.position,
+                self.trades.notional,
+                self.periods_per_year,
+            )
+        return self._metrics
+
+    def equity_curve(self) -> pd.Series:
+        index = pd.DatetimeIndex(self.time.astype("datetime64[ns]"), tz="UTC")
+        return pd.Series(self.equity, index=index, name=self.name)
+
+    def _meta(self) -> str:
+        return json.dumps(
+            {
+                "name": self.name,
+                "params": self.params,
+                "periods_per_year": self.periods_per_year,
+            },
+            default=str,
+        )
+
+    def save_npz(self, path: Union[str, Path]):
+        np.savez_compressed(
+            path,
+            time=self.time,
+            equity=self.equity,
+            position=self.position,
+            trades=self.trades.records,
+            meta=np.array(self._meta()),
+        )
+
+    @classmethod
+    def load_npz(cls, path: Union[str, Path]) -> "BacktestResult":
+        with np.load(path, allow_pickle=False) as f:
+            meta = json.loads(str(f["meta"]))
+            return cls(
+                name=meta["name"],
+                time=f["time"],
+                equity=f["equity"],
+                position=f["position"],
+                trades=TradeLog(f["trades"]),
+                params=meta["params"],
+                periods_per_year=meta["periods_per_year"],
+            )
+
+    def save_parquet(self, directory: Union[str, Path]):
+        """Save as 2 Parquet files: ``bars.parquet`` & ``trades.parquet``.
+        Requires ``pyarrow``
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        bars = pd.DataFrame(
+            {"time": self.time, "equity": self.equity, "position": self.position}
+        )
+        bars.attrs["meta"] = self._meta()
+        bars.to_parquet(directory / "bars.parquet", index=False)
+        self.trades.to_frame().to_parquet(directory / "trades.parquet", index=False)
+
+    @classmethod
+    def load_parquet(cls, directory: Union[str, Path]) -> "BacktestResult":
+        directory = Path(directory)
+        bars = pd.read_parquet(directory / "bars.parquet")
+        trades = pd.read_parquet(directory / "trades.parquet")
+        meta = json.loads(bars.attrs["meta"])
+        rec = np.empty(len(trades), TRADE_DTYPE)
+        for name in TRADE_DTYPE.names or ():
+            rec[name] = trades[name].to_numpy()
+        return cls(
+            name=meta["name"],
+            time=bars["time"].to_numpy(dtype=np.int64),
+            equity=bars["equity"].to_numpy(dtype=np.float64),
+            position=bars["position"].to_numpy(dtype=np.int8),
+            trades=TradeLog(rec),
+            params=meta["params"],
+            periods_per_year=meta["periods_per_year"],
+        )
+
+
+@dataclass
+class ResultsStore:
+    """A directory of ``BacktestResult`` NPZ files plus a flat metrics table
+    (``metrics.csv``) that holds one row per result: its name, params & metrics
+
+    Args:
+        root(Union[str, Path]): the directory of the store, created if missing
+    """
+
+    root: Union[str, Path]
+
+    def __post_init__(self):
+        self.root = Path(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def _metrics_path(self) -> Path:
+        return Path(self.root) / METRICS_FILE
+
+    def _path(self, name: str) -> Path:
+        return Path(self.root) / f"{name}.npz"
+
+    def put(self, result: BacktestResult):
+        """Save |result| and append its metrics to the metrics table. Safe to call
+        from several processes (e.g distributed workers) at once
+        """
+        path = self._path(result.name)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        result.save_npz(tmp)
+        os.replace(tmp, path)
+        row = {
+            "name": result.name,
+            "params": json.dumps(result.params, sort_keys=True, default=str),
+            **result.metrics.as_dict(),
+        }
+        with open(Path(self.root) / LOCK_FILE, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            metrics = self._metrics_path
+            pd.DataFrame([row]).to_csv(
+                metrics, mode="a", header=not metrics.exists(), index=False
+            )
+
+    def get(self, name: str) -> BacktestResult:
+        path = self._path(name)
+        if not path.exists():
+            raise ResultNotFoundError(f"No result named: {name} in {self.root}")
+        return BacktestResult.load_npz(path)
+
+    def __contains__(self, name: str) -> bool:
+        return self._path(name).exists()
+
+    def summary(self) -> pd.DataFrame:
+        """The metrics of every result in the store, indexed by name. If a result
+        was stored more than once, the latest one is kept
+        """
+        if not self._metrics_path.exists():
+            return pd.DataFrame(columns=["params", *Metrics.__dataclass_fields__])
+        df = pd.read_csv(self._metrics_path)
+        return df.drop_duplicates("name", keep="last").set_index("name")
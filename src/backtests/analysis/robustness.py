@@ -0,0 +1,243 @@
+"""Monte Carlo / bootstrap robustness analysis of backtest results.
+
+All the resampled paths of a chunk are generated as a single 2-D array of shape
+(paths, bars), and the equity & drawdown of every path are computed at once with
+NumPy. Large runs are split into chunks whose size is bounded by a memory cap, and
+the chunks can be spread across a process pool. Every chunk gets its own child
+seed, so the results depend only on the seed, never on the number of workers.
+"""
+
+import numpy as np
+import pandas as pd
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import NamedTuple, Optional, Union
+
+from ..exceptions import InvalidRobustnessConfigError
+
+METHOD_BOOTSTRAP = "bootstrap"
+METHOD_SHUFFLE = "shuffle"
+METHODS_ALLOWED = [METHOD_BOOTSTRAP, METHOD_SHUFFLE]
+
+# Rough amount of float64 (paths, bars) arrays alive at once while simulating
+_ARRAYS_PER_CHUNK = 4
+
+
+class MonteCarloResult(NamedTuple):
+    final_equity: np.ndarray  # per path
+    max_drawdown: np.ndarray  # per path, as a positive fraction (0.2 -> -20%)
+
+    def quantiles(self, q: Sequence[float] = (0.05, 0.5, 0.95)) -> pd.DataFrame:
+        """The |q| quantiles of the final equity and max drawdown distributions"""
+        return pd.DataFrame(
+            {
+                "final_equity": np.quantile(self.final_equity, q),
+                "max_drawdown": np.quantile(self.max_drawdown, q),
+            },
+            index=pd.Index(q, name="quantile"),
+        )
+
+    def prob_of_loss(self, cash: float = 1.0) -> float:
+        """The fraction of the paths that ended below |cash|"""
+        return float((self.final_equity < cash).mean())
+
+
+def block_bootstrap(
+    returns: np.ndarray, n_paths: int, block_size: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Circular block bootstrap of |returns|
+
+    Return:
+        np.ndarray: (n_paths, len(returns)) array of resampled returns
+    """
+    n = len(returns)
+    n_blocks = -(-n // block_size)  # ceil
+    starts = rng.integers(0, n, size=(n_paths, n_blocks, 1))
+    idx = (starts + np.arange(block_size)) % n
+    return returns[idx.reshape(n_paths, -1)[:, :n]]
+
+
+def shuffle(returns: np.ndarray, n_paths: int, rng: np.random.Generator) -> np.ndarray:
+    """Shuffle the order of |returns| (e.g trade returns) independently per path
+
+    Return:
+        np.ndarray: (n_paths, len(returns)) array of shuffled returns
+    """
+    return rng.permuted(np.broadcast_to(returns, (n_paths, len(returns))), axis=1)
+
+
+def equity_curves(returns: np.ndarray, cash: float = 1.0) -> np.ndarray:
+    """Compound a (paths, bars) array of returns into equity curves"""
+    return cash * np.cumprod(1 + returns, axis=1)
+
+
+def drawdowns(equity: np.ndarray) -> np.ndarray:
+    """The drawdown (as a positive fraction) of every bar of every path"""
+    peak = np.maximum.accumulate(equity, axis=1)
+    return 1 - equity / peak
+
+
+def summarize(returns: np.ndarray, cash: float = 1.0) -> MonteCarloResult:
+    """Reduce a (paths, bars) array of returns into a ``MonteCarloResult``"""
+    equity = equity_curves(returns, cash)
+    if equity.shape[1] == 0:
+        n = equity.shape[0]
+        return MonteCarloResult(np.full(n, cash), np.zeros(n))
+    return MonteCarloResult(equity[:, -1], drawdowns(equity).max(axis=1))
+
+
+def _resample(
+    returns: np.ndarray,
+    method: str,
+    n_paths: int,
+    block_size: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    """The paths of a chunk, generated by its own seed"""
+    rng = np.random.default_rng(seed)
+    if method == METHOD_BOOTSTRAP:
+        return block_bootstrap(returns, n_paths, block_size, rng)
+    return shuffle(returns, n_paths, rng)
+
+
+def _simulate_chunk(
+    args: tuple[np.ndarray, str, int, int, np.random.SeedSequence, float],
+) -> MonteCarloResult:
+    """Process pool entrypoint, must stay a module level function to be pickled"""
+    returns, method, n_paths, block_size, seed, cash = args
+    return summarize(_resample(returns, method, n_paths, block_size, seed), cash)
+
+
+@dataclass
+class MonteCarlo:
+    """Resample a return series into many paths and summarize them
+
+    Args:
+        returns(Union[pd.Series, np.ndarray]): per bar returns (e.g the column
+            created by ``PriceAction.calc_return``) or per trade returns. NaNs
+            are dropped
+        method(str): "bootstrap" - circular block bootstrap, "shuffle" - shuffle
+            the order of the returns (meant for trade returns)
+        n_paths(int): amount of paths to generate
+        block_size(int): length of the bootstrapped blocks
+        cash(float): starting equity of every path
+        seed(optional, int): seed of the RNG, the same seed always gives the same
+            results regardless of ``workers``
+        memory_cap(int): max bytes that may be used by a chunk of paths
+        workers(int): amount of processes to use, 1 runs in the current process
+    """
+
+    returns: Union[pd.Series, np.ndarray]
+    method: str = METHOD_BOOTSTRAP
+    n_paths: int = 10_000
+    block_size: int = 20
+    cash: float = 1.0
+    seed: Optional[int] = None
+    memory_cap: int = 256 * 2**20
+    workers: int = 1
+
+    def __post_init__(self):
+        r = np.asarray(self.returns, dtype=np.float64)
+        self.returns = r[~np.isnan(r)]
+        if self.method not in METHODS_ALLOWED:
+            raise InvalidRobustnessConfigError(
+                f"Method: {self.method} is not supported, "
+                f"supported methods are: {', '.join(METHODS_ALLOWED)}"
+            )
+        if len(self.returns) == 0:
+            raise InvalidRobustnessConfigError("Can't resample an empty return series")
+        if self.n_paths <= 0 or self.block_size <= 0 or self.workers <= 0:
+            raise InvalidRobustnessConfigError(
+                "n_paths, block_size & workers must be positive"
+            )
+
+    @property
+    def chunk_size(self) -> int:
+        """The amount of paths per chunk that fits in ``memory_cap``"""
+        per_path = len(self.returns) * 8 * _ARRAYS_PER_CHUNK
+        return max(1, min(self.n_paths, self.memory_cap // per_path))
+
+    def _chunks(self) -> list[tuple[int, np.random.SeedSequence]]:
+        """The amount of paths & the seed of every chunk"""
+        size = self.chunk_size
+        counts = [size] * (self.n_paths // size)
+        if self.n_paths % size:
+            counts.append(self.n_paths % size)
+        return list(zip(counts, np.random.SeedSequence(self.seed).spawn(len(counts))))
+
+    def paths(self) -> np.ndarray:
+        """Generate all of the paths as a single (n_paths, bars) array, the same
+        paths ``run()`` summarizes (in the same order).
+        NOTE: ignores ``memory_cap``, use ``run()`` for large amounts of paths
+        """
+        r = np.asarray(self.returns)
+        return np.concatenate(
+            [
+                _resample(r, self.method, cnt, self.block_size, s)
+                for cnt, s in self._chunks()
+            ]
+        )
+
+    def run(self) -> MonteCarloResult:
+        """Generate and summarize all the paths, chunk by chunk"""
+        r = np.asarray(self.returns)
+        jobs = [
+            (r, self.method, cnt, self.block_size, s, self.cash)
+            for cnt, s in self._chunks()
+        ]
+        if self.workers == 1 or len(jobs) == 1:
+            results = [_simulate_chunk(j) for j in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(_simulate_chunk, jobs))
+        return MonteCarloResult(
+            np.concatenate([res.final_equity for res in results]),
+            np.concatenate([res.max_drawdown for res in results]),
+        )
+
+
+def perturb_params(
+    base: dict[str, Union[int, float]],
+    n: int,
+    scale: float = 0.1,
+    seed: Optional[int] = None,
+) -> list[dict[str, Union[int, float]]]:
+    """Generate |n| parameter sets, each parameter is multiplied by a normal noise
+    of std |scale|. Integer parameters (e.g SMA periods) stay positive integers
+    """
+    rng = np.random.default_rng(seed)
+    names = list(base)
+    values = np.array([base[k] for k in names], dtype=np.float64)
+    noisy = values * (1 + rng.normal(0, scale, size=(n, len(names))))
+    ret = []
+    for row in noisy:
+        params: dict[str, Union[int, float]] = {}
+        for k, v in zip(names, row):
+            params[k] = max(1, int(round(v))) if isinstance(base[k], int) else float(v)
+        ret.append(params)
+    return ret
+
+
+def run_perturbed(
+    run: Callable[..., np.ndarray],
+    base: dict[str, Union[int, float]],
+    n: int,
+    scale: float = 0.1,
+    seed: Optional[int] = None,
+    cash: float = 1.0,
+    workers: int = 1,
+) -> MonteCarloResult:
+    """Run |run| (returns per bar returns, given the params as kwargs) for |n|
+    perturbations of |base| and summarize the results. |run| must be picklable
+    when ``workers`` > 1
+    """
+    params = perturb_params(base, n, scale, seed)
+    if workers == 1:
+        outs = [run(**p) for p in params]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run, **p) for p in params]
+            outs = [f.result() for f in futures]
+    returns = np.nan_to_num(np.vstack([np.asarray(o, dtype=np.float64) for o in outs]))
+    return summarize(returns, cash)
@@ -0,0 +1,307 @@
+"""The ``python -m src.backtests`` command line.
+
+Only the standard library is imported up front, every command imports what it
+needs when it runs, so ``--help`` and short lived worker processes start fast.
+``startup`` measures it
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+PACKAGE = __package__ or "src.backtests"
+PROG = f"python -m {PACKAGE}"
+
+# Imports whose cold start time is measured by ``startup``
+STARTUP_IMPORTS = [
+    f"{PACKAGE}.core",
+    f"from {PACKAGE}.core import PriceAction",
+    f"from {PACKAGE}.core import Clock",
+    f"from {PACKAGE}.core import YClient",
+    f"from {PACKAGE}.distributed import Worker",
+]
+
+
+def _date(s: str) -> datetime:
+    return datetime.fromisoformat(s)
+
+
+def _read_config(path: str) -> dict[str, Any]:
+    from .distributed.queue import decode_params  # pylint: disable=C0415
+
+    return decode_params(Path(path).read_text())
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    """Run a single backtest: ``{"fn": "module:function", "params": {...}}``"""
+    from .analysis import ResultsStore  # pylint: disable=C0415
+    from .distributed import resolve  # pylint: disable=C0415
+
+    cfg = _read_config(args.config)
+    result = resolve(cfg["fn"])(**cfg.get("params", {}))
+    result.name = args.name or Path(args.config).stem
+    for k, v in result.metrics.as_dict().items():
+        print(f"{k:<24} {v:>14.6g}")
+    if args.store:
+        ResultsStore(args.store).put(result)
+    return 0
+
+
+def sweep_params(cfg: dict[str, Any]) -> list[dict[str, Any]]:
+    """The params of every job of a sweep config: the fixed ``params``, times
+    every combination of ``grid`` & the ``walk_forward`` windows
+    """
+    from .distributed import grid, shards, walk_forward  # pylint: disable=C0415
+
+    axes = [[cfg.get("params", {})], grid(**cfg.get("grid", {}))]
+    wf = cfg.get("walk_forward")
+    if wf:
+        step = wf.get("step_days")
+        axes.append(
+            walk_forward(
+                _date(wf["start"]),
+                _date(wf["end"]),
+                timedelta(days=wf["train_days"]),
+                timedelta(days=wf["test_days"]),
+                timedelta(days=step) if step else None,
+            )
+        )
+    return shards(*axes)
+
+
+def cmd_sweep(args: argparse.Namespace) -> int:
+    """Shard a sweep config into the job queue, and run local workers over it"""
+    from .distributed import JobQueue, run_workers, FAILED  # pylint: disable=C0415
+
+    cfg = _read_config(args.config)
+    queue = JobQueue(args.queue, max_attempts=args.max_attempts)
+    ids = queue.submit_many(cfg["fn"], sweep_params(cfg))
+    print(f"{len(ids)} jobs queued in {args.queue}")
+    if args.submit_only:
+        return 0
+    for p in run_workers(queue, args.store, args.workers):
+        p.join()
+    counts = queue.counts()
+    print(" ".join(f"{k}={v}" for k, v in counts.items()))
+    return 1 if counts[FAILED] else 0
+
+
+def cmd_worker(args: argparse.Namespace) -> int:
+    """Run a single worker (e.g one per node) in this process"""
+    from .analysis import ResultsStore  # pylint: disable=C0415
+    from .distributed import JobQueue, Worker  # pylint: disable=C0415
+
+    worker = Worker(
+        JobQueue(args.queue),
+        ResultsStore(args.store),
+        poll=args.poll,
+        max_jobs=args.max_jobs,
+        exit_when_idle=not args.forever,
+    )
+    print(f"{worker.name} ran {worker.run()} jobs")
+    return 0
+
+
+def cmd_fetch(args: argparse.Namespace) -> int:
+    """Download price action into the cache"""
+    from .core import PriceActionCache  # pylint: disable=C0415
+
+    if args.synthetic:
+        from .core import SyntheticClient  # pylint: disable=C0415
+
+        client: Any = SyntheticClient(seed=args.seed)
+    else:
+        from .core import YClient  # pylint: disable=C0415
+
+        client = YClient()
+    cache = PriceActionCache(args.cache)
+    for t in args.tickers:
+        hit = (t, args.start, args.end, args.interval) in cache
+        pa = cache.get(client, t, args.start, args.end, args.interval)
+        print(f"{t:<8} {len(pa.data):>8} bars {'cached' if hit else 'fetched'}")
+    return 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    """Run the benchmarks (``python -m benchmarks``), from the repo's root"""
+    try:
+        from benchmarks.__main__ import main  # pylint: disable=C0415
+    except ImportError:
+        print("benchmarks not found, run from the repo's root", file=sys.stderr)
+        return 2
+    return main(args.bench_args)
+
+
+def _sma_trader(ticker: str, start: datetime, end: datetime, interval: str) -> Any:
+    """The strategy ``replay`` drives: long while above the 20 SMA or on a 5/20
+    SMA cross up
+    """
+    # pylint: disable=C0415
+    from .strategies import Method, MethodWeighted, Trigger, Col, Sma, CrossUp
+    from .trader import Trader
+
+    trader = Trader(ticker, start, end, interval)
+    m = Method(ticker, timed=False, conditioned=True)
+    m.register_trigger(Trigger(2, Col("Close") > Sma(20)))
+    m.register_trigger(Trigger(1, CrossUp(Sma(5), Sma(20))))
+    trader.register(MethodWeighted(m, 1))
+    return trader
+
+
+def cmd_replay(args: argparse.Namespace) -> int:
+    """Replay a synthetic universe bar by bar into a trader per ticker, and
+    report whether the decisions keep up with the bars at ``--speed``, or the
+    fastest speed they'd keep up with if it's unset (as fast as possible)
+    """
+    import asyncio  # pylint: disable=C0415
+    from .core import Clock, SyntheticClient  # pylint: disable=C0415
+    from .replay import ReplayServer, ReplayConsumer, replay  # pylint: disable=C0415
+    from .utils import parse_interval  # pylint: disable=C0415
+
+    tickers = args.tickers or [f"T{i:03d}" for i in range(args.universe)]
+    pas = SyntheticClient(seed=args.seed).get_universe(
+        tickers, args.start, args.end, args.interval
+    )
+    clock = Clock(args.start, args.end, args.interval)
+    server = ReplayServer.from_clock(pas, clock, speed=args.speed, max_gap=args.max_gap)
+    consumer = ReplayConsumer(
+        {t: _sma_trader(t, args.start, args.end, args.interval) for t in tickers}
+    )
+
+    async def over_tcp():
+        srv = await server.serve()
+        async with srv:
+            await consumer.connect(*srv.sockets[0].getsockname()[:2])
+        return consumer.report()
+
+    t0 = time.perf_counter()
+    report = asyncio.run(over_tcp() if args.tcp else replay(server, consumer))
+    elapsed = time.perf_counter() - t0
+    interval = parse_interval(args.interval).total_seconds()
+    print(f"{len(tickers)} tickers x {report.bars} bars in {elapsed:.2f}s")
+    for k, v in report._asdict().items():
+        if k != "bars":
+            print(f"{k:<16} {v * 1e3:>12.3f}ms")
+    if args.speed is None:
+        # Nothing was paced, there's no real time to keep up with
+        print(f"Sustains up to {report.max_speed(interval):,.0f}x real time")
+        return 0
+    budget = interval / args.speed
+    if not report.keeps_up(budget):
+        print(f"Decisions fell behind the {budget:g}s bars", file=sys.stderr)
+        return 1
+    print(f"Keeps up with the {budget:g}s bars")
+    return 0
+
+
+def measure_startup(code: list[str], runs: int) -> list[float]:
+    """Wall time (seconds) of |runs| fresh interpreters that run |code|"""
+    ret = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *code],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        ret.append(time.perf_counter() - t0)
+    return ret
+
+
+def cmd_startup(args: argparse.Namespace) -> int:
+    """Measure the cold start of the CLI & the main imports"""
+    targets = {"python": ["-c", "pass"], "--help": ["-m", PACKAGE, "--help"]}
+    for imp in STARTUP_IMPORTS + (args.imports or []):
+        stmt = imp if imp.startswith("from ") else f"import {imp}"
+        targets[stmt] = ["-c", stmt]
+
+    print(f"{'target':<48} {'median':>10} {'min':>10}")
+    medians = {}
+    for name, code in targets.items():
+        t = measure_startup(code, args.runs)
+        medians[name] = statistics.median(t)
+        print(f"{name:<48} {medians[name] * 1e3:>8.1f}ms {min(t) * 1e3:>8.1f}ms")
+    if args.budget is not None and medians["--help"] * 1e3 > args.budget:
+        print(f"--help exceeded the budget of {args.budget}ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog=PROG, description="Backtesting command line")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run a single backtest config")
+    run.add_argument("config", help='JSON: {"fn": "module:function", "params": {}}')
+    run.add_argument("--name", help="name of the result, default the config's")
+    run.add_argument("--store", help="put the result in this results store")
+    run.set_defaults(func=cmd_run)
+
+    sweep = sub.add_parser("sweep", help="shard a sweep into the job queue")
+    sweep.add_argument(
+        "config", help="JSON: fn, params, grid & walk_forward (optional)"
+    )
+    sweep.add_argument("--queue", default="jobs.db")
+    sweep.add_argument("--store", default="results")
+    sweep.add_argument("-w", "--workers", type=int, default=1)
+    sweep.add_argument("--max-attempts", type=int, default=3)
+    sweep.add_argument(
+        "--submit-only", action="store_true", help="leave it to `worker`s"
+    )
+    sweep.set_defaults(func=cmd_sweep)
+
+    worker = sub.add_parser("worker", help="pull & run jobs from the queue")
+    worker.add_argument("--queue", default="jobs.db")
+    worker.add_argument("--store", default="results")
+    worker.add_argument("--poll", type=float, default=1.0)
+    worker.add_argument("--max-jobs", type=int)
+    worker.add_argument("--forever", action="store_true", help="keep polling when idle")
+    worker.set_defaults(func=cmd_worker)
+
+    fetch = sub.add_parser("fetch", help="download price action into the cache")
+    fetch.add_argument("tickers", nargs="+")
+    fetch.add_argument("--start", type=_date, required=True)
+    fetch.add_argument("--end", type=_date, required=True)
+    fetch.add_argument("-i", "--interval", default="1d")
+    fetch.add_argument("--cache", default="data")
+    fetch.add_argument("--synthetic", action="store_true", help="offline data")
+    fetch.add_argument("--seed", type=int, default=0)
+    fetch.set_defaults(func=cmd_fetch)
+
+    bench = sub.add_parser("bench", help="run the benchmarks", add_help=False)
+    bench.add_argument("bench_args", nargs=argparse.REMAINDER)
+    bench.set_defaults(func=cmd_bench)
+
+    rp = sub.add_parser("replay", help="replay bars live into the traders")
+    rp.add_argument("--tickers", nargs="+", help="default a synthetic universe")
+    rp.add_argument("-n", "--universe", type=int, default=100)
+    rp.add_argument("--start", type=_date, required=True)
+    rp.add_argument("--end", type=_date, required=True)
+    rp.add_argument("-i", "--interval", default="1m")
+    rp.add_argument("--speed", type=float, help="1 is real time, default max")
+    rp.add_argument("--max-gap", type=float, help="cap the wait between bars (s)")
+    rp.add_argument("--tcp", action="store_true", help="stream over a local socket")
+    rp.add_argument("--seed", type=int, default=0)
+    rp.set_defaults(func=cmd_replay)
+
+    startup = sub.add_parser("startup", help="measure the cold start time")
+    startup.add_argument("-n", "--runs", type=int, default=5)
+    startup.add_argument(
+        "--import", dest="imports", action="append", help="extra module to time"
+    )
+    startup.add_argument(
+        "--budget", type=float, help="exit with 1 if --help is slower (ms)"
+    )
+    startup.set_defaults(func=cmd_startup)
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    return args.func(args)
@@ -1,4 +1,23 @@
-from .price_action import PriceAction
-from .price_bar import Bar
-from .clock import Clock
-from .client import YClient
+from typing import TYPE_CHECKING
+
+from ..lazy import lazy_exports
+
+_EXPORTS = {
+    "price_action": ["PriceAction"],
+    "price_bar": ["Bar"],
+    "clock": ["Clock"],
+    "client": ["YClient"],
+    "synthetic": ["SyntheticClient"],
+    "cache": ["PriceActionCache"],
+    "shared": ["SharedPriceAction", "shared_price_action"],
+}
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .price_action import PriceAction
+    from .price_bar import Bar
+    from .clock import Clock
+    from .client import YClient
+    from .synthetic import SyntheticClient
+    from .cache import PriceActionCache
+    from .shared import SharedPriceAction, shared_price_action
@@ -0,0 +1,54 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Union
+
+from .price_action import PriceAction
+
+TIME_FMT_FILE = "%Y%m%dT%H%M"
+
+
+@dataclass
+class PriceActionCache:
+    """A directory of downloaded price action, so repeated runs (and every worker
+    of a sweep) read it from disk instead of downloading it again
+
+    Args:
+        root(Union[str, Path]): the cache directory, created if missing
+        fmt(str): ".npz" or ".parquet" (requires ``pyarrow``)
+    """
+
+    root: Union[str, Path]
+    fmt: str = ".npz"
+
+    def __post_init__(self):
+        self.root = Path(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, ticker: str, start: datetime, end: datetime, interval: str) -> Path:
+        s, e = start.strftime(TIME_FMT_FILE), end.strftime(TIME_FMT_FILE)
+        return Path(self.root) / f"{ticker}_{interval}_{s}_{e}{self.fmt}"
+
+    def __contains__(self, key: tuple[str, datetime, datetime, str]) -> bool:
+        return self.path(*key).exists()
+
+    def get(
+        self,
+        client: Any,
+        ticker: str,
+        start: datetime,
+        end: datetime,
+        interval: str,
+    ) -> PriceAction:
+        """The cached price action, fetched with |client| (e.g ``YClient`` or
+        ``SyntheticClient``) and stored on a miss
+        """
+        path = self.path(ticker, start, end, interval)
+        if path.exists():
+            return PriceAction.load(path)
+        pa = client.get_price_action(ticker, start, end, interval)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp{self.fmt}")
+        pa.save(tmp)
+        os.replace(tmp, path)
+        return pa
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 from .price_action import PriceAction
 from ..exceptions import EmptyPriceActionError, WTF
+from ..telemetry.profiling import profiled, profile_block
 
 
 class YClient(BaseModel):
@@ -16,6 +17,7 @@ class YClient(BaseModel):
 
     _yf_time_fmt: str = "%Y-%m-%d"
 
+    @profiled("data.get_price_action")
     def get_price_action(
         self,
         ticker: str,
@@ -49,21 +51,24 @@ class YClient(BaseModel):
         else:
             real_end = end
         yend = real_end.strftime(self._yf_time_fmt)
-        data = yf.download(
-            ticker,
-            start=ystart,
-            end=yend,
-            interval=interval,
-            auto_adjust=True,
-            group_by="ticker",
-        )
+        with profile_block("data.download"):
+            data = yf.download(
+                ticker,
+                start=ystart,
+                end=yend,
+                interval=interval,
+                auto_adjust=True,
+                group_by="ticker",
+            )
         if data is None:
             raise EmptyPriceActionError(
                 f"Can't fetch data for {ticker} between {ystart} -> {yend}"
             )
 
-        # No Support for multi-index DataFrames
-        tdata = data[ticker].copy()
+        # No Support for multi-index DataFrames, drop the ticker level in place
+        # instead of copying the ticker's columns
+        data.columns = data.columns.droplevel(0)
+        tdata = data
         # Here for linting, shows tdata as pd.Series for some reason...
         if not isinstance(tdata, pd.DataFrame):
             raise WTF("For some reason, the data returned isn't a DataFrame")
@@ -1,14 +1,27 @@
+import numpy as np
 import pandas as pd
-from collections.abc import Generator
-import pandas_market_calendars as mcal
+from collections.abc import Generator, Sequence
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
-from typing import Union, ClassVar, cast
+from functools import lru_cache
+from itertools import repeat
+from typing import TYPE_CHECKING, Optional, Union, ClassVar, cast
 
 from ..config import TIME_FMT_DAY
 from . import Bar
-from ..utils import parse_interval, td_to_str, discard_datetime_by_interval
-from ..exceptions import IntervalNotSupported
+from ..utils import (
+    parse_interval,
+    td_to_str,
+    discard_datetime_by_interval,
+    interval_ns,
+    index_to_ns,
+    ns_to_index,
+)
+from ..exceptions import CalendarNotSupported, IntervalNotSupported
+from ..telemetry.profiling import profiled
+
+if TYPE_CHECKING:
+    import pandas_market_calendars as mcal
 
 INTERVALS_ALLOWED = ["1m", "5m", "10m", "30m", "1h", "1d", "7d", "1w"]
 INTERVALS_ALLOWED_TD = [parse_interval(i) for i in INTERVALS_ALLOWED]
@@ -16,6 +29,79 @@ INTERVALS_REPR = ", ".join(INTERVALS_ALLOWED)
 
 SCHEDULE_TIME_FMT = "%Y-%m-%d %H:%M:%S"
 
+NAT = np.iinfo(np.int64).min
+
+
+@lru_cache(maxsize=None)
+def get_calendar(name: str) -> "mcal.MarketCalendar":
+    """The market calendar |name|, built once. ``pandas_market_calendars`` is only
+    imported when the first schedule is built
+    """
+    import pandas_market_calendars as mcal  # pylint: disable=C0415,W0621
+
+    try:
+        return mcal.get_calendar(name)
+    except RuntimeError as e:
+        raise CalendarNotSupported(f"Calendar: {name} doesn't exist") from e
+
+
+@lru_cache(maxsize=128)
+def get_schedule(calendar: str, start: str, end: str, extended: bool) -> pd.DataFrame:
+    """The (UTC) schedule of |calendar| between the dates |start| & |end|, computed
+    once per arguments. Pre & post market times are included if |extended| and the
+    calendar has them. Must not be modified
+    """
+    cal = get_calendar(calendar)
+    has_ext = {"pre", "post"} <= set(cal.regular_market_times.keys())
+    cols = ("pre", "post") if extended and has_ext else ("market_open", "market_close")
+    return cal.schedule(
+        start_date=start, end_date=end, start=cols[0], end=cols[1], tz="UTC"
+    )
+
+
+def calendar_sessions(
+    sched: pd.DataFrame,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The trading date, open & close (int64 UTC nanoseconds) of every session of
+    |sched|. Sessions with a break (e.g lunch) are split into 2 sessions
+    """
+    o = index_to_ns(sched["pre" if "pre" in sched else "market_open"])
+    c = index_to_ns(sched["post" if "post" in sched else "market_close"])
+    dates = index_to_ns(sched.index)
+    if "break_start" not in sched:
+        return dates, o, c
+    bs, be = index_to_ns(sched["break_start"]), index_to_ns(sched["break_end"])
+    brk = (bs != NAT) & (be != NAT)
+    dates = np.concatenate((dates, dates[brk]))
+    o, c = np.concatenate((o, be[brk])), np.concatenate((np.where(brk, bs, c), c[brk]))
+    order = np.argsort(o, kind="stable")
+    return dates[order], o[order], c[order]
+
+
+def union_sessions(
+    dates: np.ndarray, opens: np.ndarray, closes: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Merge overlapping & adjacent sessions (of several calendars) into a single
+    timeline. A merged session belongs to the latest trading date it covers
+    """
+    if len(opens) == 0:
+        return dates, opens, closes
+    order = np.lexsort((closes, opens))
+    d, o, c = dates[order], opens[order], closes[order]
+    reach = np.maximum.accumulate(c)
+    new = np.ones(len(o), dtype=bool)
+    new[1:] = o[1:] > reach[:-1]
+    starts = np.flatnonzero(new)
+    return (
+        np.maximum.reduceat(d, starts),
+        o[starts],
+        np.maximum.reduceat(c, starts),
+    )
+
+
+# Bars are converted from NumPy to Python ints in chunks of this size
+_CHUNK = 4096
+
 
 # pylint: disable=R0902
 @dataclass
@@ -26,9 +112,12 @@ class Clock:
 
     To use this class, it allows to iterate over it. When iterated, the ``start`` time
     will be updated by ``interval`` for each iteration, storing the current time in
-    ``self.time``
+    ``self.time``. The bar times are computed as int64 nanoseconds at once from the
+    schedule, and converted to datetimes only when they're accessed
 
-    This class uses the US Equities calendar on NY timezone. This can not be modified
+    By default this class uses the US Equities calendar on NY timezone. With several
+    ``calendars``, their sessions are merged into a single timeline (see
+    ``open_flags()`` for which markets are open during every bar)
 
     Args:
         start(datetime): the "epoch" of the clock, since when this clock provides time
@@ -38,43 +127,73 @@ class Clock:
             support. as of now, only 1 interval is allowed.
             Allowed intervals: 1m, 5m, 10m, 30m, 1h, 1d, 7d, 1w
         extended(bool): enable pre & post market times. Default is False
+        calendars(optional, Sequence[str]): the ``pandas_market_calendars``
+            calendars to merge. Default is NYSE
+        timezone(optional, str): the timezone of the bars. Default is New York
     """
 
     start: datetime
     end: datetime = datetime.now()
     interval: Union[str, timedelta] = "1d"
     extended: bool = False
+    calendars: Optional[Sequence[str]] = None
+    timezone: Optional[str] = None
 
-    time: datetime = field(init=False)
+    _time_ns: Optional[int] = field(default=None, init=False)
+    position: int = field(default=0, init=False)  # amount of bars consumed
+    _seek_to: int = field(default=0, init=False)
     _ival_str: str = field(default_factory=str, init=False)
     _ival_td: timedelta = field(default_factory=timedelta, init=False)
 
     # Calendar Class attributes
     tz: ClassVar[str] = "America/New_York"
     calendar: ClassVar[str] = "NYSE"
-    nyse: ClassVar[mcal.MarketCalendar] = mcal.get_calendar(calendar)
 
     def __post_init__(self):
         self._parse_interval()
-        self.time = self.start
         # Discard useless fields to be able to stop iterating
         self.end = discard_datetime_by_interval(self.end, self._ival_td)
         self.is_intraday = self._ival_td < timedelta(days=1)
+        self.calendars = tuple(self.calendars or (Clock.calendar,))
+        if self.timezone is not None:
+            self.tz = self.timezone  # pylint: disable=C0103
 
-        # Set up a schedule of the trading sessions
-        market_start = "pre" if self.extended else "market_open"
-        market_end = "post" if self.extended else "market_close"
-        self.sched = Clock.nyse.schedule(
-            tz=self.tz,
-            start_date=self.start.strftime(TIME_FMT_DAY),
-            end_date=self.end.strftime(TIME_FMT_DAY),
-            start=market_start,
-            end=market_end,
-        )
+        self._sessions: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self.sched = self._build_schedule()
         self.days = self.sched.index
-        self.mkt_opens = self.sched.market_open
-        self.mkt_close = self.sched.market_close
+        self.mkt_opens = self.sched[self._session_cols[0]]
+        self.mkt_close = self.sched[self._session_cols[1]]
         self._iterator: Generator[Bar, None, None]
+        self._cache_ns: Optional[tuple[np.ndarray, np.ndarray]] = None
+
+    @property
+    def _session_cols(self) -> tuple[str, str]:
+        """The schedule's columns of the sessions' opens & closes"""
+        if self.extended:
+            return "pre", "post"
+        return "market_open", "market_close"
+
+    @profiled("clock.schedule")
+    def _build_schedule(self) -> pd.DataFrame:
+        """Set up a schedule of the trading sessions: the union of the sessions of
+        every calendar, indexed by their trading date
+        """
+        start = self.start.strftime(TIME_FMT_DAY)
+        end = self.end.strftime(TIME_FMT_DAY)
+        parts = []
+        for cal in self.calendars:
+            d, o, c = calendar_sessions(get_schedule(cal, start, end, self.extended))
+            self._sessions[cal] = (o, c)
+            parts.append((d, o, c))
+        d, o, c = union_sessions(*(np.concatenate(p) for p in zip(*parts)))
+        market_start, market_end = self._session_cols
+        return pd.DataFrame(
+            {
+                market_start: ns_to_index(o, self.tz),
+                market_end: ns_to_index(c, self.tz),
+            },
+            index=pd.DatetimeIndex(d.view("M8[ns]")),
+        )
 
     def _parse_interval(self):
         if isinstance(self.interval, str):
@@ -89,47 +208,111 @@ class Clock:
                 f"supported intervals are: {INTERVALS_REPR}"
             )
 
-    def _generate_intraday_bars(self) -> Generator[Bar, None, None]:
-        """Generates bars for intraday intervals."""
-        for day_open, day_close in zip(self.mkt_opens, self.mkt_close):
-            bar_open = day_open
-            while bar_open < day_close:
-                bar_close = min(bar_open + self._ival_td, day_close)
-                yield Bar(bar_open, bar_close)
-                bar_open += self._ival_td
-
-    def _generate_daily_bars(self) -> Generator[Bar, None, None]:
-        """Generates bars for daily intervals."""
-        for day_open, day_close in zip(self.mkt_opens, self.mkt_close):
-            yield Bar(day_open, day_close)
-
-    def _generate_weekly_bars(self) -> Generator[Bar, None, None]:
-        """Generates bars for weekly intervals using pandas."""
+    def bar_times_ns(self) -> tuple[np.ndarray, np.ndarray]:
+        """Same as ``bar_times()``, as int64 UTC nanoseconds. Built once with
+        vectorized operations on the schedule
+        """
+        if self._cache_ns is not None:
+            return self._cache_ns
+        o = index_to_ns(self.mkt_opens)
+        c = index_to_ns(self.mkt_close)
+        if self.is_intraday:
+            step = interval_ns(self._ival_td)
+            counts = -(-(c - o) // step)  # the last bar may be shorter
+            starts = np.repeat(o, counts)
+            # position of every bar inside its session
+            first = np.repeat(np.cumsum(counts) - counts, counts)
+            o = starts + (np.arange(counts.sum()) - first) * step
+            c = np.minimum(o + step, np.repeat(c, counts))
+        else:
+            first, last = self._period_bounds()
+            o, c = o[first], c[last]
+        self._cache_ns = (o, c)
+        return self._cache_ns
+
+    def _period_bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        """The first & last session of every day (or ISO week, for weekly
+        intervals) of the schedule
+        """
         idx = cast(pd.DatetimeIndex, self.sched.index)
-        weekly_groups = self.sched.groupby(
-            [idx.isocalendar().year, idx.isocalendar().week]
-        )
+        if self._ival_td == timedelta(days=1):
+            keys = idx.asi8
+        else:
+            iso = idx.isocalendar()
+            keys = (iso.year * 100 + iso.week).to_numpy(dtype=np.int64)
+        change = np.flatnonzero(np.diff(keys)) + 1
+        first = np.concatenate(([0], change)) if len(keys) else change
+        last = np.concatenate((change - 1, [len(keys) - 1])) if len(keys) else change
+        return first, last
 
-        for _, week_df in weekly_groups:
-            week_open = week_df["market_open"].iloc[0]
-            week_close = week_df["market_close"].iloc[-1]
-            yield Bar(week_open, week_close)
+    def open_flags(self) -> pd.DataFrame:
+        """Which of the ``calendars`` is open during every bar (at any point
+        between its open & close)
+
+        Return:
+            pd.DataFrame: (bars, calendars) booleans, indexed by the bars' opens
+        """
+        bar_open, bar_close = self.bar_times_ns()
+        flags = {}
+        for cal, (o, c) in self._sessions.items():
+            # The first session that closes after the bar opens
+            i = np.searchsorted(c, bar_open, side="right")
+            j = np.minimum(i, max(len(o) - 1, 0))
+            flags[cal] = (i < len(o)) & (o[j] < bar_close) if len(o) else i < 0
+        return pd.DataFrame(flags, index=ns_to_index(bar_open, self.tz))
 
     def generate_bars(self) -> Generator[Bar, None, None]:
+        """Generate every bar of the time range. Only ints are handled until a
+        ``Bar``'s times are accessed
         """
-        Dispatcher method: calls the correct generator based on the interval.
-        XXX: In the future, maybe move this to models.price_bar / utils ?
+        yield from self._generate_bars(0)
+
+    def _generate_bars(self, start: int) -> Generator[Bar, None, None]:
+        opens, closes = self.bar_times_ns()
+        from_ns, tz = Bar.from_ns, self.tz
+        for i in range(start, len(opens), _CHUNK):
+            o = opens[i : i + _CHUNK].tolist()
+            c = closes[i : i + _CHUNK].tolist()
+            yield from map(from_ns, o, c, repeat(tz))
+
+    def bar_times(self) -> tuple[pd.DatetimeIndex, pd.DatetimeIndex]:
+        """The open & close times of every bar, built with vectorized operations
+        on the schedule instead of iterating over the bars. Bar ``i`` of the
+        iteration is ``Bar(opens[i], closes[i])``
+
+        Return:
+            tuple[pd.DatetimeIndex, pd.DatetimeIndex]: the opens & the closes
+        """
+        opens, closes = self.bar_times_ns()
+        return ns_to_index(opens, self.tz), ns_to_index(closes, self.tz)
+
+    def __len__(self) -> int:
+        """The total amount of bars in the time range, calculated from the schedule
+        without generating the bars
         """
         if self.is_intraday:
-            yield from self._generate_intraday_bars()
-        elif self._ival_td == timedelta(days=1):
-            yield from self._generate_daily_bars()
-        elif self._ival_td >= timedelta(days=7):  # Or weeks=1
-            yield from self._generate_weekly_bars()
+            durations = index_to_ns(self.mkt_close) - index_to_ns(self.mkt_opens)
+            # ceil, the last bar of the session may be shorter than the interval
+            return int((-(-durations // interval_ns(self._ival_td))).sum())
+        return len(self._period_bounds()[0])
+
+    def seek(self, bar: int) -> "Clock":
+        """Make the next iteration start at the |bar|-th bar (e.g to resume a run
+        from a checkpoint) instead of the beginning of the time range::
+
+            for bar in clock.seek(1000):
+                ...
+        """
+        if not 0 <= bar <= len(self):
+            raise IndexError(f"Can't seek to bar {bar}, clock has {len(self)} bars")
+        self._seek_to = bar
+        return self
 
     def __iter__(self):
         """Iterate over the entire time range using the specified interval"""
-        self._iterator = self.generate_bars()
+        self._iterator = self._generate_bars(self._seek_to)
+        self.position = self._seek_to
+        self._seek_to = 0
         return self
 
     # pylint: disable=W0706
@@ -140,6 +323,16 @@ class Clock:
         Important to make this class to be classified as an Iterator object
         """
         try:
-            return next(self._iterator)
+            bar = next(self._iterator)
         except StopIteration:
             raise
+        self.position += 1
+        self._time_ns = bar.open_ns
+        return bar
+
+    @property
+    def time(self) -> datetime:
+        """The open of the current bar, ``start`` before iterating"""
+        if self._time_ns is None:
+            return self.start
+        return pd.Timestamp(self._time_ns, tz=self.tz)
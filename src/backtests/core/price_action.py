@@ -1,8 +1,14 @@
+import json
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Optional, ClassVar, NamedTuple
-from ..exceptions import IdenticalSMASCantCrossError
+from pathlib import Path
+from typing import Any, Optional, ClassVar, NamedTuple, Union
+from ..exceptions import IdenticalSMASCantCrossError, UnsupportedFileFormatError
+from ..telemetry.profiling import profiled
+
+ARROW_INDEX = "__index__"
 
 
 class SMAResult(NamedTuple):
@@ -36,6 +42,8 @@ class PriceAction:
     # runtime state (instance-level)
     active_smas: set[str] = field(default_factory=set, init=False)
     active_sma_crosses: set[str] = field(default_factory=set, init=False)
+    # The memory the data is mapped from (shared memory / Arrow IPC file), if any
+    buffer: Any = field(default=None, init=False, repr=False)
 
     # Will be useful when we support multiple tickers
     # tdata: ClassVar[dict[str, pd.Series]] = {}
@@ -44,9 +52,114 @@ class PriceAction:
     #     for t in self.tickers:
     #         self.tdata[t] = self.data[t]
 
+    def _meta(self) -> dict:
+        idx = pd.DatetimeIndex(self.data.index)
+        return {
+            "ticker": self.ticker,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "chunk": self.chunk.total_seconds() if self.chunk else None,
+            "tz": str(idx.tz) if idx.tz is not None else None,
+        }
+
+    @classmethod
+    def _from_meta(cls, meta: dict, data: pd.DataFrame) -> "PriceAction":
+        return cls(
+            ticker=meta["ticker"],
+            data=data,
+            start=datetime.fromisoformat(meta["start"]),
+            end=datetime.fromisoformat(meta["end"]),
+            chunk=timedelta(seconds=meta["chunk"]) if meta["chunk"] else None,
+        )
+
+    def save(self, path: Union[str, Path]):
+        """Save the price action to |path|, the format is chosen by the suffix:
+        ``.npz`` (one array per column), ``.parquet`` or ``.arrow`` (an
+        uncompressed Arrow IPC file that ``load()`` memory maps). The last 2
+        require ``pyarrow``
+        """
+        path = Path(path)
+        if path.suffix == ".npz":
+            idx = pd.DatetimeIndex(self.data.index)
+            utc = idx.tz_convert("UTC").tz_localize(None) if idx.tz else idx
+            cols = {f"col_{c}": self.data[c].to_numpy() for c in self.data.columns}
+            np.savez(
+                path,
+                index=utc.asi8,
+                meta=np.array(json.dumps(self._meta())),
+                **cols,
+            )
+        elif path.suffix == ".parquet":
+            data = self.data.copy(deep=False)
+            data.attrs = {"meta": json.dumps(self._meta())}
+            data.to_parquet(path)
+        elif path.suffix == ".arrow":
+            self._save_arrow(path)
+        else:
+            raise UnsupportedFileFormatError(f"Can't save price action to {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "PriceAction":
+        """Load a price action that was saved using ``save()``"""
+        path = Path(path)
+        if path.suffix == ".npz":
+            with np.load(path, allow_pickle=False) as f:
+                meta = json.loads(str(f["meta"]))
+                idx = pd.DatetimeIndex(f["index"].view("M8[ns]"))
+                if meta["tz"]:
+                    idx = idx.tz_localize("UTC").tz_convert(meta["tz"])
+                cols = {k[len("col_") :]: f[k] for k in f.files if k.startswith("col_")}
+            return cls._from_meta(meta, pd.DataFrame(cols, index=idx))
+        if path.suffix == ".arrow":
+            return cls._load_arrow(path)
+        if path.suffix == ".parquet":
+            data = pd.read_parquet(path)
+            meta = json.loads(data.attrs["meta"])
+            data.attrs = {}
+            return cls._from_meta(meta, data)
+        raise UnsupportedFileFormatError(f"Can't load price action from {path}")
+
+    def _save_arrow(self, path: Path):
+        import pyarrow as pa  # pylint: disable=C0415
+
+        idx = pd.DatetimeIndex(self.data.index)
+        utc = idx.tz_convert("UTC").tz_localize(None) if idx.tz else idx
+        arrays = {ARROW_INDEX: pa.array(utc.asi8)}
+        arrays.update({str(c): pa.array(self.data[c].to_numpy()) for c in self.data})
+        table = pa.table(arrays).replace_schema_metadata(
+            {"meta": json.dumps(self._meta())}
+        )
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    @classmethod
+    def _load_arrow(cls, path: Path) -> "PriceAction":
+        """Memory map an Arrow IPC file, the columns are read-only views of the
+        mapped file: nothing is copied, and processes that load the same file
+        share the pages
+        """
+        import pyarrow as pa  # pylint: disable=C0415
+
+        source = pa.memory_map(str(path), "r")
+        table = pa.ipc.open_file(source).read_all()
+        meta = json.loads(table.schema.metadata[b"meta"])
+        cols = {
+            name: table.column(name).chunk(0).to_numpy(zero_copy_only=True)
+            for name in table.column_names
+        }
+        idx = pd.DatetimeIndex(cols.pop(ARROW_INDEX).view("M8[ns]"))
+        if meta["tz"]:
+            idx = idx.tz_localize("UTC").tz_convert(meta["tz"])
+        ret = cls._from_meta(meta, pd.DataFrame(cols, index=idx, copy=False))
+        ret.buffer = source
+        return ret
+
+    @profiled("indicators.calc_return")
     def calc_return(self, col_name: str):
         self.data[col_name] = self.data["Close"].pct_change()
 
+    @profiled("indicators.get_sma")
     def get_sma(self, period: int) -> SMAResult:
         """Calculate the SMA of |period| and register it. If the SMA of this |period|
         Already exist, don't calculate it again, just return it
@@ -60,6 +173,7 @@ class PriceAction:
             self.active_smas.add(name)
         return SMAResult(name, self.data[name])
 
+    @profiled("indicators.get_sma_cross")
     def get_sma_cross(self, s1: int, s2: int) -> SMACrossResult:
         """Calculate the cross points of 2 SMAs and return it
 
@@ -1,11 +1,72 @@
+import pandas as pd
 from ..config import TIME_FMT_FULL
+from ..utils import to_ns
 from datetime import datetime
-from typing import NamedTuple
+from typing import Optional, Union
 
 
-class Bar(NamedTuple):
-    open: datetime
-    close: datetime
+class Bar:
+    """A single bar, backed by the int64 UTC nanoseconds of its open & close.
+    ``open``/``close`` convert them to ``pd.Timestamp`` (in ``tz``) on access only.
+
+    Bars compare by their times, so ``Bar(open, close)`` built out of datetimes
+    equals the ``Bar`` of the ``Clock`` at the same times
+
+    Args:
+        open(Union[datetime, int]): the open time, or its nanoseconds
+        close(Union[datetime, int]): the close time, or its nanoseconds
+        tz(optional, str): the timezone of ``open``/``close``, default is the
+            timezone of |open| (if it's a datetime)
+    """
+
+    __slots__ = ("open_ns", "close_ns", "tz")
+
+    def __init__(
+        self,
+        open: Union[datetime, int],  # pylint: disable=W0622
+        close: Union[datetime, int],
+        tz: Optional[str] = None,
+    ):
+        self.open_ns = to_ns(open)
+        self.close_ns = to_ns(close)
+        self.tz = tz if tz is not None else getattr(open, "tzinfo", None)
+
+    @classmethod
+    def from_ns(cls, open_ns: int, close_ns: int, tz: Optional[str]) -> "Bar":
+        """Build a bar without any conversion (the ``Clock``'s hot path)"""
+        bar = cls.__new__(cls)
+        bar.open_ns, bar.close_ns, bar.tz = open_ns, close_ns, tz
+        return bar
+
+    @property
+    def open(self) -> pd.Timestamp:
+        return pd.Timestamp(self.open_ns, tz=self.tz)
+
+    @property
+    def close(self) -> pd.Timestamp:
+        return pd.Timestamp(self.close_ns, tz=self.tz)
+
+    @property
+    def duration_ns(self) -> int:
+        return self.close_ns - self.open_ns
+
+    def __iter__(self):
+        yield self.open
+        yield self.close
+
+    def __len__(self) -> int:
+        return 2
+
+    def __getitem__(self, i: int) -> pd.Timestamp:
+        return (self.open, self.close)[i]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Bar):
+            return NotImplemented
+        return self.open_ns == other.open_ns and self.close_ns == other.close_ns
+
+    def __hash__(self) -> int:
+        return hash((self.open_ns, self.close_ns))
 
     def __repr__(self) -> str:
         return self.__str__()
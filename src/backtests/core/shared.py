@@ -0,0 +1,151 @@
+"""Zero-copy sharing of a ``PriceAction`` between processes.
+
+The owner copies the index & the columns once into a ``shared_memory`` segment,
+and sends the small (picklable) ``SharedPriceAction`` handle to the workers. Each
+worker maps the same bytes read-only, so no worker pays for pickling or copying
+the data. Indicators a worker computes (e.g ``get_sma``) become new, worker-local
+columns, the shared columns are never copied.
+For workers on other nodes, save the price action as an Arrow IPC file
+(``pa.save("spy.arrow")``) and ``PriceAction.load()`` it, which memory maps it
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, NamedTuple, Optional
+
+from .price_action import PriceAction
+
+# Column buffers are aligned to this many bytes
+_ALIGN = 64
+
+
+class SharedColumn(NamedTuple):
+    name: str
+    dtype: str
+    offset: int
+
+
+def _aligned(n: int) -> int:
+    return -(-n // _ALIGN) * _ALIGN
+
+
+@dataclass
+class SharedPriceAction:
+    """A handle of a ``PriceAction`` in a shared memory segment, built by
+    ``create()``. Pickling it only pickles the layout, not the data
+
+    Args:
+        name(str): the name of the shared memory segment
+        rows(int): amount of bars
+        index_offset(int): offset of the int64 UTC nanoseconds index
+        columns(list[SharedColumn]): name, dtype & offset of every column
+        meta(dict): the ``PriceAction`` fields (ticker, start, end, ...)
+    """
+
+    name: str
+    rows: int
+    index_offset: int
+    columns: list[SharedColumn]
+    meta: dict[str, Any]
+
+    @classmethod
+    def create(
+        cls, pa: PriceAction, columns: Optional[list[str]] = None
+    ) -> tuple["SharedPriceAction", shared_memory.SharedMemory]:
+        """Copy |pa| into a new shared memory segment. Computed indicator columns
+        can be shared too, so the workers don't compute them again
+
+        Args:
+            pa(PriceAction): the price action to share
+            columns(optional, list[str]): the columns to share, default all
+
+        Return:
+            tuple[SharedPriceAction, SharedMemory]: the handle & the segment, the
+                owner must ``close()`` & ``unlink()`` the segment once the workers
+                are done (see ``shared_price_action()``)
+        """
+        data = pa.data if columns is None else pa.data[columns]
+        rows = len(data)
+        arrays = {str(c): data[c].to_numpy() for c in data.columns}
+        layout, offset = [], _aligned(rows * 8)
+        for c, arr in arrays.items():
+            if arr.dtype == object:
+                raise TypeError(f"Column {c} isn't numeric, it can't be shared")
+            layout.append(SharedColumn(c, arr.dtype.str, offset))
+            offset += _aligned(arr.nbytes)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        index = pd.DatetimeIndex(data.index)
+        utc = index.tz_convert("UTC").tz_localize(None) if index.tz else index
+        np.ndarray(rows, np.int64, shm.buf, 0)[:] = utc.asi8
+        for col in layout:
+            dst = np.ndarray(rows, np.dtype(col.dtype), shm.buf, col.offset)
+            dst[:] = arrays[col.name]
+
+        shared = set(arrays)
+        meta = {
+            **pa._meta(),  # pylint: disable=W0212
+            "smas": sorted(pa.active_smas & shared),
+            "sma_crosses": sorted(
+                c
+                for c in pa.active_sma_crosses
+                if {c, pa.sma_cross_pos_fmt % c} <= shared
+            ),
+        }
+        return cls(shm.name, rows, 0, layout, meta), shm
+
+    def attach(self) -> PriceAction:
+        """Map the segment read-only, no data is copied. The segment stays mapped
+        as long as the returned ``PriceAction`` is alive
+        """
+        # Before 3.13, attaching registers the segment as if this process owned
+        # it. Processes that share the owner's resource tracker (its children)
+        # are harmless, but a tracker of its own would unlink the segment when
+        # this process exits
+        tracker = getattr(resource_tracker, "_resource_tracker", None)
+        own_tracker = getattr(tracker, "_fd", None) is None
+        shm = shared_memory.SharedMemory(name=self.name)
+        if sys.version_info < (3, 13) and own_tracker:
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+        index = self._readonly(shm, np.int64, self.index_offset)
+        idx = pd.DatetimeIndex(index.view("M8[ns]"))
+        if self.meta["tz"]:
+            idx = idx.tz_localize("UTC").tz_convert(self.meta["tz"])
+        cols = {
+            c.name: self._readonly(shm, np.dtype(c.dtype), c.offset)
+            for c in self.columns
+        }
+        pa = PriceAction._from_meta(  # pylint: disable=W0212
+            self.meta, pd.DataFrame(cols, index=idx, copy=False)
+        )
+        pa.active_smas.update(self.meta["smas"])
+        pa.active_sma_crosses.update(self.meta["sma_crosses"])
+        pa.buffer = shm
+        return pa
+
+    def _readonly(self, shm: shared_memory.SharedMemory, dtype, offset: int):
+        arr = np.ndarray(self.rows, dtype, shm.buf, offset)
+        arr.flags.writeable = False
+        return arr
+
+
+class shared_price_action:  # pylint: disable=C0103
+    """Share a ``PriceAction`` for the duration of a ``with`` block, the segment
+    is released on exit::
+
+        with shared_price_action(pa) as handle:
+            pool.map(run, [handle] * 8)  # workers call handle.attach()
+    """
+
+    def __init__(self, pa: PriceAction, columns: Optional[list[str]] = None):
+        self.handle, self._shm = SharedPriceAction.create(pa, columns)
+
+    def __enter__(self) -> SharedPriceAction:
+        return self.handle
+
+    def __exit__(self, *exc):
+        self._shm.close()
+        self._shm.unlink()
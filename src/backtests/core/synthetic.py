@@ -0,0 +1,198 @@
+import zlib
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from .clock import Clock
+from .price_action import PriceAction
+from ..exceptions import InvalidSyntheticModelError
+
+MODEL_GBM = "gbm"
+MODEL_JUMP = "jump"
+MODEL_REGIME = "regime"
+MODELS_ALLOWED = [MODEL_GBM, MODEL_JUMP, MODEL_REGIME]
+
+# Trading seconds in a year of regular sessions, volatility is scaled by it
+SECONDS_PER_YEAR = 252 * 6.5 * 3600
+
+
+# pylint: disable=R0902
+@dataclass
+class SyntheticClient:
+    """Generates deterministic, realistic looking price action, exactly on the
+    ``Clock`` session schedule (half days & extended hours included).
+    It can be used in place of ``YClient`` for benchmarks and offline tests.
+
+    All of the bars are generated at once with vectorized NumPy operations, and the
+    same (seed, ticker) pair always generates the same bars.
+
+    Args:
+        model(str): "gbm" - geometric brownian motion, "jump" - GBM with Poisson
+            jumps (Merton), "regime" - GBM that switches between ``regimes``
+        seed(int): the base seed, combined with the ticker per generated ticker
+        s0(float): the first open price
+        drift(float): annualized drift
+        vol(float): annualized volatility
+        overnight(float): fraction of the daily variance that happens between
+            sessions (gaps between a session's first open and the last close)
+        jump_intensity(float): average amount of jumps per year
+        jump_mean(float): mean log size of a jump
+        jump_std(float): std of the log size of a jump
+        regimes(tuple): (drift, vol) pair of every regime
+        regime_days(float): average duration of a regime in sessions
+        volume(float): average volume per session
+    """
+
+    model: str = MODEL_GBM
+    seed: int = 0
+    s0: float = 100.0
+    drift: float = 0.07
+    vol: float = 0.2
+    overnight: float = 0.2
+    jump_intensity: float = 4.0
+    jump_mean: float = -0.02
+    jump_std: float = 0.05
+    regimes: tuple[tuple[float, float], ...] = ((0.15, 0.12), (-0.25, 0.35))
+    regime_days: float = 60.0
+    volume: float = 1e6
+
+    def __post_init__(self):
+        if self.model not in MODELS_ALLOWED:
+            raise InvalidSyntheticModelError(
+                f"Model: {self.model} is not supported, "
+                f"supported models are: {', '.join(MODELS_ALLOWED)}"
+            )
+        if self.model == MODEL_REGIME and len(self.regimes) < 2:
+            raise InvalidSyntheticModelError("At least 2 regimes are required")
+
+    def rng(self, ticker: str) -> np.random.Generator:
+        """The RNG of |ticker|, stable across runs and processes"""
+        entropy = [self.seed, zlib.crc32(ticker.encode())]
+        return np.random.default_rng(np.random.SeedSequence(entropy))
+
+    def get_price_action(
+        self,
+        ticker: str,
+        start: datetime,
+        end: datetime,
+        interval: str,
+        extended: bool = False,
+    ) -> PriceAction:
+        """Same as ``YClient.get_price_action``, bars are placed on the schedule of
+        ``Clock(start, end, interval, extended)`` and indexed by their open time
+        """
+        clock = Clock(start, end, interval, extended)
+        return self._price_action(ticker, clock, *clock.bar_times())
+
+    def get_universe(
+        self,
+        tickers: list[str],
+        start: datetime,
+        end: datetime,
+        interval: str,
+        extended: bool = False,
+    ) -> dict[str, PriceAction]:
+        """Generate the price action of every ticker, the schedule is built once"""
+        clock = Clock(start, end, interval, extended)
+        opens, closes = clock.bar_times()
+        return {t: self._price_action(t, clock, opens, closes) for t in tickers}
+
+    def _price_action(
+        self,
+        ticker: str,
+        clock: Clock,
+        opens: pd.DatetimeIndex,
+        closes: pd.DatetimeIndex,
+    ) -> PriceAction:
+        data = self.generate(opens, closes, self.rng(ticker))
+        return PriceAction(
+            ticker=ticker, data=data, start=clock.start, end=clock.end, chunk=None
+        )
+
+    def _regime_params(
+        self, n: int, bars_per_session: float, rng: np.random.Generator
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Per bar (drift, vol) of a Markov regime switching process"""
+        mean_bars = max(self.regime_days * bars_per_session, 1.0)
+        k = int(n / mean_bars) + 16
+        durations = rng.geometric(1 / mean_bars, k)
+        while durations.sum() < n:
+            durations = np.concatenate((durations, rng.geometric(1 / mean_bars, k)))
+        m = len(self.regimes)
+        # Every switch moves to one of the other regimes
+        states = np.cumsum(rng.integers(1, m, len(durations))) % m
+        per_bar = np.repeat(states, durations)[:n]
+        params = np.array(self.regimes, dtype=np.float64)
+        return params[per_bar, 0], params[per_bar, 1]
+
+    def generate(
+        self,
+        opens: pd.DatetimeIndex,
+        closes: pd.DatetimeIndex,
+        rng: Optional[np.random.Generator] = None,
+    ) -> pd.DataFrame:
+        """Generate OHLCV bars for the given bar times
+
+        Return:
+            pd.DataFrame: Open, High, Low, Close & Volume, indexed by |opens|
+        """
+        n = len(opens)
+        if n == 0:  # e.g a weekend or a holiday
+            return pd.DataFrame(
+                {c: np.empty(0) for c in ("Open", "High", "Low", "Close", "Volume")},
+                index=opens,
+            )
+        rng = rng or np.random.default_rng(self.seed)
+        o, c = opens.asi8, closes.asi8
+        dt = (c - o) / 1e9 / SECONDS_PER_YEAR  # in years
+
+        # A new session starts wherever a bar doesn't open at the previous close
+        new_session = np.ones(n, dtype=bool)
+        new_session[1:] = o[1:] != c[:-1]
+        session = np.cumsum(new_session) - 1
+        n_sessions = int(session[-1]) + 1
+
+        if self.model == MODEL_REGIME:
+            mu, sigma = self._regime_params(n, n / max(n_sessions, 1), rng)
+        else:
+            mu, sigma = np.full(n, self.drift), np.full(n, self.vol)
+
+        intraday_var = sigma**2 * (1 - self.overnight)
+        bar_ret = (mu - 0.5 * sigma**2) * dt + np.sqrt(intraday_var * dt) * (
+            rng.standard_normal(n)
+        )
+        gap_std = sigma * np.sqrt(self.overnight / 252)
+        gap = np.where(new_session, gap_std * rng.standard_normal(n), 0.0)
+        gap[0] = 0.0
+        if self.model == MODEL_JUMP:
+            jumps = rng.poisson(self.jump_intensity * dt)
+            bar_ret += jumps * self.jump_mean + np.sqrt(jumps) * self.jump_std * (
+                rng.standard_normal(n)
+            )
+
+        log_close = np.log(self.s0) + np.cumsum(gap + bar_ret)
+        log_open = log_close - bar_ret
+        close, open_ = np.exp(log_close), np.exp(log_open)
+
+        # The wicks scale with the bar's own volatility
+        wick = sigma * np.sqrt(dt) * 0.5
+        high = np.maximum(open_, close) * np.exp(np.abs(rng.standard_normal(n)) * wick)
+        low = np.minimum(open_, close) * np.exp(-np.abs(rng.standard_normal(n)) * wick)
+
+        # U shaped volume through the session
+        last = np.ones(n, dtype=bool)
+        last[:-1] = new_session[1:]
+        sess_open = o[new_session][session]
+        sess_len = (c[last] - o[new_session])[session]
+        pos = (o - sess_open) / sess_len
+        share = (c - o) / sess_len
+        shape = 1 + 0.5 * np.cos(2 * np.pi * pos)
+        noise = rng.lognormal(0, 0.3, n)
+        volume = np.round(self.volume * share * shape * noise)
+
+        return pd.DataFrame(
+            {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+            index=opens,
+        )
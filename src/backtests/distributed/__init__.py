@@ -0,0 +1,15 @@
+from typing import TYPE_CHECKING
+
+from ..lazy import lazy_exports
+
+_EXPORTS = {
+    "queue": ["Job", "JobQueue", "job_id", "PENDING", "RUNNING", "DONE", "FAILED"],
+    "shard": ["grid", "walk_forward", "shards"],
+    "worker": ["Worker", "run_workers", "resolve"],
+}
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .queue import Job, JobQueue, job_id, PENDING, RUNNING, DONE, FAILED
+    from .shard import grid, walk_forward, shards
+    from .worker import Worker, run_workers, resolve
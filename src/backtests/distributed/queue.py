@@ -0,0 +1,278 @@
+"""A durable job queue on a single SQLite file.
+
+Every node that can reach the file (a local disk, or a shared one that supports
+POSIX locks) can run workers. A job is claimed inside an ``IMMEDIATE``
+transaction, so exactly one worker gets it, and the claim is a lease: a worker
+that dies stops renewing it, and once it expires the job is handed to another
+worker. Failed jobs are retried until ``max_attempts`` is reached.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, NamedTuple, Optional, Union
+
+from ..exceptions import JobQueueError
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+STATUSES = [PENDING, RUNNING, DONE, FAILED]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT UNIQUE NOT NULL,
+    fn TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    not_before REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, not_before);
+"""
+
+
+class Job(NamedTuple):
+    id: str
+    fn: str  # "package.module:function"
+    params: dict[str, Any]
+    attempts: int  # including the current one
+
+
+def _default(o):
+    if isinstance(o, (datetime, date)):
+        return {"__datetime__": o.isoformat()}
+    raise TypeError(f"{type(o).__name__} is not JSON serializable")
+
+
+def _object_hook(d: dict):
+    if "__datetime__" in d:
+        return datetime.fromisoformat(d["__datetime__"])
+    return d
+
+
+def encode_params(params: dict[str, Any]) -> str:
+    """JSON of |params|, datetimes are supported"""
+    return json.dumps(params, sort_keys=True, default=_default)
+
+
+def decode_params(params: str) -> dict[str, Any]:
+    return json.loads(params, object_hook=_object_hook)
+
+
+def job_id(fn: str, params: dict[str, Any]) -> str:
+    """The id of a job is derived from its content, so the same job is never
+    queued twice
+    """
+    return hashlib.sha256(f"{fn}|{encode_params(params)}".encode()).hexdigest()[:24]
+
+
+@dataclass
+class JobQueue:
+    """Durable queue of backtest jobs
+
+    Args:
+        path(Union[str, Path]): the SQLite file, created if missing
+        lease_seconds(float): a claimed job is handed to another worker if its
+            lease isn't renewed (``heartbeat()``) within this time
+        max_attempts(int): a job is failed for good after this many attempts
+        retry_delay(float): seconds to wait before retrying a failed job,
+            multiplied by the amount of attempts so far
+    """
+
+    path: Union[str, Path]
+    lease_seconds: float = 60.0
+    max_attempts: int = 3
+    retry_delay: float = 0.0
+
+    # A connection per thread (e.g the worker's heartbeat) and per process
+    _local: threading.local = field(
+        default_factory=threading.local, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self.path = Path(self.path)
+        if self.lease_seconds <= 0:
+            raise JobQueueError("lease_seconds must be positive")
+        if self.max_attempts < 1:
+            raise JobQueueError("max_attempts must be at least 1")
+        self.conn.executescript(_SCHEMA)
+
+    def __getstate__(self):
+        # Connections can't cross processes, every process opens its own
+        return {**self.__dict__, "_local": None}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The connection of the calling thread, SQLite connections can't be
+        shared between threads
+        """
+        local = self._local
+        if getattr(local, "conn", None) is None or local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            local.conn, local.pid = conn, os.getpid()
+        return local.conn
+
+    def close(self):
+        """Close the connection of the calling thread"""
+        local = self._local
+        if getattr(local, "conn", None) is not None and local.pid == os.getpid():
+            local.conn.close()
+        local.conn = None
+
+    # Coordinator
+    def submit(self, fn: str, params: dict[str, Any]) -> str:
+        """Queue a single job, see ``submit_many()``"""
+        return self.submit_many(fn, [params])[0]
+
+    def submit_many(self, fn: str, params: list[dict[str, Any]]) -> list[str]:
+        """Queue a job per params of |params|. Jobs that were already queued
+        (same |fn| & params) are kept as is
+
+        Args:
+            fn(str): "package.module:function" that's importable by the workers,
+                called with the params as kwargs and returns a ``BacktestResult``
+            params(list[dict]): JSON serializable params (datetimes are allowed)
+
+        Return:
+            list[str]: the id of every job
+        """
+        if ":" not in fn:
+            raise JobQueueError(f"fn must be 'module:function', got: {fn}")
+        now = time.time()
+        rows = [(job_id(fn, p), fn, encode_params(p), PENDING, now) for p in params]
+        with self._transaction() as c:
+            c.executemany(
+                "INSERT OR IGNORE INTO jobs (id, fn, params, status, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return [r[0] for r in rows]
+
+    # Workers
+    def claim(self, worker: str) -> Optional[Job]:
+        """Claim the oldest job that's ready, None if there isn't any"""
+        now = time.time()
+        with self._transaction() as c:
+            # Expired leases of jobs that are out of attempts fail for good
+            c.execute(
+                "UPDATE jobs SET status = ?, error = 'lease expired', updated = ? "
+                "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                (FAILED, now, RUNNING, now, self.max_attempts),
+            )
+            row = c.execute(
+                "SELECT id, fn, params, attempts FROM jobs "
+                "WHERE (status = ? AND not_before <= ?) "
+                "OR (status = ? AND lease_until < ?) ORDER BY seq LIMIT 1",
+                (PENDING, now, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            c.execute(
+                "UPDATE jobs SET status = ?, worker = ?, lease_until = ?, "
+                "attempts = attempts + 1, updated = ? WHERE id = ?",
+                (RUNNING, worker, now + self.lease_seconds, now, row[0]),
+            )
+        return Job(row[0], row[1], decode_params(row[2]), row[3] + 1)
+
+    def heartbeat(self, job: str, worker: str) -> bool:
+        """Renew the lease of |job|, False if |worker| doesn't own it anymore"""
+        now = time.time()
+        return self._owned_update(
+            "lease_until = ?, updated = ?", (now + self.lease_seconds, now), job, worker
+        )
+
+    def complete(self, job: str, worker: str) -> bool:
+        """Mark |job| as done, False if |worker| doesn't own it anymore"""
+        return self._owned_update(
+            "status = ?, error = NULL, updated = ?", (DONE, time.time()), job, worker
+        )
+
+    def fail(self, job: str, worker: str, error: str) -> bool:
+        """Report that |job| failed, it's retried unless it ran out of attempts"""
+        now = time.time()
+        return self._owned_update(
+            "status = CASE WHEN attempts < ? THEN ? ELSE ? END, "
+            "not_before = ? + attempts * ?, error = ?, updated = ?",
+            (self.max_attempts, PENDING, FAILED, now, self.retry_delay, error, now),
+            job,
+            worker,
+        )
+
+    def _owned_update(self, sets: str, args: tuple, job: str, worker: str) -> bool:
+        with self._transaction() as c:
+            cur = c.execute(
+                f"UPDATE jobs SET {sets} WHERE id = ? AND worker = ? AND status = ?",
+                (*args, job, worker, RUNNING),
+            )
+        return cur.rowcount == 1
+
+    # Monitoring
+    def counts(self) -> dict[str, int]:
+        """Amount of jobs per status"""
+        ret = dict.fromkeys(STATUSES, 0)
+        for status, n in self.conn.execute(
+            "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+        ):
+            ret[status] = n
+        return ret
+
+    def jobs(self, status: Optional[str] = None) -> list[dict[str, Any]]:
+        """Every job (with the given |status|) as a dict, in submission order"""
+        query = "SELECT id, fn, params, status, attempts, worker, error FROM jobs"
+        args: tuple = ()
+        if status is not None:
+            query, args = query + " WHERE status = ?", (status,)
+        cols = ["id", "fn", "params", "status", "attempts", "worker", "error"]
+        rows = self.conn.execute(query + " ORDER BY seq", args).fetchall()
+        return [{**dict(zip(cols, r)), "params": decode_params(r[2])} for r in rows]
+
+    def is_finished(self) -> bool:
+        counts = self.counts()
+        return counts[PENDING] == 0 and counts[RUNNING] == 0
+
+    def wait(self, timeout: Optional[float] = None, poll: float = 0.5) -> bool:
+        """Block until every job is done or failed, False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_finished():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+        return True
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self.conn)
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` takes the write lock up front, so two workers can't
+    read the same pending job before either of them claims it
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, *_):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,51 @@
+import itertools
+from datetime import datetime, timedelta
+from typing import Any, Optional, Sequence
+
+
+def grid(**axes: Sequence[Any]) -> list[dict[str, Any]]:
+    """The cartesian product of |axes|, e.g
+    ``grid(ticker=["SPY", "QQQ"], fast=[10, 20])`` -> 4 params dicts
+    """
+    names = list(axes)
+    return [dict(zip(names, v)) for v in itertools.product(*axes.values())]
+
+
+def walk_forward(
+    start: datetime,
+    end: datetime,
+    train: timedelta,
+    test: timedelta,
+    step: Optional[timedelta] = None,
+) -> list[dict[str, datetime]]:
+    """Walk forward windows between |start| & |end|: |train| long in sample
+    periods, each followed by a |test| long out of sample period. Windows move by
+    |step| (default |test|)
+
+    Return:
+        list[dict]: train_start, train_end, test_start & test_end per window
+    """
+    step = step or test
+    ret = []
+    t = start
+    while t + train + test <= end:
+        ret.append(
+            {
+                "train_start": t,
+                "train_end": t + train,
+                "test_start": t + train,
+                "test_end": t + train + test,
+            }
+        )
+        t += step
+    return ret
+
+
+def shards(*axes: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Combine params lists (e.g a ``grid()`` & ``walk_forward()`` windows) into
+    every combination of them
+    """
+    return [
+        {k: v for d in combo for k, v in d.items()}
+        for combo in itertools.product(*axes)
+    ]
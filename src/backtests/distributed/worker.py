@@ -0,0 +1,119 @@
+import importlib
+import multiprocessing as mp
+import os
+import socket
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from ..analysis import BacktestResult, ResultsStore
+from ..exceptions import JobQueueError
+from .queue import Job, JobQueue
+
+
+def resolve(fn: str) -> Callable[..., BacktestResult]:
+    """Import "package.module:function" """
+    module, _, name = fn.partition(":")
+    obj = importlib.import_module(module)
+    for attr in name.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+@dataclass
+class Worker:
+    """Pulls jobs from the queue, runs them and puts their results in the store.
+    The result of a job is stored under the job's id before the job is marked as
+    done, so a job that's retried after a crash overwrites the same result
+
+    Args:
+        queue(JobQueue): the queue to pull from
+        store(ResultsStore): where the results go
+        name(optional, str): unique name of the worker, default host:pid
+        poll(float): seconds to sleep while the queue is empty
+        max_jobs(optional, int): exit after running this many jobs
+        exit_when_idle(bool): exit once there's nothing left to claim
+    """
+
+    queue: JobQueue
+    store: ResultsStore
+    name: Optional[str] = None
+    poll: float = 0.5
+    max_jobs: Optional[int] = None
+    exit_when_idle: bool = True
+
+    def __post_init__(self):
+        self.name = self.name or f"{socket.gethostname()}:{os.getpid()}"
+
+    def run(self) -> int:
+        """Run jobs until idle (or ``max_jobs``), return the amount of jobs run"""
+        ran = 0
+        while self.max_jobs is None or ran < self.max_jobs:
+            job = self.queue.claim(self.name)
+            if job is None:
+                if self.exit_when_idle and self.queue.is_finished():
+                    break
+                time.sleep(self.poll)
+                continue
+            self.execute(job)
+            ran += 1
+        return ran
+
+    def execute(self, job: Job) -> bool:
+        """Run a single claimed job, False if it failed"""
+        stop = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job, stop), daemon=True)
+        beat.start()
+        try:
+            result = resolve(job.fn)(**job.params)
+            if not isinstance(result, BacktestResult):
+                raise JobQueueError(
+                    f"{job.fn} returned {type(result).__name__}, not a BacktestResult"
+                )
+            result.name = job.id
+            result.params = {**result.params, "job": job.params}
+            self.store.put(result)
+        except Exception:  # pylint: disable=W0718
+            self.queue.fail(job.id, self.name, traceback.format_exc())
+            return False
+        finally:
+            stop.set()
+            beat.join()
+        self.queue.complete(job.id, self.name)
+        return True
+
+    def _heartbeat(self, job: Job, stop: threading.Event):
+        try:
+            while not stop.wait(self.queue.lease_seconds / 3):
+                if not self.queue.heartbeat(job.id, self.name):
+                    return
+        finally:
+            self.queue.close()  # this thread's connection
+
+
+def _run_worker(queue: JobQueue, store_root: Path, name: str, kwargs: dict) -> int:
+    return Worker(queue, ResultsStore(store_root), name, **kwargs).run()
+
+
+def run_workers(
+    queue: JobQueue, store: Union[ResultsStore, str, Path], n: int, **kwargs
+) -> list[mp.Process]:
+    """Start |n| worker processes (stand-ins for nodes) on this machine. The
+    workers take the keyword arguments of ``Worker``. Join the returned processes
+    to wait for them
+    """
+    root = store.root if isinstance(store, ResultsStore) else Path(store)
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    procs = [
+        mp.Process(
+            target=_run_worker, args=(queue, root, f"{prefix}-worker-{i}", kwargs)
+        )
+        for i in range(n)
+    ]
+    for p in procs:
+        p.start()
+    return procs
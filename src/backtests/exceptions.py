@@ -6,6 +6,10 @@ class IntervalNotSupported(Exception):
     """Raised when the supplied interval is not supported/allowed"""
 
 
+class CalendarNotSupported(Exception):
+    """Raised when the supplied market calendar doesn't exist"""
+
+
 class InvalidIntervalFormat(Exception):
     """Raised when a str representation of a time interval is invalid"""
 
@@ -16,3 +20,51 @@ class IdenticalSMASCantCrossError(Exception):
 
 class EmptyPriceActionError(Exception):
     pass
+
+
+class InvalidLogicError(Exception):
+    """Raised when a ``Logic`` expression is built or evaluated incorrectly"""
+
+
+class InvalidMethodError(Exception):
+    """Raised when a ``Method`` is configured incorrectly"""
+
+
+class InvalidExecutionModelError(Exception):
+    """Raised when an ``ExecutionModel`` is configured incorrectly"""
+
+
+class InvalidRobustnessConfigError(Exception):
+    """Raised when a robustness analysis is configured incorrectly"""
+
+
+class ResultNotFoundError(Exception):
+    """Raised when a result doesn't exist in a results store"""
+
+
+class ProfilerError(Exception):
+    """Raised when profilers are used incorrectly"""
+
+
+class UnsupportedFileFormatError(Exception):
+    """Raised when a file format isn't supported"""
+
+
+class InvalidSyntheticModelError(Exception):
+    """Raised when a synthetic data model is configured incorrectly"""
+
+
+class CheckpointError(Exception):
+    """Raised when checkpointing or resuming a run fails"""
+
+
+class JobQueueError(Exception):
+    """Raised when a job can't be queued, claimed or executed"""
+
+
+class InvalidUniverseError(Exception):
+    """Raised when a cross-sectional universe or its arrays are misaligned"""
+
+
+class ReplayError(Exception):
+    """Raised when a replay stream is misconfigured or doesn't match its consumer"""
@@ -0,0 +1,43 @@
+"""Lazy package exports (PEP 562).
+
+The packages of ``backtests`` re-export their public names, but importing a
+submodule may pull in heavy dependencies (pandas, yfinance, pydantic,
+pandas_market_calendars...). A name is imported from its submodule on first
+access instead, so ``python -m backtests --help`` and worker processes only pay
+for what they use
+"""
+
+import importlib
+import sys
+from collections.abc import Callable
+
+
+def lazy_exports(
+    package: str, exports: dict[str, list[str]]
+) -> tuple[Callable[[str], object], Callable[[], list[str]], list[str]]:
+    """Build the module level ``__getattr__``, ``__dir__`` & ``__all__`` of
+    |package|
+
+    Args:
+        package(str): the ``__name__`` of the package
+        exports(dict[str, list[str]]): submodule (relative to |package|) -> the
+            names it exports
+
+    Example::
+
+        __getattr__, __dir__, __all__ = lazy_exports(__name__, {"clock": ["Clock"]})
+    """
+    where = {name: mod for mod, names in exports.items() for name in names}
+
+    def __getattr__(name: str) -> object:
+        mod = where.get(name)
+        if mod is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(f"{package}.{mod}"), name)
+        setattr(sys.modules[package], name, value)  # next access skips this
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[package])) | set(where))
+
+    return __getattr__, __dir__, list(where)
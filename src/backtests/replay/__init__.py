@@ -0,0 +1,13 @@
+from typing import TYPE_CHECKING
+
+from ..lazy import lazy_exports
+
+_EXPORTS = {
+    "stream": ["BarEvent", "ReplayServer"],
+    "consumer": ["ReplayConsumer", "LatencyReport", "replay"],
+}
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .stream import BarEvent, ReplayServer
+    from .consumer import ReplayConsumer, LatencyReport, replay
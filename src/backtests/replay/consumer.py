@@ -0,0 +1,154 @@
+import asyncio
+import time
+import numpy as np
+import pandas as pd
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, NamedTuple, Optional
+
+from ..exceptions import ReplayError
+from ..trader import Trader
+from ..utils import NS_SECOND, ns_to_index
+from .stream import BarEvent, ReplayServer, read_event, read_handshake
+
+
+class LatencyReport(NamedTuple):
+    """Per bar latencies of a replay, in seconds. ``decision`` is the time from
+    receiving a bar until every trader decided on it, ``lag`` is the time from
+    sending a bar until it was received (it grows if the consumer falls behind)
+    """
+
+    bars: int
+    decision_p50: float
+    decision_p90: float
+    decision_p99: float
+    decision_max: float
+    lag_p50: float
+    lag_p99: float
+    lag_max: float
+
+    def keeps_up(self, budget: float) -> bool:
+        """Does every bar get decided on within |budget| seconds of its close
+        (e.g the bar interval divided by the replay speed)
+        """
+        return self.lag_max + self.decision_max <= budget
+
+    def max_speed(self, interval: float) -> float:
+        """The fastest replay speed (1.0 is real time) the consumer sustains for
+        bars of |interval| seconds: 99% of the bars are received & decided on
+        before the next one closes
+        """
+        per_bar = self.lag_p99 + self.decision_p99
+        return interval / per_bar if per_bar > 0 else float("inf")
+
+
+@dataclass
+class ReplayConsumer:
+    """Drives a ``Trader`` per ticker with the bars of a replay, exactly as a
+    live feed would: the methods are stepped one bar at a time (streaming
+    indicators), and every trader's decision is timed
+
+    Args:
+        traders(Mapping[str, Trader]): ticker -> trader, tickers of the stream
+            without a trader are ignored. Every trader's clock must have the
+            stream's bars
+    """
+
+    traders: Mapping[str, Trader]
+
+    decision_ns: list[int] = field(default_factory=list, init=False)
+    lag_ns: list[int] = field(default_factory=list, init=False)
+    _by_id: list[Optional[Trader]] = field(default_factory=list, init=False)
+    _fields: list[str] = field(default_factory=list, init=False)
+
+    def start(self, handshake: Mapping[str, Any]):
+        """Map the stream's tickers to the traders & reset them"""
+        self._fields = list(handshake["fields"])
+        self._by_id = [self.traders.get(t) for t in handshake["tickers"]]
+        self.decision_ns.clear()
+        self.lag_ns.clear()
+        for t in self.traders.values():
+            if len(t.equity) != handshake["bars"]:
+                raise ReplayError(
+                    f"The clock of {t.ticker} has {len(t.equity)} bars, the stream "
+                    f"has {handshake['bars']}"
+                )
+            if not t.methods:
+                raise ReplayError(f"No methods are registered for {t.ticker}")
+            t.reset()
+            for mw in t.methods:
+                mw.m.reset()
+
+    def on_bar(self, ev: BarEvent):
+        """Step the traders of every ticker in |ev|"""
+        received = time.perf_counter_ns()
+        if ev.sent_ns:
+            self.lag_ns.append(time.time_ns() - ev.sent_ns)
+        fields = self._fields
+        for i, row in zip(ev.tickers.tolist(), ev.values.tolist()):
+            trader = self._by_id[i]
+            if trader is not None:
+                trader.equity[ev.position] = trader.on_bar(dict(zip(fields, row)))
+        # like Trader.run, bars a ticker didn't trade hold its position
+        for trader in self.traders.values():
+            trader.positions[ev.position] = trader.portfolio.shares > 0
+        self.decision_ns.append(time.perf_counter_ns() - received)
+
+    async def consume(self, queue: asyncio.Queue, handshake: Mapping[str, Any]):
+        """Consume the events of ``ReplayServer.stream()`` until None"""
+        self.start(handshake)
+        while (ev := await queue.get()) is not None:
+            self.on_bar(ev)
+
+    async def connect(self, host: str, port: int):
+        """Consume a ``ReplayServer.serve()`` stream until it ends"""
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            hs = await read_handshake(reader)
+            self.start(hs)
+            n_fields = len(self._fields)
+            while (ev := await read_event(reader, n_fields)) is not None:
+                self.on_bar(ev)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    def equity(self) -> pd.DataFrame:
+        """The equity of every trader at the close of every bar, bars a ticker
+        didn't trade hold the previous value (like ``Trader.run``)
+        """
+        ret = {}
+        for ticker, t in self.traders.items():
+            ret[ticker] = pd.Series(t.equity).ffill().fillna(t.cash).to_numpy()
+        t = next(iter(self.traders.values()))
+        index = ns_to_index(t.clock.bar_times_ns()[0], t.clock.tz)
+        return pd.DataFrame(ret, index=index)
+
+    def report(self) -> LatencyReport:
+        d = np.asarray(self.decision_ns, dtype=np.float64) / NS_SECOND
+        lag = np.asarray(self.lag_ns or [0], dtype=np.float64) / NS_SECOND
+        if not len(d):
+            d = np.zeros(1)
+        p50, p90, p99 = np.percentile(d, [50, 90, 99]).tolist()
+        lp50, lp99 = np.percentile(lag, [50, 99]).tolist()
+        return LatencyReport(
+            len(self.decision_ns),
+            p50,
+            p90,
+            p99,
+            float(d.max()),
+            lp50,
+            lp99,
+            float(lag.max()),
+        )
+
+
+async def replay(server: ReplayServer, consumer: ReplayConsumer) -> LatencyReport:
+    """Replay |server|'s stream into |consumer| in this process (through an
+    ``asyncio.Queue``)
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    await asyncio.gather(
+        server.stream(queue), consumer.consume(queue, server.handshake)
+    )
+    return consumer.report()
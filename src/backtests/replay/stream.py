@@ -0,0 +1,195 @@
+"""Replay of a universe's bars, one bar at a time, as a live feed would send them.
+
+The server aligns the price action of every ticker on the ``Clock`` (see
+``Universe``) and emits a ``BarEvent`` per bar of the clock, at the bar's close,
+holding the bars of every ticker that traded during it. Events are paced at
+``speed`` times real time (``None`` sends them as fast as possible), either into
+an ``asyncio.Queue`` (in process) or over TCP to any number of consumers.
+
+The wire format is a length prefixed JSON handshake (tickers, fields & amount of
+bars), followed by one binary frame per bar: a fixed header (``HEADER``), the
+int32 ids of the tickers & their float64 values. A header with ``n == -1`` ends
+the stream.
+"""
+
+import asyncio
+import json
+import struct
+import time
+import numpy as np
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any, NamedTuple, Optional
+
+from ..core import Clock, PriceAction
+from ..exceptions import ReplayError
+from ..strategies.cross_section import FIELDS, Universe
+from ..utils import NS_SECOND, ns_to_index
+
+# position, open_ns, close_ns, sent_ns (wall clock), n (amount of tickers)
+HEADER = struct.Struct("<qqqqi")
+_LEN = struct.Struct("<I")
+END = -1
+
+
+class BarEvent(NamedTuple):
+    position: int  # the position of the bar on the clock
+    open_ns: int
+    close_ns: int
+    sent_ns: int  # time.time_ns() when the event was sent
+    tickers: np.ndarray  # int32 ids (positions in the universe's tickers)
+    values: np.ndarray  # (tickers, fields) float64
+
+
+def encode(ev: BarEvent) -> bytes:
+    header = HEADER.pack(
+        ev.position, ev.open_ns, ev.close_ns, ev.sent_ns, len(ev.tickers)
+    )
+    return b"".join(
+        (
+            header,
+            ev.tickers.astype("<i4", copy=False).tobytes(),
+            ev.values.astype("<f8", copy=False).tobytes(),
+        )
+    )
+
+
+async def read_event(reader: asyncio.StreamReader, n_fields: int) -> Optional[BarEvent]:
+    """The next event on |reader|, None once the stream ended"""
+    pos, o, c, sent, n = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if n == END:
+        return None
+    body = await reader.readexactly(n * 4 + n * n_fields * 8)
+    ids = np.frombuffer(body, "<i4", n)
+    values = np.frombuffer(body, "<f8", n * n_fields, n * 4).reshape(n, n_fields)
+    return BarEvent(pos, o, c, sent, ids, values)
+
+
+async def read_handshake(reader: asyncio.StreamReader) -> dict[str, Any]:
+    (size,) = _LEN.unpack(await reader.readexactly(_LEN.size))
+    return json.loads(await reader.readexactly(size))
+
+
+@dataclass
+class _Pacer:
+    """Sleeps until the (sped up) replay time of every bar's close"""
+
+    speed: Optional[float]
+    max_gap: Optional[float]
+
+    _sim_ns: float = field(default=0.0, init=False)
+    _prev: Optional[int] = field(default=None, init=False)
+    _t0: float = field(default=0.0, init=False)
+
+    async def wait(self, close_ns: int):
+        if self.speed is None:
+            await asyncio.sleep(0)  # let the consumers run
+            return
+        if self._prev is None:
+            self._t0 = time.monotonic()
+        else:
+            gap = close_ns - self._prev
+            if self.max_gap is not None:
+                gap = min(gap, self.max_gap * NS_SECOND)
+            self._sim_ns += gap
+        self._prev = close_ns
+        delay = self._t0 + self._sim_ns / NS_SECOND / self.speed - time.monotonic()
+        await asyncio.sleep(max(delay, 0.0))
+
+
+@dataclass
+class ReplayServer:
+    """Streams the bars of a universe on the clock's schedule
+
+    Args:
+        universe(Universe): the bars, aligned on the clock's bar opens
+        closes(np.ndarray): int64 UTC nanoseconds of the bars' closes
+        speed(optional, float): replay speed, 1.0 is real time, 100.0 is 100x, as
+            fast as possible if None
+        max_gap(optional, float): cap the wait between 2 bars to this many
+            seconds of market time, e.g to skip nights & weekends at 1x
+    """
+
+    universe: Universe
+    closes: np.ndarray
+    speed: Optional[float] = None
+    max_gap: Optional[float] = None
+
+    def __post_init__(self):
+        if len(self.closes) != len(self.universe.index):
+            raise ReplayError("Expected a close time for every bar of the universe")
+        if self.speed is not None and self.speed <= 0:
+            raise ReplayError("speed must be positive")
+
+    @classmethod
+    def from_clock(
+        cls,
+        pas: Mapping[str, PriceAction],
+        clock: Clock,
+        fields: Sequence[str] = FIELDS,
+        **kwargs,
+    ) -> "ReplayServer":
+        """Replay |pas| on the bars of |clock|, takes the keyword arguments of
+        ``ReplayServer``
+        """
+        opens, closes = clock.bar_times_ns()
+        index = ns_to_index(opens, clock.tz)
+        return cls(Universe.from_price_actions(pas, index, fields), closes, **kwargs)
+
+    @property
+    def handshake(self) -> dict[str, Any]:
+        return {
+            "tickers": self.universe.tickers,
+            "fields": list(self.universe.fields),
+            "bars": len(self.closes),
+        }
+
+    def events(self) -> Iterator[BarEvent]:
+        """Every bar's event, unpaced (``sent_ns`` is 0)"""
+        fields = list(self.universe.fields.values())
+        traded = np.zeros(self.universe.shape, dtype=bool)
+        for f in fields:
+            traded |= ~np.isnan(f)
+        opens = self.universe.index
+        for i, close in enumerate(self.closes.tolist()):
+            ids = np.flatnonzero(traded[i]).astype(np.int32)
+            values = np.empty((len(ids), len(fields)))
+            for j, f in enumerate(fields):
+                values[:, j] = f[i, ids]
+            yield BarEvent(i, int(opens[i]), close, 0, ids, values)
+
+    async def _paced(self):
+        pacer = _Pacer(self.speed, self.max_gap)
+        for ev in self.events():
+            await pacer.wait(ev.close_ns)
+            yield ev._replace(sent_ns=time.time_ns())
+
+    async def stream(self, queue: asyncio.Queue):
+        """Put every event into |queue|, then None"""
+        async for ev in self._paced():
+            await queue.put(ev)
+        await queue.put(None)
+
+    async def _send(self, _reader, writer: asyncio.StreamWriter):
+        hs = json.dumps(self.handshake).encode()
+        writer.write(_LEN.pack(len(hs)) + hs)
+        try:
+            async for ev in self._paced():
+                writer.write(encode(ev))
+                await writer.drain()
+            writer.write(HEADER.pack(0, 0, 0, 0, END))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.Server:
+        """Listen on |host|:|port| (0 picks a free port), every connection gets
+        its own replay from the first bar
+        """
+        return await asyncio.start_server(self._send, host, port)
@@ -1,3 +1,65 @@
-from .method import Method
+from typing import TYPE_CHECKING
 
-__all__ = ["Method"]
+from ..lazy import lazy_exports
+
+_EXPORTS = {
+    "cross_section": [
+        "Universe",
+        "rank",
+        "count",
+        "percentile",
+        "zscore",
+        "quantile_buckets",
+        "top_k",
+        "bottom_k",
+        "percentile_filter",
+        "weights",
+        "hold",
+        "turnover",
+        "portfolio_returns",
+    ],
+    "logic": [
+        "Logic",
+        "Expr",
+        "Col",
+        "Const",
+        "Sma",
+        "Compare",
+        "CrossUp",
+        "CrossDown",
+        "CompiledLogic",
+        "compile_logic",
+    ],
+    "method": ["Method", "Trigger", "MethodWeighted"],
+}
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .cross_section import (
+        Universe,
+        rank,
+        count,
+        percentile,
+        zscore,
+        quantile_buckets,
+        top_k,
+        bottom_k,
+        percentile_filter,
+        weights,
+        hold,
+        turnover,
+        portfolio_returns,
+    )
+    from .logic import (
+        Logic,
+        Expr,
+        Col,
+        Const,
+        Sma,
+        Compare,
+        CrossUp,
+        CrossDown,
+        CompiledLogic,
+        compile_logic,
+    )
+    from .method import Method, Trigger, MethodWeighted
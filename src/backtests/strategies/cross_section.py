@@ -0,0 +1,307 @@
+"""Cross-sectional ranking & screening of a universe of tickers.
+
+Momentum & relative strength strategies compare the tickers to each other on
+every bar, rather than each ticker to its own history. A ``Universe`` aligns the
+price action of every ticker into ``(bars, tickers)`` float64 arrays (NaN where a
+ticker has no bar), and the functions below work on whole arrays at once, every
+bar of every ticker in a single numpy call::
+
+    uni = Universe.from_price_actions(client.get_universe(tickers, ...))
+    momentum = uni.returns(20)
+    picks = top_k(momentum, 5) & percentile_filter(uni.field("Volume"), low=0.2)
+    w = hold(weights(picks), every=5)
+    r = portfolio_returns(w, uni.returns(1), cost=0.0005)
+
+NaNs (tickers without a bar, or without enough history) never rank, never get
+selected and never get weight.
+"""
+
+import numpy as np
+import pandas as pd
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+from ..core import PriceAction
+from ..exceptions import InvalidUniverseError
+from ..utils import align_ns, index_to_ns, ns_to_index
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def _as_2d(x) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim != 2:
+        raise InvalidUniverseError(f"Expected a (bars, tickers) array, got {x.shape}")
+    return x
+
+
+@dataclass
+class Universe:
+    """The price action of many tickers, aligned on a single timeline
+
+    Args:
+        tickers(list[str]): the columns of every field
+        index(np.ndarray): int64 UTC nanoseconds of the bars (rows)
+        fields(dict[str, np.ndarray]): name -> ``(bars, tickers)`` float64 array
+        tz(optional, str): the timezone of the bars
+    """
+
+    tickers: list[str]
+    index: np.ndarray
+    fields: dict[str, np.ndarray]
+    tz: Optional[str] = None
+
+    def __post_init__(self):
+        shape = (len(self.index), len(self.tickers))
+        for name, arr in self.fields.items():
+            if arr.shape != shape:
+                raise InvalidUniverseError(
+                    f"Field {name} is {arr.shape}, the universe is {shape}"
+                )
+
+    @classmethod
+    def from_price_actions(
+        cls,
+        pas: Mapping[str, PriceAction],
+        index: Optional[pd.DatetimeIndex] = None,
+        fields: Sequence[str] = FIELDS,
+    ) -> "Universe":
+        """Align the price action of every ticker
+
+        Args:
+            pas(Mapping[str, PriceAction]): ticker -> price action, e.g
+                ``SyntheticClient.get_universe()``
+            index(optional, pd.DatetimeIndex): the bars to align on (e.g the
+                ``Clock``'s bar opens), default the union of all the bars
+            fields(Sequence[str]): the columns to align, any ``PriceAction``
+                column (indicators too) that every ticker has
+
+        Return:
+            Universe: bars missing from a ticker are NaN
+        """
+        if not pas:
+            raise InvalidUniverseError("The universe is empty")
+        tickers = list(pas)
+        if index is None:
+            idx = [pa.data.index for pa in pas.values()]
+            tz = str(idx[0].tz) if idx[0].tz is not None else None
+            ns = np.unique(np.concatenate([index_to_ns(i) for i in idx]))
+        else:
+            tz = str(index.tz) if index.tz is not None else None
+            ns = index_to_ns(index)
+
+        out = {f: np.full((len(ns), len(tickers)), np.nan) for f in fields}
+        for j, t in enumerate(tickers):
+            data = pas[t].data
+            missing = set(fields) - set(data.columns)
+            if missing:
+                raise InvalidUniverseError(f"{t} has no {sorted(missing)} columns")
+            rows = align_ns(index_to_ns(data.index), ns)
+            found = rows >= 0
+            for f in fields:
+                out[f][found, j] = data[f].to_numpy(np.float64)[rows[found]]
+        return cls(tickers, ns, out, tz)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.index), len(self.tickers)
+
+    @property
+    def datetime_index(self) -> pd.DatetimeIndex:
+        return ns_to_index(self.index, self.tz)
+
+    def field(self, name: str) -> np.ndarray:
+        if name not in self.fields:
+            raise InvalidUniverseError(f"The universe has no {name} field")
+        return self.fields[name]
+
+    def frame(self, x) -> pd.DataFrame:
+        """A ``(bars, tickers)`` array (or the name of a field) as a DataFrame"""
+        arr = self.field(x) if isinstance(x, str) else _as_2d(x)
+        return pd.DataFrame(arr, index=self.datetime_index, columns=self.tickers)
+
+    def returns(self, lookback: int = 1, field: str = "Close") -> np.ndarray:
+        """The return of every ticker over the last |lookback| bars, NaN for the
+        first |lookback| bars
+        """
+        if lookback < 1:
+            raise InvalidUniverseError("lookback must be at least 1")
+        price = self.field(field)
+        ret = np.full_like(price, np.nan)
+        ret[lookback:] = price[lookback:] / price[:-lookback] - 1
+        return ret
+
+
+def rank(x, ascending: bool = False) -> np.ndarray:
+    """The rank of every ticker on every bar, 1 is the best. By default the
+    highest value is the best. Ties are ranked by ticker order, NaNs stay NaN
+    """
+    x = _as_2d(x)
+    nan = np.isnan(x)
+    key = np.where(nan, np.inf, x if ascending else -x)
+    order = np.argsort(key, axis=1, kind="stable")
+    ranks = np.empty(x.shape, dtype=np.float64)
+    pos = np.broadcast_to(np.arange(1, x.shape[1] + 1, dtype=np.float64), x.shape)
+    np.put_along_axis(ranks, order, pos, axis=1)
+    ranks[nan] = np.nan
+    return ranks
+
+
+def count(x) -> np.ndarray:
+    """The amount of valid (not NaN) tickers on every bar"""
+    return np.count_nonzero(~np.isnan(_as_2d(x)), axis=1)
+
+
+def _average_rank(x: np.ndarray) -> np.ndarray:
+    """The ascending rank of every ticker on every bar, ties get the average of
+    their ranks (e.g 2.5 for 2 tickers tied at ranks 2 & 3), NaNs stay NaN
+    """
+    nan = np.isnan(x)
+    order = np.argsort(np.where(nan, np.inf, x), axis=1, kind="stable")
+    values = np.take_along_axis(x, order, axis=1)
+    cols = np.arange(x.shape[1])
+    new = np.ones(x.shape, dtype=bool)
+    new[:, 1:] = values[:, 1:] != values[:, :-1]
+    last = np.ones(x.shape, dtype=bool)
+    last[:, :-1] = new[:, 1:]
+    # the first & last (sorted) positions of every ticker's group of ties
+    first = np.maximum.accumulate(np.where(new, cols, 0), axis=1)
+    end = np.minimum.accumulate(np.where(last, cols, x.shape[1])[:, ::-1], axis=1)
+    ranks = np.empty(x.shape, dtype=np.float64)
+    np.put_along_axis(ranks, order, (first + end[:, ::-1]) / 2 + 1, axis=1)
+    ranks[nan] = np.nan
+    return ranks
+
+
+def percentile(x) -> np.ndarray:
+    """The percentile rank of every ticker on every bar: 1 for the highest value,
+    0 for the lowest. Ties share the average of their ranks, a bar with a single
+    valid ticker gets 1
+    """
+    x = _as_2d(x)
+    r = _average_rank(x)
+    n = count(x)[:, None].astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 1, (r - 1) / (n - 1), np.where(np.isnan(r), np.nan, 1.0))
+
+
+def zscore(x) -> np.ndarray:
+    """How many standard deviations every ticker is from the mean of its bar.
+    Bars whose values are all equal get 0
+    """
+    x = _as_2d(x)
+    valid = ~np.isnan(x)
+    n = valid.sum(axis=1, keepdims=True)
+    filled = np.where(valid, x, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = filled.sum(axis=1, keepdims=True) / n
+        dev = np.where(valid, x - mean, 0.0)
+        std = np.sqrt((dev**2).sum(axis=1, keepdims=True) / n)
+        z = np.where(std > 0, dev / std, 0.0)
+    z[~valid] = np.nan
+    return z
+
+
+def quantile_buckets(x, q: int) -> np.ndarray:
+    """The quantile bucket of every ticker on every bar, 0 (lowest values) to
+    |q| - 1 (highest values), -1 for NaN. Returns an int array
+    """
+    if q < 1:
+        raise InvalidUniverseError("q must be at least 1")
+    p = percentile(x)
+    buckets = np.minimum(np.floor(np.nan_to_num(p, nan=0.0) * q), q - 1)
+    return np.where(np.isnan(p), -1, buckets).astype(np.int64)
+
+
+def top_k(x, k: int, ascending: bool = False) -> np.ndarray:
+    """Boolean mask of the |k| best tickers of every bar (the highest values, or
+    the lowest if |ascending|). Bars with fewer valid tickers select all of them
+    """
+    if k < 0:
+        raise InvalidUniverseError("k can't be negative")
+    return rank(x, ascending) <= k
+
+
+def bottom_k(x, k: int) -> np.ndarray:
+    """Boolean mask of the |k| lowest values of every bar"""
+    return top_k(x, k, ascending=True)
+
+
+def percentile_filter(x, low: float = 0.0, high: float = 1.0) -> np.ndarray:
+    """Boolean mask of the tickers whose percentile rank is within [|low|, |high|]
+    on every bar, e.g ``low=0.2`` drops the bottom 20%
+    """
+    if not 0 <= low <= high <= 1:
+        raise InvalidUniverseError("Expected 0 <= low <= high <= 1")
+    p = percentile(x)
+    return (p >= low) & (p <= high)
+
+
+def weights(
+    mask, scores=None, inverse_vol=None, gross: float = 1.0, cap: float = 1.0
+) -> np.ndarray:
+    """Position sizes of the selected tickers on every bar
+
+    Args:
+        mask(np.ndarray): boolean ``(bars, tickers)`` selection (e.g ``top_k()``)
+        scores(optional, np.ndarray): weigh by these (only the positive part),
+            default equal weights
+        inverse_vol(optional, np.ndarray): weigh by one over this volatility,
+            multiplies |scores| if both are given
+        gross(float): the sum of the weights of every bar that selects anything,
+            negative for short books
+        cap(float): the maximum fraction of |gross| a single ticker gets, the
+            excess is left in cash
+
+    Return:
+        np.ndarray: ``(bars, tickers)`` weights, 0 for unselected tickers
+    """
+    mask = np.asarray(mask, dtype=bool)
+    raw = mask.astype(np.float64)
+    if scores is not None:
+        raw *= np.clip(np.nan_to_num(_as_2d(scores), nan=0.0), 0.0, None)
+    if inverse_vol is not None:
+        vol = _as_2d(inverse_vol)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv = np.where(vol > 0, 1.0 / vol, 0.0)
+        raw *= np.nan_to_num(inv, nan=0.0)
+    total = raw.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w = np.where(total > 0, raw / total, 0.0)
+    return np.minimum(w, cap) * gross
+
+
+def hold(w, every: int = 1, offset: int = 0) -> np.ndarray:
+    """Rebalance only every |every| bars (starting at bar |offset|), the weights
+    are held in between. Bars before the first rebalance hold nothing
+    """
+    w = _as_2d(w)
+    if every < 1:
+        raise InvalidUniverseError("every must be at least 1")
+    bars = np.arange(len(w))
+    rebalance = (bars >= offset) & ((bars - offset) % every == 0)
+    src = np.maximum.accumulate(np.where(rebalance, bars, -1))
+    ret = w[np.maximum(src, 0)]
+    ret[src < 0] = 0.0
+    return ret
+
+
+def turnover(w) -> np.ndarray:
+    """The traded fraction of the book on every bar (the first bar buys in)"""
+    w = _as_2d(w)
+    prev = np.vstack([np.zeros((1, w.shape[1])), w[:-1]])
+    return np.abs(w - prev).sum(axis=1)
+
+
+def portfolio_returns(w, returns, cost: float = 0.0) -> np.ndarray:
+    """Per bar returns of a book that sets the weights |w| at the close of every
+    bar and earns |returns| over the next bar. |cost| is charged per unit of
+    turnover. Missing returns (NaN) earn nothing
+    """
+    w, returns = _as_2d(w), _as_2d(returns)
+    if w.shape != returns.shape:
+        raise InvalidUniverseError(f"weights {w.shape} != returns {returns.shape}")
+    held = np.vstack([np.zeros((1, w.shape[1])), w[:-1]])
+    gross = (held * np.nan_to_num(returns, nan=0.0)).sum(axis=1)
+    return gross - cost * turnover(w)
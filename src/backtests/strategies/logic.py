@@ -0,0 +1,449 @@
+"""A tiny expression layer that is used to build ``Logic`` conditions.
+
+Conditions are built out of column references, comparisons, crosses and boolean
+combinators, e.g.::
+
+    fast, slow = Sma(50), Sma(100)
+    logic = CrossUp(fast, slow) & (Col("Close") > Sma(200))
+
+Every node is a frozen dataclass, so identical sub-expressions compare (and hash)
+equal. That allows ``compile_logic`` to deduplicate them and evaluate each one
+exactly once, vectorized over the whole ``PriceAction``, instead of checking the
+condition bar by bar.
+
+The same program can also be stepped bar by bar (``CompiledLogic.step``) for
+streaming runs. The nodes that need history (SMAs, crosses) then keep it in a
+small float64 state array, which is what gets checkpointed.
+"""
+
+import math
+import operator
+import numpy as np
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Union, ClassVar, Optional
+
+from ..core import PriceAction
+from ..exceptions import InvalidLogicError
+from ..telemetry.profiling import profiled
+
+Number = Union[int, float]
+# The values of a single bar, column name -> value
+Row = Mapping[str, float]
+
+
+class Expr:
+    """Base class of every node that evaluates to a numeric array"""
+
+    def children(self) -> tuple["Expr", ...]:
+        """The nodes this node depends on"""
+        return ()
+
+    def compute(self, pa: PriceAction, args: list[np.ndarray]) -> np.ndarray:
+        """Compute this node given the already computed values of ``children()``"""
+        raise NotImplementedError
+
+    def init_state(self) -> Optional[np.ndarray]:
+        """The initial streaming state of the node, None if it's stateless"""
+        return None
+
+    def step(self, row: Row, args: list[float], state: Optional[np.ndarray]) -> float:
+        """Compute this node for a single bar, |state| is updated in place"""
+        raise NotImplementedError
+
+    # Comparisons produce ``Logic``. ``==``/``!=`` are deliberately not overloaded
+    # since the nodes must stay hashable, use ``Compare(a, "==", b)`` instead.
+    def __gt__(self, other: Union["Expr", Number]) -> "Compare":
+        return Compare(self, ">", _wrap(other))
+
+    def __ge__(self, other: Union["Expr", Number]) -> "Compare":
+        return Compare(self, ">=", _wrap(other))
+
+    def __lt__(self, other: Union["Expr", Number]) -> "Compare":
+        return Compare(self, "<", _wrap(other))
+
+    def __le__(self, other: Union["Expr", Number]) -> "Compare":
+        return Compare(self, "<=", _wrap(other))
+
+    # Arithmetic produces another ``Expr``
+    def __add__(self, other: Union["Expr", Number]) -> "BinOp":
+        return BinOp(self, "+", _wrap(other))
+
+    def __sub__(self, other: Union["Expr", Number]) -> "BinOp":
+        return BinOp(self, "-", _wrap(other))
+
+    def __mul__(self, other: Union["Expr", Number]) -> "BinOp":
+        return BinOp(self, "*", _wrap(other))
+
+    def __truediv__(self, other: Union["Expr", Number]) -> "BinOp":
+        return BinOp(self, "/", _wrap(other))
+
+    def __radd__(self, other: Number) -> "BinOp":
+        return BinOp(_wrap(other), "+", self)
+
+    def __rsub__(self, other: Number) -> "BinOp":
+        return BinOp(_wrap(other), "-", self)
+
+    def __rmul__(self, other: Number) -> "BinOp":
+        return BinOp(_wrap(other), "*", self)
+
+    def __rtruediv__(self, other: Number) -> "BinOp":
+        return BinOp(_wrap(other), "/", self)
+
+
+def _wrap(v: Union[Expr, Number]) -> Expr:
+    if isinstance(v, Expr):
+        return v
+    if isinstance(v, (int, float)):
+        return Const(float(v))
+    raise InvalidLogicError(f"Can't use {v!r} of type {type(v)} in an expression")
+
+
+@dataclass(frozen=True, eq=True)
+class Col(Expr):
+    """Reference to a column of ``PriceAction.data`` (e.g. "Close")"""
+
+    name: str
+
+    def compute(self, pa: PriceAction, args: list[np.ndarray]) -> np.ndarray:
+        if self.name not in pa.data.columns:
+            raise InvalidLogicError(
+                f"Column: {self.name} doesn't exist in the price action of {pa.ticker}"
+            )
+        return pa.data[self.name].to_numpy(dtype=np.float64)
+
+    def step(self, row: Row, args: list[float], state: Optional[np.ndarray]) -> float:
+        try:
+            return float(row[self.name])
+        except KeyError as e:
+            raise InvalidLogicError(f"Column: {self.name} doesn't exist") from e
+
+
+@dataclass(frozen=True, eq=True)
+class Const(Expr):
+    """A constant scalar value"""
+
+    value: float
+
+    def compute(self, pa: PriceAction, args: list[np.ndarray]) -> np.ndarray:
+        return np.full(len(pa.data), self.value, dtype=np.float64)
+
+    def step(self, row: Row, args: list[float], state: Optional[np.ndarray]) -> float:
+        return self.value
+
+
+@dataclass(frozen=True, eq=True)
+class Sma(Expr):
+    """The SMA of the close price, registered through ``PriceAction.get_sma``"""
+
+    period: int
+
+    def compute(self, pa: PriceAction, args: list[np.ndarray]) -> np.ndarray:
+        return pa.get_sma(self.period).sma.to_numpy(dtype=np.float64)
+
+    def init_state(self) -> np.ndarray:
+        # [seen, sum, NaNs in the window, ring buffer...]
+        return np.zeros(self.period + 3, dtype=np.float64)
+
+    def step(self, row: Row, args: list[float], state: Optional[np.ndarray]) -> float:
+        assert state is not None
+        close = float(row["Close"])
+        seen = int(state[0])
+        slot = 3 + seen % self.period
+        # NaNs are counted instead of summed, so the SMA recovers (like the
+        # rolling mean) once they leave the window
+        old = state[slot]
+        if math.isnan(old):
+            state[2] -= 1
+        else:
+            state[1] -= old
+        if math.isnan(close):
+            state[2] += 1
+        else:
+            state[1] += close
+        state[slot] = close
+        state[0] = seen + 1
+        if seen + 1 < self.period or state[2] > 0:
+            return math.nan
+        return state[1] / self.period
+
+
+@dataclass(frozen=True, eq=True)
+class BinOp(Expr):
+    """Arithmetic between 2 expressions"""
+
+    left: Expr
+    op: str
+    right: Expr
+
+    ops: ClassVar[dict[str, Callable]] = {
+        "+": np.add,
+        "-": np.subtract,
+        "*": np.multiply,
+        "/": np.divide,
+    }
+
+    def __post_init__(self):
+        if self.op not in self.ops:
+            raise InvalidLogicError(f"Operator: {self.op} is not supported")
+
+    def children(self) -> tuple[Expr, ...]:
+        return (self.left, self.right)
+
+    def compute(self, pa: PriceAction, args: list[np.ndarray]) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.ops[self.op](args[0], args[1])
+
+    def step(self, row: Row, args: list[float], state: Optional[np.ndarray]) -> float:
+        a, b = args
+        if self.op == "/" and b == 0:
+            # Same as the vectorized (NumPy) division
+            return math.nan if a == 0 or math.isnan(a) else math.copysign(math.inf, a)
+        return _SCALAR_OPS[self.op](a, b)
+
+
+_SCALAR_OPS: dict[str, Callable[[float, float], float]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+
+
+class Logic(Expr):
+    """Base class of every node that evaluates to a boolean array.
+    This is the actual core building block of a method. Logics can be combined
+    using ``&``, ``|`` and ``~``
+    """
+
+    def __and__(self, other: "Logic") -> "And":
+        return And(self, _check_logic(other))
+
+    def __or__(self, other: "Logic") -> "Or":
+        return Or(self, _check_logic(other))
+
+    def __invert__(self) -> "Not":
+        return Not(self)
+
+    def evaluate(self, pa: PriceAction) -> np.ndarray:
+        """Evaluate the logic over every bar of |pa|"""
+        return compile_logic([self]).evaluate(pa)[0]
+
+    def is_true(self, pa: PriceAction) -> bool:
+        """Runs the logic, True if it's applied to the last bar of |pa|"""
+        res = self.evaluate(pa)
+        return bool(res[-1]) if len(res) else False
+
+
+def _check_logic(v: object) -> Logic:
+    if not isinstance(v, Logic):
+        raise InvalidLogicError(f"Can't combine a Logic with {v!r}")
+    return v
+
+
+@dataclass(frozen=True, eq=True)
+class Compare(Logic):
+    """Compare 2 expressions. NaNs always compare as False"""
+
+    left: Expr
+    op: str
+    right: Expr
+
+    ops: ClassVar[dict[str, Callable]] = {
+        ">": operator.gt,
+        ">=": operator.ge,
+        "<": operator.lt,
+        "<=": operator.le,
+        "==": operator.eq,
+        "!=": operator.ne,
+    }
+
+    def __post_init__(self):
+        if self.op not in self.ops:
+            raise InvalidLogicError(f"Operator: {self.op} is not supported")
+
+    def children(self) -> tuple[Expr, ...]:
+        return (self.left, self.right)
+
+    def compute(self, pa: PriceAction, args: list[np.ndarray]) -> np.ndarray:
+        res = self.ops[self.op](args[0], args[1])
+        if self.op == "!=":
+            res &= ~(np.isnan(args[0]) | np.isnan(args[1]))
+        return res
+
+    def step(self, row: Row, args: list[float], state: Optional[np.ndarray]) -> float:
+        a, b = args
+        if self.op == "!=" and (math.isnan(a) or math.isnan(b)):
+            return False
+        return self.ops[self.op](a, b)
+
+
+@dataclass(frozen=True, eq=True)
+class CrossUp(Logic):
+    """True on the bars where |left| crosses above |right|"""
+
+    left: Expr
+    right: Expr
+
+    def children(self) -> tuple[Expr, ...]:
+        return (self.left, self.right)
+
+    def compute(self, pa: PriceAction, args: list[np.ndarray]) -> np.ndarray:
+        above = args[0] > args[1]
+        below = args[0] <= args[1]  # NaN is neither above nor below
+        ret = np.zeros(len(above), dtype=bool)
+        ret[1:] = above[1:] & below[:-1]
+        return ret
+
+    def init_state(self) -> np.ndarray:
+        return np.zeros(1, dtype=np.float64)  # [was below on the previous bar]
+
+    def step(self, row: Row, args: list[float], state: Optional[np.ndarray]) -> float:
+        assert state is not None
+        ret = bool(state[0]) and args[0] > args[1]
+        state[0] = args[0] <= args[1]
+        return ret
+
+
+@dataclass(frozen=True, eq=True)
+class CrossDown(Logic):
+    """True on the bars where |left| crosses below |right|"""
+
+    left: Expr
+    right: Expr
+
+    def children(self) -> tuple[Expr, ...]:
+        return (self.left, self.right)
+
+    def compute(self, pa: PriceAction, args: list[np.ndarray]) -> np.ndarray:
+        below = args[0] < args[1]
+        above = args[0] >= args[1]
+        ret = np.zeros(len(below), dtype=bool)
+        ret[1:] = below[1:] & above[:-1]
+        return ret
+
+    def init_state(self) -> np.ndarray:
+        return np.zeros(1, dtype=np.float64)  # [was above on the previous bar]
+
+    def step(self, row: Row, args: list[float], state: Optional[np.ndarray]) -> float:
+        assert state is not None
+        ret = bool(state[0]) and args[0] < args[1]
+        state[0] = args[0] >= args[1]
+        return ret
+
+
+@dataclass(frozen=True, eq=True)
+class And(Logic):
+    left: Logic
+    right: Logic
+
+    def children(self) -> tuple[Expr, ...]:
+        return (self.left, self.right)
+
+    def compute(self, pa: PriceAction, args: list[np.ndarray]) -> np.ndarray:
+        return args[0] & args[1]
+
+    def step(self, row: Row, args: list[float], state: Optional[np.ndarray]) -> float:
+        return bool(args[0]) and bool(args[1])
+
+
+@dataclass(frozen=True, eq=True)
+class Or(Logic):
+    left: Logic
+    right: Logic
+
+    def children(self) -> tuple[Expr, ...]:
+        return (self.left, self.right)
+
+    def compute(self, pa: PriceAction, args: list[np.ndarray]) -> np.ndarray:
+        return args[0] | args[1]
+
+    def step(self, row: Row, args: list[float], state: Optional[np.ndarray]) -> float:
+        return bool(args[0]) or bool(args[1])
+
+
+@dataclass(frozen=True, eq=True)
+class Not(Logic):
+    logic: Logic
+
+    def children(self) -> tuple[Expr, ...]:
+        return (self.logic,)
+
+    def compute(self, pa: PriceAction, args: list[np.ndarray]) -> np.ndarray:
+        return ~args[0]
+
+    def step(self, row: Row, args: list[float], state: Optional[np.ndarray]) -> float:
+        return not args[0]
+
+
+@dataclass
+class CompiledLogic:
+    """A flat, deduplicated evaluation program of one or more ``Logic`` trees.
+
+    Args:
+        roots(list[Logic]): the logics that were compiled, ``evaluate`` returns
+            their results in the same order
+        program(list[Expr]): every unique node, ordered so that each node comes
+            after all of its children
+    """
+
+    roots: list[Logic]
+    program: list[Expr]
+
+    def __post_init__(self):
+        pos = {node: i for i, node in enumerate(self.program)}
+        self._args = [tuple(pos[c] for c in n.children()) for n in self.program]
+        self._roots = [pos[r] for r in self.roots]
+
+    @profiled("logic.evaluate")
+    def evaluate(self, pa: PriceAction) -> list[np.ndarray]:
+        """Evaluate the whole program over |pa| in one pass. Every unique node is
+        computed once and shared by all of its parents
+
+        Return:
+            list[np.ndarray]: a boolean array per root, aligned with ``pa.data``
+        """
+        values: dict[Expr, np.ndarray] = {}
+        for node in self.program:
+            args = [values[c] for c in node.children()]
+            values[node] = node.compute(pa, args)
+        return [values[r].astype(bool, copy=False) for r in self.roots]
+
+    def init_states(self) -> list[Optional[np.ndarray]]:
+        """Fresh streaming states of every node of the program"""
+        return [node.init_state() for node in self.program]
+
+    def step(self, row: Row, states: list[Optional[np.ndarray]]) -> list[bool]:
+        """Evaluate the program for a single bar, advancing |states| in place.
+        Stepping over every bar gives the same results as ``evaluate``
+        """
+        values: list[float] = []
+        for node, args, state in zip(self.program, self._args, states):
+            values.append(node.step(row, [values[i] for i in args], state))
+        return [bool(values[i]) for i in self._roots]
+
+
+def compile_logic(logics: Iterable[Logic]) -> CompiledLogic:
+    """Flatten |logics| into a single ``CompiledLogic``, deduplicating common
+    sub-expressions across all of them
+    """
+    roots = [_check_logic(lg) for lg in logics]
+    program: list[Expr] = []
+    seen: set[Expr] = set()
+
+    # Iterative post-order traversal, deep trees shouldn't hit the recursion limit
+    for root in roots:
+        stack: list[tuple[Expr, bool]] = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in seen:
+                continue
+            if expanded:
+                seen.add(node)
+                program.append(node)
+                continue
+            stack.append((node, True))
+            for child in reversed(node.children()):
+                if child not in seen:
+                    stack.append((child, False))
+    return CompiledLogic(roots, program)
@@ -1,32 +1,118 @@
-from pydantic import BaseModel
-from dataclasses import dataclass
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Optional
 
-
-@dataclass
-class Logic:
-    pass
-
-    def is_true(self) -> bool:
-        """Runs the logic"""
-        return self.__sizeof__() != 0
+from ..core import PriceAction
+from ..exceptions import InvalidMethodError
+from ..telemetry.profiling import profiled
+from .logic import Logic, CompiledLogic, Row, compile_logic
 
 
-@dataclass
+@dataclass(frozen=True)
 class Trigger:
+    """A weighted ``Logic``, when the logic is True on a bar, the trigger adds its
+    weight to the method's signal on that bar
+    """
+
     weight: int
+    logic: Logic
+
+    def __post_init__(self):
+        if self.weight <= 0:
+            raise InvalidMethodError(f"Trigger weight must be positive: {self.weight}")
 
 
 @dataclass
-class Method(BaseModel):
+class Method:
+    """A set of triggers that are evaluated together over a price action.
+    All the triggers' logics are compiled into a single program, so common
+    sub-expressions between triggers are only computed once
+
+    Args:
+        ticker(str): the ticker the method runs on
+        timed(bool): is this method requiring some timeframe to inspect the
+            price action
+        conditioned(bool): is this method requiring some condition to be met
+        triggers(list[Trigger]): the registered triggers
+    """
+
     ticker: str
     timed: bool
     conditioned: bool
+    triggers: list[Trigger] = field(default_factory=list)
+
+    _compiled: Optional[CompiledLogic] = field(default=None, init=False, repr=False)
+    _states: Optional[list[Optional[np.ndarray]]] = field(
+        default=None, init=False, repr=False
+    )
 
     def __post_init__(self):
-        self.triggers: set[Trigger]
+        if not (self.timed or self.conditioned):
+            raise InvalidMethodError(
+                "Either `timed` and/or `conditioned` is required to be True"
+            )
 
     def register_trigger(self, t: Trigger):
-        self.triggers.add(t)
+        self.triggers.append(t)
+        self._compiled = None
+        self._states = None
+
+    @property
+    def total_weight(self) -> int:
+        return sum(t.weight for t in self.triggers)
+
+    def compile(self) -> CompiledLogic:
+        """Compile all the triggers' logics, the result is cached until a new
+        trigger is registered
+        """
+        if self._compiled is None:
+            self._compiled = compile_logic(t.logic for t in self.triggers)
+        return self._compiled
+
+    @profiled("method.signals")
+    def signals(self, pa: PriceAction) -> np.ndarray:
+        """Evaluate every trigger over |pa|
+
+        Return:
+            np.ndarray: array of shape (triggers, bars), holding the trigger's
+                weight on bars where its logic is True and 0 otherwise
+        """
+        if not self.triggers:
+            return np.zeros((0, len(pa.data)), dtype=np.float64)
+        masks = np.vstack(self.compile().evaluate(pa))
+        weights = np.array([t.weight for t in self.triggers], dtype=np.float64)
+        return masks * weights[:, None]
+
+    @profiled("method.trigger")
+    def trigger(self, pa: PriceAction) -> np.ndarray:
+        """The percentage (0.0 - 1.0) of the total weight that was triggered on
+        each bar of |pa|
+        """
+        if not self.triggers:
+            raise InvalidMethodError(f"No triggers are registered for {self.ticker}")
+        return self.signals(pa).sum(axis=0) / self.total_weight
+
+    @property
+    def states(self) -> list[Optional[np.ndarray]]:
+        """The streaming states of the compiled program (see ``step()``)"""
+        if self._states is None:
+            self._states = self.compile().init_states()
+        return self._states
+
+    def reset(self):
+        """Forget everything that was streamed so far"""
+        self._states = None
+
+    def step(self, row: Row) -> float:
+        """Streaming version of ``trigger()``: the percentage of the total weight
+        that was triggered on the single bar |row|. Bars must be stepped in order
+        """
+        if not self.triggers:
+            raise InvalidMethodError(f"No triggers are registered for {self.ticker}")
+        fired = self.compile().step(row, self.states)
+        return sum(t.weight for t, f in zip(self.triggers, fired) if f) / (
+            self.total_weight
+        )
 
 
 @dataclass
@@ -0,0 +1,24 @@
+from .progress import (
+    Telemetry,
+    ProgressSnapshot,
+    Sink,
+    ConsoleProgress,
+    JsonLinesSink,
+    format_progress,
+    read_json_lines,
+)
+from .profiling import Profiler, profiled, profile_block, active_profiler
+
+__all__ = [
+    "Telemetry",
+    "ProgressSnapshot",
+    "Sink",
+    "ConsoleProgress",
+    "JsonLinesSink",
+    "format_progress",
+    "read_json_lines",
+    "Profiler",
+    "profiled",
+    "profile_block",
+    "active_profiler",
+]
@@ -0,0 +1,194 @@
+"""Opt-in profiling hooks of the data, clock, indicator & method layers.
+
+The hooks (``@profiled`` and ``profile_block``) are always in place, but while
+no ``Profiler`` is active they cost a single global lookup per call. Activate a
+profiler to collect call counts, timings and allocations::
+
+    with Profiler(track_memory=True) as prof:
+        smas_cross()
+    print(prof.report())
+    prof.dump_collapsed("run.folded")  # flamegraph.pl / speedscope compatible
+"""
+
+import functools
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, TypeVar, Union, ContextManager
+
+from ..exceptions import ProfilerError
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+F = TypeVar("F", bound=Callable)
+
+# The currently active profiler, None means profiling is disabled
+_active: Optional["Profiler"] = None
+_NULL = nullcontext()
+
+
+@dataclass
+class _Stats:
+    durations: list[float] = field(default_factory=list)
+    net_bytes: int = 0
+
+
+class _Frame:
+    __slots__ = ("name", "start", "mem", "children")
+
+    def __init__(self, name: str, start: float, mem: int):
+        self.name = name
+        self.start = start
+        self.mem = mem
+        self.children = 0.0
+
+
+# pylint: disable=R0902
+@dataclass
+class Profiler:
+    """Collects the timings of all the profiled hooks while it's active.
+    Only a single profiler can be active at a time
+
+    Args:
+        track_memory(bool): also track the net bytes allocated by every hook,
+            using ``tracemalloc``. This slows down the run considerably
+    """
+
+    track_memory: bool = False
+
+    stats: dict[str, _Stats] = field(default_factory=dict, init=False)
+    # Self time (seconds) per stack of hooks, e.g "run;get_sma" -> 0.2
+    stacks: dict[str, float] = field(default_factory=dict, init=False)
+    _local: threading.local = field(default_factory=threading.local, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+    _started_tracing: bool = field(default=False, init=False)
+
+    def _stack(self) -> list[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def record(self, name: str) -> Iterator[None]:
+        """Record a single call of the hook |name|"""
+        stack = self._stack()
+        mem = tracemalloc.get_traced_memory()[0] if self.track_memory else 0
+        frame = _Frame(name, time.perf_counter(), mem)
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame.start
+            net = tracemalloc.get_traced_memory()[0] - mem if self.track_memory else 0
+            path = ";".join(f.name for f in stack)
+            stack.pop()
+            if stack:
+                stack[-1].children += elapsed
+            with self._lock:
+                st = self.stats.setdefault(name, _Stats())
+                st.durations.append(elapsed)
+                st.net_bytes += net
+                self.stacks[path] = self.stacks.get(path, 0.0) + (
+                    elapsed - frame.children
+                )
+
+    def start(self):
+        global _active  # pylint: disable=W0603
+        if _active is not None:
+            raise ProfilerError("Another profiler is already active")
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _active = self
+
+    def stop(self):
+        global _active  # pylint: disable=W0603
+        if _active is self:
+            _active = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def report(self) -> "pd.DataFrame":
+        """Per hook summary, sorted by the cumulative time (seconds)"""
+        # Imported here, the hooks are imported by every layer (and CLI start up)
+        import numpy as np  # pylint: disable=C0415
+        import pandas as pd  # pylint: disable=C0415,W0621
+
+        rows = []
+        for name, st in self.stats.items():
+            d = np.asarray(st.durations)
+            p50, p90, p99 = np.percentile(d, [50, 90, 99])
+            rows.append(
+                {
+                    "name": name,
+                    "calls": len(d),
+                    "total": d.sum(),
+                    "mean": d.mean(),
+                    "p50": p50,
+                    "p90": p90,
+                    "p99": p99,
+                    "max": d.max(),
+                    "net_bytes": st.net_bytes,
+                }
+            )
+        cols = ["calls", "total", "mean", "p50", "p90", "p99", "max", "net_bytes"]
+        if not rows:
+            return pd.DataFrame(columns=cols, index=pd.Index([], name="name"))
+        df = pd.DataFrame(rows).set_index("name")
+        return df.sort_values("total", ascending=False)
+
+    def collapsed(self) -> list[str]:
+        """The self time of every stack in the "collapsed stacks" format that's
+        used by flamegraph.pl & speedscope, in microseconds
+        """
+        return [f"{path} {round(t * 1e6)}" for path, t in sorted(self.stacks.items())]
+
+    def dump_collapsed(self, path: Union[str, Path]):
+        Path(path).write_text("\n".join(self.collapsed()) + "\n", encoding="utf-8")
+
+
+def active_profiler() -> Optional[Profiler]:
+    return _active
+
+
+def profile_block(name: str) -> ContextManager[None]:
+    """Profile the block under |name|, does nothing if no profiler is active"""
+    prof = _active
+    if prof is None:
+        return _NULL
+    return prof.record(name)
+
+
+def profiled(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator that profiles every call of the function under |name| (default
+    is the function's qualified name)
+    """
+
+    def deco(f: F) -> F:
+        label = name or f.__qualname__
+
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            prof = _active
+            if prof is None:
+                return f(*args, **kwargs)
+            with prof.record(label):
+                return f(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return deco
@@ -0,0 +1,220 @@
+"""Live progress & throughput telemetry of a run.
+
+The hot path only increments counters (``advance()``) and accumulates stage
+timings (``stage()``). Snapshots are taken and published to the sinks by a
+background daemon thread, so the run itself never formats or writes anything.
+"""
+
+import io
+import json
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import NamedTuple, Optional, TextIO, Union
+
+try:
+    from tqdm import tqdm
+except ImportError:  # tqdm is optional, fallback to a plain progress bar
+    tqdm = None
+
+# The stages that are always reported, even if no time was spent in them. fetch
+# is timed by the caller (the data download), the others by ``Trader.run``
+STAGES = ("fetch", "align", "compile", "signal", "simulation")
+
+
+class ProgressSnapshot(NamedTuple):
+    total: int
+    processed: int
+    elapsed: float  # seconds since the run started
+    rate: float  # bars per second
+    eta: Optional[float]  # seconds until done, None if unknown
+    stages: dict[str, float]  # seconds spent in each stage
+
+    def as_dict(self) -> dict:
+        return self._asdict()
+
+
+class Sink:
+    """Receives the published snapshots"""
+
+    def publish(self, snap: ProgressSnapshot):
+        raise NotImplementedError
+
+    def close(self, snap: ProgressSnapshot):
+        """Called once with the final snapshot"""
+        self.publish(snap)
+
+
+@dataclass
+class ConsoleProgress(Sink):
+    """A console progress bar, uses ``tqdm`` if it's installed
+
+    Args:
+        desc(str): the description of the bar
+        stream(TextIO): where to write the bar to, default is stderr
+        width(int): width of the fallback bar
+    """
+
+    desc: str = "backtest"
+    stream: TextIO = field(default_factory=lambda: sys.stderr)
+    width: int = 30
+
+    _bar: Optional[object] = field(default=None, init=False, repr=False)
+
+    def publish(self, snap: ProgressSnapshot):
+        if tqdm is not None:
+            if self._bar is None:
+                self._bar = tqdm(total=snap.total, desc=self.desc, file=self.stream)
+            self._bar.update(snap.processed - self._bar.n)  # type: ignore
+            return
+        self.stream.write("\r" + format_progress(snap, self.desc, self.width))
+        self.stream.flush()
+
+    def close(self, snap: ProgressSnapshot):
+        self.publish(snap)
+        if self._bar is not None:
+            self._bar.close()  # type: ignore
+        else:
+            self.stream.write("\n")
+
+
+@dataclass
+class JsonLinesSink(Sink):
+    """Writes every snapshot as a JSON line, to a path or to a stream"""
+
+    target: Union[str, Path, TextIO]
+
+    _stream: Optional[TextIO] = field(default=None, init=False, repr=False)
+    _owned: bool = field(default=False, init=False, repr=False)
+
+    def publish(self, snap: ProgressSnapshot):
+        if self._stream is None:
+            if isinstance(self.target, (str, Path)):
+                self._stream = open(self.target, "a", encoding="utf-8")
+                self._owned = True
+            else:
+                self._stream = self.target
+        self._stream.write(json.dumps(snap.as_dict()) + "\n")
+        self._stream.flush()
+
+    def close(self, snap: ProgressSnapshot):
+        self.publish(snap)
+        if self._owned and self._stream is not None:
+            self._stream.close()
+
+
+def format_progress(snap: ProgressSnapshot, desc: str = "", width: int = 30) -> str:
+    """Human readable, single line representation of |snap|"""
+    frac = snap.processed / snap.total if snap.total else 0.0
+    filled = int(width * min(frac, 1.0))
+    eta = f"{snap.eta:.0f}s" if snap.eta is not None else "?"
+    return (
+        f"{desc} [{'#' * filled}{'.' * (width - filled)}] "
+        f"{snap.processed}/{snap.total} ({frac:.0%}) "
+        f"{snap.rate:,.0f} bars/s ETA {eta}"
+    )
+
+
+# pylint: disable=R0902
+@dataclass
+class Telemetry:
+    """Collects the progress of a run and publishes it from a background thread
+
+    Use as a context manager, the publishing thread starts on enter and a final
+    snapshot is published on exit::
+
+        with Telemetry(len(clock), sinks=[ConsoleProgress()]) as t:
+            with t.stage("fetch"):
+                pa = client.get_price_action(...)
+            for bar in clock:
+                with t.stage("signal"):
+                    ...
+                t.advance()
+
+    Args:
+        total(int): the total amount of bars, usually ``len(clock)``
+        sinks(list[Sink]): where to publish the snapshots to
+        interval(float): seconds between every 2 published snapshots
+    """
+
+    total: int
+    sinks: list[Sink] = field(default_factory=list)
+    interval: float = 0.5
+
+    processed: int = field(default=0, init=False)
+    stages: dict[str, float] = field(
+        default_factory=lambda: dict.fromkeys(STAGES, 0.0), init=False
+    )
+    _start: float = field(default=0.0, init=False, repr=False)
+    _stop: threading.Event = field(default_factory=threading.Event, init=False)
+    _thread: Optional[threading.Thread] = field(default=None, init=False, repr=False)
+
+    def advance(self, n: int = 1):
+        """Mark |n| more bars as processed"""
+        self.processed += n
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Accumulate the time spent inside the block under |name|"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            self.stages[name] = self.stages.get(name, 0.0) + dt
+
+    def snapshot(self) -> ProgressSnapshot:
+        elapsed = time.perf_counter() - self._start if self._start else 0.0
+        processed = self.processed
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - processed) / rate if rate > 0 else None
+        return ProgressSnapshot(
+            self.total, processed, elapsed, rate, eta, dict(self.stages)
+        )
+
+    def _publish_loop(self):
+        while not self._stop.wait(self.interval):
+            snap = self.snapshot()
+            for s in self.sinks:
+                s.publish(snap)
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._stop.clear()
+        if self.sinks:
+            self._thread = threading.Thread(
+                target=self._publish_loop, name="telemetry", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> ProgressSnapshot:
+        """Stop publishing, publish the final snapshot to all sinks and return it"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        snap = self.snapshot()
+        for s in self.sinks:
+            s.close(snap)
+        return snap
+
+    def __enter__(self) -> "Telemetry":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def read_json_lines(stream: Union[str, Path, io.TextIOBase]) -> list[ProgressSnapshot]:
+    """Parse the output of ``JsonLinesSink`` back into snapshots"""
+    if isinstance(stream, (str, Path)):
+        with open(stream, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    else:
+        lines = stream.read().splitlines()  # type: ignore
+    return [ProgressSnapshot(**json.loads(line)) for line in lines if line]
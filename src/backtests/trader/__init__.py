@@ -0,0 +1,51 @@
+from typing import TYPE_CHECKING
+
+from ..lazy import lazy_exports
+
+_EXPORTS = {
+    "trader": ["Trader", "Portfolio"],
+    "checkpoint": ["CheckpointPolicy"],
+    "memo": [
+        "RunCache",
+        "data_digest",
+        "clock_key",
+        "run_key",
+        "trader_key",
+        "trade_log",
+    ],
+    "execution": [
+        "ExecutionModel",
+        "Commission",
+        "Slippage",
+        "FixedSpread",
+        "PercentSlippage",
+        "RandomSlippage",
+        "IntrabarFill",
+        "Fills",
+        "SimulationResult",
+    ],
+}
+__getattr__, __dir__, __all__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .trader import Trader, Portfolio
+    from .checkpoint import CheckpointPolicy
+    from .memo import (
+        RunCache,
+        data_digest,
+        clock_key,
+        run_key,
+        trader_key,
+        trade_log,
+    )
+    from .execution import (
+        ExecutionModel,
+        Commission,
+        Slippage,
+        FixedSpread,
+        PercentSlippage,
+        RandomSlippage,
+        IntrabarFill,
+        Fills,
+        SimulationResult,
+    )
@@ -0,0 +1,140 @@
+"""Periodic checkpoints of a running ``Trader``.
+
+A checkpoint is a single uncompressed NPZ file holding the engine's state: the
+clock position, the portfolio, the streaming states of the methods and the RNG.
+The equity curve & the positions aren't rewritten on every checkpoint, they're
+appended to raw side files (float64 ``<checkpoint>.equity`` & int8
+``<checkpoint>.positions``), so the cost of a checkpoint depends on the bars
+since the last one, not on the length of the run.
+"""
+
+import json
+import os
+import time
+import numpy as np
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Union
+
+from ..exceptions import CheckpointError
+
+EQUITY_SUFFIX = ".equity"
+POSITIONS_SUFFIX = ".positions"
+
+
+@dataclass
+class CheckpointPolicy:
+    """When and where to checkpoint a run. If both ``every_bars`` and
+    ``every_seconds`` are set, a checkpoint is written whenever any of them is due
+
+    Args:
+        path(Union[str, Path]): the checkpoint file (``.npz``)
+        every_bars(optional, int): checkpoint every this many bars
+        every_seconds(optional, float): checkpoint every this many seconds of
+            wall time
+    """
+
+    path: Union[str, Path]
+    every_bars: Optional[int] = None
+    every_seconds: Optional[float] = None
+
+    # Measured overhead
+    count: int = field(default=0, init=False)
+    seconds: float = field(default=0.0, init=False)
+
+    def __post_init__(self):
+        self.path = Path(self.path)
+        if self.every_bars is None and self.every_seconds is None:
+            raise CheckpointError("Either every_bars and/or every_seconds is required")
+        if (self.every_bars is not None and self.every_bars <= 0) or (
+            self.every_seconds is not None and self.every_seconds <= 0
+        ):
+            raise CheckpointError("Checkpoint frequency must be positive")
+
+    @property
+    def equity_path(self) -> Path:
+        return Path(self.path).with_suffix(EQUITY_SUFFIX)
+
+    @property
+    def positions_path(self) -> Path:
+        return Path(self.path).with_suffix(POSITIONS_SUFFIX)
+
+    def _side_files(self) -> tuple[tuple[Path, np.dtype], ...]:
+        return (
+            (self.equity_path, np.dtype(np.float64)),
+            (self.positions_path, np.dtype(np.int8)),
+        )
+
+    def exists(self) -> bool:
+        return Path(self.path).exists()
+
+    def due(self, bars: int, since: float) -> bool:
+        """Is a checkpoint due, |bars| & |since| (monotonic time) are counted since
+        the last checkpoint
+        """
+        if self.every_bars is not None and bars >= self.every_bars:
+            return True
+        return (
+            self.every_seconds is not None
+            and time.monotonic() - since >= self.every_seconds
+        )
+
+    def write(
+        self, state: dict[str, np.ndarray], equity: np.ndarray, positions: np.ndarray
+    ):
+        """Atomically write |state| & append |equity| & |positions| (the values
+        since the last checkpoint) to their side files
+        """
+        t0 = time.perf_counter()
+        path = Path(self.path)
+        for (p, dtype), values in zip(self._side_files(), (equity, positions)):
+            with open(p, "ab") as f:
+                np.asarray(values, dtype=dtype).tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **state)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self.count += 1
+        self.seconds += time.perf_counter() - t0
+
+    def read(self) -> tuple[dict[str, np.ndarray], np.ndarray, np.ndarray]:
+        """Read the state, the equity & the positions of the first
+        ``state["position"]`` bars. Values that were appended after the checkpoint
+        (the run died in between) are truncated
+        """
+        with np.load(self.path, allow_pickle=False) as f:
+            state = {k: f[k] for k in f.files}
+        position = int(state["position"])
+        ret = []
+        for p, dtype in self._side_files():
+            values = (
+                np.fromfile(p, dtype=dtype, count=position)
+                if p.exists()
+                else np.empty(0, dtype)
+            )
+            if len(values) != position:
+                raise CheckpointError(
+                    f"Side file {p} holds {len(values)} bars, expected {position}"
+                )
+            with open(p, "r+b") as f:
+                f.truncate(position * dtype.itemsize)
+            ret.append(values)
+        equity, positions = ret
+        return state, equity, positions
+
+    def clear(self):
+        for p in (Path(self.path), self.equity_path, self.positions_path):
+            if p.exists():
+                p.unlink()
+
+
+def encode_json(obj) -> np.ndarray:
+    return np.array(json.dumps(obj, sort_keys=True))
+
+
+def decode_json(arr: np.ndarray):
+    return json.loads(str(arr))
@@ -0,0 +1,322 @@
+"""Execution model: turns position signals into fills with realistic costs.
+
+Everything is applied vectorially to the list of fills (not bar by bar), the only
+Python level loop is in ``IntrabarFill`` which runs once per *fill*, and only
+loads the fine grained data of the bars where a fill actually happened.
+"""
+
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional, Union
+
+from ..core import PriceAction
+from ..exceptions import InvalidExecutionModelError
+from ..telemetry.profiling import profiled
+
+FILL_AT_CLOSE = "close"
+FILL_AT_NEXT_OPEN = "next_open"
+FILLS_ALLOWED = [FILL_AT_CLOSE, FILL_AT_NEXT_OPEN]
+
+BUY = 1
+SELL = -1
+
+# (start, end) -> DataFrame with at least "Open", "Close" & "Volume" columns
+BarsLoader = Callable[[datetime, datetime], pd.DataFrame]
+
+
+@dataclass(frozen=True)
+class Commission:
+    """Commission paid on every fill: ``fixed + rate * notional``
+
+    Args:
+        fixed(float): fixed fee per fill (e.g 1.0 -> 1$ per order)
+        rate(float): percentage of the notional (e.g 0.001 -> 0.1%)
+    """
+
+    fixed: float = 0.0
+    rate: float = 0.0
+
+    def __post_init__(self):
+        if self.fixed < 0 or self.rate < 0:
+            raise InvalidExecutionModelError("Commissions can't be negative")
+
+    def cost(self, notional: np.ndarray) -> np.ndarray:
+        return self.fixed + self.rate * np.abs(notional)
+
+
+class Slippage:
+    """Base slippage model, doesn't move the price"""
+
+    def apply(
+        self,
+        prices: np.ndarray,
+        sides: np.ndarray,
+        rng: Optional[np.random.Generator] = None,
+    ) -> np.ndarray:
+        """Return the |prices| after slippage. |sides| holds BUY/SELL per fill,
+        buying always pays more and selling always receives less. |rng| is only
+        used by random models
+        """
+        return prices
+
+
+@dataclass(frozen=True)
+class FixedSpread(Slippage):
+    """Cross half of a fixed bid/ask |spread| (in price units) on every fill"""
+
+    spread: float
+
+    def apply(
+        self,
+        prices: np.ndarray,
+        sides: np.ndarray,
+        rng: Optional[np.random.Generator] = None,
+    ) -> np.ndarray:
+        return prices + sides * (self.spread / 2)
+
+
+@dataclass(frozen=True)
+class PercentSlippage(Slippage):
+    """Move the price against the order by |rate| percent (e.g 0.0005 -> 5bps)"""
+
+    rate: float
+
+    def apply(
+        self,
+        prices: np.ndarray,
+        sides: np.ndarray,
+        rng: Optional[np.random.Generator] = None,
+    ) -> np.ndarray:
+        return prices * (1 + sides * self.rate)
+
+
+@dataclass(frozen=True)
+class RandomSlippage(Slippage):
+    """Move the price against the order by a random percentage, drawn from a half
+    normal distribution with a scale of |rate|
+    """
+
+    rate: float
+
+    def apply(
+        self,
+        prices: np.ndarray,
+        sides: np.ndarray,
+        rng: Optional[np.random.Generator] = None,
+    ) -> np.ndarray:
+        rng = rng or np.random.default_rng()
+        noise = np.abs(rng.normal(0, self.rate, np.shape(prices)))
+        return prices * (1 + sides * noise)
+
+
+@dataclass
+class IntrabarFill:
+    """Resolve fill prices using finer grained (e.g 1m) data.
+
+    The fine data is loaded lazily, only for the bars where a fill happened, and
+    the last ``cache_size`` bars are cached. The fill price is the open of the
+    first fine bar at/after ``delay`` from the start of the bar, or the VWAP over
+    ``window`` if it's set.
+
+    Args:
+        loader(BarsLoader): loads the fine bars between 2 datetimes
+        delay(timedelta): time since the beginning of the bar until the order is
+            filled
+        window(optional, timedelta): if set, fill at the VWAP of this window
+        span(timedelta): the duration of a (coarse) bar, default is a day
+        cache_size(int): amount of bars whose fine data is kept in memory
+    """
+
+    loader: BarsLoader
+    delay: timedelta = timedelta(0)
+    window: Optional[timedelta] = None
+    span: timedelta = timedelta(days=1)
+    cache_size: int = 256
+
+    _cache: OrderedDict[pd.Timestamp, pd.DataFrame] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+
+    @classmethod
+    def from_yfinance(cls, ticker: str, interval: str = "1m", **kwargs):
+        """Build an ``IntrabarFill`` that downloads the fine bars using ``YClient``"""
+        from ..core import YClient  # pylint: disable=C0415
+
+        client = YClient()
+
+        def loader(start: datetime, end: datetime) -> pd.DataFrame:
+            return client.get_price_action(ticker, start, end, interval).data
+
+        return cls(loader, **kwargs)
+
+    def _load(self, ts: pd.Timestamp) -> pd.DataFrame:
+        if ts in self._cache:
+            self._cache.move_to_end(ts)
+            return self._cache[ts]
+        start = ts.to_pydatetime()
+        fine = self._cache[ts] = self.loader(start, start + self.span)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return fine
+
+    def resolve(
+        self, index: pd.DatetimeIndex, fill_idx: np.ndarray, prices: np.ndarray
+    ) -> np.ndarray:
+        """Replace |prices| of the bars |fill_idx| (of |index|) with intrabar
+        prices. Bars without fine data keep their original price
+        """
+        ret = prices.copy()
+        for j, i in enumerate(fill_idx):
+            fine = self._load(index[i])
+            if fine.empty:
+                continue
+            t0 = fine.index[0] + self.delay
+            fine = fine[fine.index >= t0]
+            if self.window is not None:
+                fine = fine[fine.index < t0 + self.window]
+            if fine.empty:
+                continue
+            if self.window is None:
+                ret[j] = fine["Open"].iat[0]
+                continue
+            vol = fine["Volume"].to_numpy(dtype=np.float64)
+            px = fine["Close"].to_numpy(dtype=np.float64)
+            ret[j] = (px * vol).sum() / vol.sum() if vol.sum() > 0 else px.mean()
+        return ret
+
+
+class Fills(NamedTuple):
+    index: np.ndarray  # the bar (position in ``pa.data``) of each fill
+    side: np.ndarray  # BUY / SELL
+    price: np.ndarray  # after slippage
+    signal_index: np.ndarray  # the bar on which the signal that caused it fired
+
+
+class SimulationResult(NamedTuple):
+    equity: pd.Series  # mark-to-market portfolio value per bar
+    fills: Fills
+    commissions: np.ndarray  # commission paid per fill
+    shares: np.ndarray  # shares held per round trip
+
+
+def positions_to_state(signal: Union[pd.Series, np.ndarray]) -> np.ndarray:
+    """Convert a signal of +1 (go long) / -1 (liquidate) / 0 (do nothing), like
+    ``SMACrossResult.position``, into the desired long/flat state of every bar
+    """
+    s = pd.Series(np.asarray(signal, dtype=np.float64))
+    state = s.where(s != 0).ffill().fillna(SELL)
+    return (state.to_numpy() > 0).astype(np.int8)
+
+
+@dataclass
+class ExecutionModel:
+    """Defines how orders are filled and what they cost
+
+    Args:
+        commission(Commission): the commission paid per fill
+        slippage(Slippage): the model used to move the fill prices
+        fill_at(str): "close" - fill at the close of the signal bar,
+            "next_open" - fill at the open of the bar after the signal
+        intrabar(optional, IntrabarFill): resolve fill prices using finer data,
+            only with "next_open": the fine bars of the signal bar itself precede
+            the close that produced the signal
+        seed(optional, int): seed of random slippage models
+    """
+
+    commission: Commission = field(default_factory=Commission)
+    slippage: Slippage = field(default_factory=Slippage)
+    fill_at: str = FILL_AT_NEXT_OPEN
+    intrabar: Optional[IntrabarFill] = None
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.fill_at not in FILLS_ALLOWED:
+            raise InvalidExecutionModelError(
+                f"fill_at: {self.fill_at} is not supported, "
+                f"supported values are: {', '.join(FILLS_ALLOWED)}"
+            )
+        if self.intrabar is not None and self.fill_at != FILL_AT_NEXT_OPEN:
+            raise InvalidExecutionModelError(
+                f"intrabar fills require fill_at={FILL_AT_NEXT_OPEN}, filling "
+                f"inside the signal bar would look ahead of its close"
+            )
+
+    @profiled("execution.fill")
+    def fill(self, pa: PriceAction, signal: Union[pd.Series, np.ndarray]) -> Fills:
+        """Get the fills caused by |signal| (see ``positions_to_state``)"""
+        state = positions_to_state(signal)
+        n = len(state)
+        trans = np.diff(state, prepend=np.int8(0))
+        sig_idx = np.flatnonzero(trans)
+        lag = 1 if self.fill_at == FILL_AT_NEXT_OPEN else 0
+        fill_idx = sig_idx + lag
+        keep = fill_idx < n  # Signals on the last bar can't be filled next bar
+        sig_idx, fill_idx = sig_idx[keep], fill_idx[keep]
+        sides = trans[sig_idx].astype(np.int8)
+
+        col = "Open" if self.fill_at == FILL_AT_NEXT_OPEN else "Close"
+        prices = pa.data[col].to_numpy(dtype=np.float64)[fill_idx]
+        if self.intrabar is not None:
+            index = pd.DatetimeIndex(pa.data.index)
+            prices = self.intrabar.resolve(index, fill_idx, prices)
+        prices = self.slippage.apply(prices, sides, np.random.default_rng(self.seed))
+        return Fills(fill_idx, sides, prices, sig_idx)
+
+    @profiled("execution.simulate")
+    def simulate(
+        self,
+        pa: PriceAction,
+        signal: Union[pd.Series, np.ndarray],
+        cash: float,
+    ) -> SimulationResult:
+        """Simulate going all in on every entry and liquidating on every exit.
+
+        The cash after each round trip follows ``c[k+1] = a[k] * c[k] + b[k]``
+        (``a`` is the net price ratio, ``b`` the fixed fees), which is solved for
+        all the round trips at once instead of iterating over the bars
+        """
+        fills = self.fill(pa, signal)
+        close = pa.data["Close"].to_numpy(dtype=np.float64)
+        n = len(close)
+        fixed, rate = self.commission.fixed, self.commission.rate
+
+        entries = fills.side == BUY
+        p_in = fills.price[entries]
+        p_out = fills.price[~entries]
+        bar_in = fills.index[entries]
+        bar_out = np.full(len(p_in), n, dtype=np.int64)  # open trade -> never exits
+        bar_out[: len(p_out)] = fills.index[~entries]
+
+        # Cash before every entry, solve the affine recurrence vectorially
+        a = p_out * (1 - rate) / (p_in[: len(p_out)] * (1 + rate))
+        b = -fixed * a - fixed
+        prod = np.concatenate(([1.0], np.cumprod(a)))
+        acc = np.concatenate(([0.0], np.cumsum(b / prod[1:])))
+        cash_before = prod * (cash + acc)  # len(p_out) + 1
+        shares = (cash_before[: len(p_in)] - fixed) / (p_in * (1 + rate))
+
+        # Commissions per fill
+        notional = np.empty(len(fills.price))
+        notional[entries] = shares * p_in
+        notional[~entries] = shares[: len(p_out)] * p_out
+        commissions = self.commission.cost(notional)
+
+        # Mark to market every bar
+        bars = np.arange(n)
+        k = np.searchsorted(bar_in, bars, side="right") - 1
+        kc = np.clip(k, 0, None)
+        in_pos = (k >= 0) & (bars < bar_out[kc]) if len(p_in) else np.zeros(n, bool)
+        flat_cash = np.where(k >= 0, cash_before[np.clip(k + 1, 0, len(p_out))], cash)
+        held = shares[kc] * close if len(p_in) else np.zeros(n)
+        equity = np.where(in_pos, held, flat_cash)
+
+        return SimulationResult(
+            pd.Series(equity, index=pa.data.index, name="Total"),
+            fills,
+            commissions,
+            shares,
+        )
@@ -0,0 +1,234 @@
+"""Content-addressed memoization of whole backtest runs.
+
+A run is identified by the hash of everything that determines its outcome: the
+slice of the price action it consumes, the ``Clock`` configuration and the
+``Trader``'s parameters (methods included, see ``Trader.fingerprint``). Reruns &
+sweeps that repeat a run read its ``BacktestResult`` from disk instead of
+replaying every bar.
+
+Since the data is part of the key, there's nothing to invalidate when the bars
+change (e.g a refreshed ``PriceActionCache`` file): the run simply gets a new
+key, and the stale entries age out. The cache is bounded by ``max_bytes``, the
+least recently used entries are evicted first.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import numpy as np
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Union
+
+from ..analysis.results import TRADE_DTYPE, BacktestResult, TradeLog
+from ..analysis.metrics import PERIODS_PER_YEAR
+from ..core import Clock, PriceAction
+from ..utils import index_to_ns
+from .trader import Trader
+
+LOCK_FILE = ".lock"
+# Part of every run's key, bump it when the stored results change (2: the fills)
+RESULT_VERSION = 2
+
+
+def data_digest(pa: PriceAction, rows: Optional[np.ndarray] = None) -> str:
+    """Hash the bars of |pa| (the index & every numeric column), only the bars at
+    |rows| if given
+    """
+    h = hashlib.blake2b(digest_size=20)
+    index = index_to_ns(pa.data.index)
+    h.update(np.ascontiguousarray(index if rows is None else index[rows]).data)
+    for c in sorted(pa.data.columns, key=str):
+        arr = pa.data[c].to_numpy()
+        if arr.dtype == object:
+            continue
+        h.update(str(c).encode())
+        h.update(np.ascontiguousarray(arr if rows is None else arr[rows]).data)
+    return h.hexdigest()
+
+
+def clock_key(clock: Clock) -> tuple:
+    """Everything that determines the bars of |clock|"""
+    return (
+        clock.start.isoformat(),
+        clock.end.isoformat(),
+        clock._ival_str,  # pylint: disable=W0212
+        clock.extended,
+        tuple(clock.calendars or ()),
+        clock.tz,
+    )
+
+
+def run_key(*parts: Hashable) -> str:
+    """The key of a run out of its (repr-able) parts"""
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def trade_log(trader: Trader, time: np.ndarray) -> TradeLog:
+    """The fills of the last run of |trader|, |time| holds the bars' open times
+    (int64 UTC nanoseconds)
+    """
+    n = len(time)
+    changes = np.flatnonzero(np.diff(trader.positions[:n], prepend=0))
+    fills = np.array(trader.fills, dtype=np.float64).reshape(-1, 4)
+    k = min(len(changes), len(fills))  # the fills of the first n bars
+    fills = fills[:k]
+    rec = np.empty(k, TRADE_DTYPE)
+    rec["bar"] = changes[:k]
+    rec["time"] = time[rec["bar"]].astype("datetime64[ns]")
+    rec["side"], rec["qty"], rec["price"], rec["commission"] = fills.T
+    return TradeLog(rec)
+
+
+def trader_key(trader: Trader, pa: PriceAction) -> str:
+    """The key of ``trader.run(pa)``: the bars of |pa| the clock consumes, the
+    clock's configuration & the trader's fingerprint
+    """
+    rows = trader._align(pa)  # pylint: disable=W0212
+    return run_key(
+        data_digest(pa, rows[rows >= 0]),
+        clock_key(trader.clock),
+        trader.fingerprint(),
+        RESULT_VERSION,
+    )
+
+
+@dataclass
+class RunCache:
+    """A directory of memoized ``BacktestResult``s, one NPZ file per key. Safe
+    to share between processes (e.g the workers of a sweep)
+
+    Args:
+        root(Union[str, Path]): the cache directory, created if missing
+        max_bytes(optional, int): evict the least recently used entries once the
+            cache grows beyond this size, unbounded if None
+    """
+
+    root: Union[str, Path]
+    max_bytes: Optional[int] = 1 << 30
+
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        self.root = Path(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        return Path(self.root) / f"{key}.npz"
+
+    def __contains__(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def _entries(self) -> list[Path]:
+        return list(Path(self.root).glob("*.npz"))
+
+    def size(self) -> int:
+        """The size of all the entries in bytes"""
+        return sum(p.stat().st_size for p in self._entries())
+
+    def get(self, key: str) -> Optional[BacktestResult]:
+        """The cached result of |key|, None on a miss"""
+        path = self.path(key)
+        try:
+            os.utime(path)  # most recently used, before it can be evicted
+            result = BacktestResult.load_npz(path)
+        except FileNotFoundError:  # never cached, or just evicted
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: BacktestResult):
+        """Store |result| under |key| (its name becomes the key), then evict"""
+        result.name = key
+        path = self.path(key)
+        tmp = path.with_name(f"{key}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            result.save_npz(f)
+        os.replace(tmp, path)
+        self.evict()
+
+    def get_or_run(
+        self, key: str, fn: Callable[[], BacktestResult]
+    ) -> tuple[BacktestResult, bool]:
+        """The cached result of |key|, or the result of |fn| (which is cached)
+
+        Return:
+            tuple[BacktestResult, bool]: the result & whether it was a hit
+        """
+        result = self.get(key)
+        if result is not None:
+            return result, True
+        result = fn()
+        self.put(key, result)
+        return result, False
+
+    def run(
+        self,
+        trader: Trader,
+        pa: PriceAction,
+        periods_per_year: int = PERIODS_PER_YEAR,
+    ) -> tuple[BacktestResult, bool]:
+        """Memoized ``trader.run(pa)``, always a full (not resumed) run
+
+        Return:
+            tuple[BacktestResult, bool]: the equity curve & positions of the run
+                (``.metrics`` for its metrics) & whether it was a hit
+        """
+        key = trader_key(trader, pa)
+
+        def _run() -> BacktestResult:
+            trader.reset()  # nothing carries over from an earlier run
+            equity = trader.run(pa)
+            time = index_to_ns(equity.index).copy()
+            return BacktestResult(
+                name=key,
+                time=time,
+                equity=np.array(equity, dtype=np.float64),  # not a view
+                position=trader.positions[: len(equity)].copy(),
+                trades=trade_log(trader, time),
+                params={"ticker": trader.ticker},
+                periods_per_year=periods_per_year,
+            )
+
+        return self.get_or_run(key, _run)
+
+    def invalidate(self, key: Optional[str] = None, ticker: Optional[str] = None):
+        """Drop the entry of |key|, or every entry of |ticker|"""
+        if key is not None:
+            self.path(key).unlink(missing_ok=True)
+        if ticker is not None:
+            for p in self._entries():
+                with np.load(p, allow_pickle=False) as f:
+                    meta = json.loads(str(f["meta"]))
+                if meta["params"].get("ticker") == ticker:
+                    p.unlink(missing_ok=True)
+
+    def clear(self):
+        for p in self._entries():
+            p.unlink(missing_ok=True)
+
+    def evict(self):
+        """Drop the least recently used entries until the cache fits
+        ``max_bytes``
+        """
+        if self.max_bytes is None:
+            return
+        with open(Path(self.root) / LOCK_FILE, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = []
+            for p in self._entries():
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, p))
+            total = sum(e[1] for e in entries)
+            for _, size, p in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                p.unlink(missing_ok=True)
+                total -= size
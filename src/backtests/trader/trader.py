@@ -1,18 +1,309 @@
+import hashlib
+import time
+from contextlib import nullcontext
+import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
-from pydantic import BaseModel
-from dataclasses import dataclass
-from ..strategies import Method
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from ..core import Clock, PriceAction
+from ..exceptions import (
+    CheckpointError,
+    InvalidExecutionModelError,
+    InvalidMethodError,
+)
+from ..strategies import MethodWeighted
+from ..strategies.logic import Row
+from ..telemetry import Telemetry
+from ..utils import NS_DAY, align_ns, floor_ns, index_to_ns, ns_to_index, wall_ns
+from .checkpoint import CheckpointPolicy, encode_json, decode_json
+from .execution import ExecutionModel, FILL_AT_NEXT_OPEN, BUY, SELL
+
+NO_ORDER = 0
 
 
 @dataclass
-class Trader(BaseModel):
+class Portfolio:
+    cash: float
+    shares: float = 0.0
+
+    def value(self, price: float) -> float:
+        return self.cash + self.shares * price
+
+
+# pylint: disable=R0902
+@dataclass
+class Trader:
+    """Backtests the registered methods bar by bar, driven by the ``Clock``.
+
+    On every bar, the methods are stepped (see ``Method.step``) and their summed
+    weight decides the position: long (all in) while the weighted signal is at
+    least ``threshold``, flat otherwise. Fills follow ``execution`` (commissions,
+    slippage & fill timing, an ``intrabar`` model is rejected: intrabar fills
+    aren't supported bar by bar).
+
+    Args:
+        ticker(str): The ticker to backtest on
+        start(datetime): beginning of time range
+        end(datetime): end of time range
+        interval(Union[str, timedelta]): the interval of the bars
+        cash(float): the starting cash
+        extended(bool): include pre & post market bars
+        threshold(float): the weighted signal (0.0 - 1.0) needed to be long
+        execution(ExecutionModel): fills & costs, default fills at the close
+        seed(optional, int): seed of the RNG (used by random slippage models)
+        checkpoint(optional, CheckpointPolicy): checkpoint the run periodically
+    """
+
     ticker: str
     start: datetime
     end: datetime
-    interval: timedelta
+    interval: Union[str, timedelta]
+    cash: float = 1000.0
+    extended: bool = False
+    threshold: float = 0.5
+    execution: ExecutionModel = field(
+        default_factory=lambda: ExecutionModel(fill_at="close")
+    )
+    seed: Optional[int] = None
+    checkpoint: Optional[CheckpointPolicy] = None
+
+    methods: list[MethodWeighted] = field(default_factory=list, init=False)
 
     def __post_init__(self):
-        pass
+        if self.execution.intrabar is not None:
+            raise InvalidExecutionModelError(
+                "Intrabar fills aren't supported bar by bar, use "
+                "ExecutionModel.fill() over the whole price action"
+            )
+        self.clock = Clock(self.start, self.end, self.interval, self.extended)
+        self.reset()
+
+    def reset(self):
+        """Start over: the starting cash, no orders, a freshly seeded RNG and no
+        equity. The registered methods are reset by ``run()``
+        """
+        self.portfolio = Portfolio(self.cash)
+        self.rng = np.random.default_rng(self.seed)
+        self.equity = np.full(len(self.clock), np.nan)
+        # 1 while long at the close of a bar
+        self.positions = np.zeros(len(self.clock), dtype=np.int8)
+        # (side, qty, price, commission) of every fill, in order. Every fill
+        # flips the position, so the n-th fill is at its n-th change
+        self.fills: list[tuple[int, float, float, float]] = []
+        self.pending = NO_ORDER  # order waiting for the next bar's open
+
+    def register(self, methods: MethodWeighted):
+        """Register a new method with its weight"""
+        if methods.m.ticker != self.ticker:
+            raise InvalidMethodError(
+                f"Method of {methods.m.ticker} can't trade {self.ticker}"
+            )
+        self.methods.append(methods)
+
+    @property
+    def total_weight(self) -> int:
+        return sum(mw.weight for mw in self.methods)
+
+    def signal(self, row: Row) -> float:
+        """Step all the methods over |row|, return the weighted signal"""
+        total = sum(mw.weight * mw.m.step(row) for mw in self.methods)
+        return total / self.total_weight
+
+    def _fill(self, side: int, price: float):
+        px = self.execution.slippage.apply(
+            np.array([price]), np.array([side]), self.rng
+        )[0]
+        fixed, rate = self.execution.commission.fixed, self.execution.commission.rate
+        p = self.portfolio
+        if side == BUY:
+            p.shares = qty = (p.cash - fixed) / (px * (1 + rate))
+            p.cash = 0.0
+        else:
+            qty = p.shares
+            p.cash = p.shares * px * (1 - rate) - fixed
+            p.shares = 0.0
+        self.fills.append((side, qty, px, fixed + qty * px * rate))
+
+    def on_bar(self, row: Row) -> float:
+        """Process a single bar, return the equity at its close"""
+        return self.execute(row, self.signal(row) >= self.threshold)
+
+    def execute(self, row: Row, long: bool) -> float:
+        """Fill the pending order at the open of |row|, then follow the |long|
+        decision of the bar. Return the equity at its close
+        """
+        if self.pending != NO_ORDER:
+            self._fill(self.pending, float(row["Open"]))
+            self.pending = NO_ORDER
+
+        side = NO_ORDER
+        if long and self.portfolio.shares == 0:
+            side = BUY
+        elif not long and self.portfolio.shares > 0:
+            side = SELL
+        if side != NO_ORDER:
+            if self.execution.fill_at == FILL_AT_NEXT_OPEN:
+                self.pending = side
+            else:
+                self._fill(side, float(row["Close"]))
+        return self.portfolio.value(float(row["Close"]))
+
+    def _on_bar_staged(self, row: Row, telemetry: Telemetry) -> float:
+        """``on_bar()``, timing the signal & the simulation stages"""
+        with telemetry.stage("signal"):
+            long = self.signal(row) >= self.threshold
+        with telemetry.stage("simulation"):
+            return self.execute(row, long)
+
+    def _align(self, pa: PriceAction) -> np.ndarray:
+        """The row of |pa| of every bar of the clock, -1 if it's missing"""
+        opens = self.clock.bar_times_ns()[0]
+        idx = pd.DatetimeIndex(pa.data.index)
+        rows = align_ns(index_to_ns(idx), opens)
+        if (rows < 0).all() and not self.clock.is_intraday:
+            # Daily data (e.g yfinance) is indexed by date, not by the open time
+            tz = self.clock.tz
+            days = floor_ns(wall_ns(idx.asi8, tz if idx.tz else None), NS_DAY)
+            rows = align_ns(days, floor_ns(wall_ns(opens, tz), NS_DAY))
+        return rows
+
+    # Checkpoints
+    def fingerprint(self) -> str:
+        """Identifies the configuration of the run, a checkpoint can only be
+        resumed by a run with the same fingerprint
+        """
+        cfg = repr(
+            (
+                self.ticker,
+                self.start,
+                self.end,
+                self.clock._ival_str,  # pylint: disable=W0212
+                self.cash,
+                self.extended,
+                self.threshold,
+                self.execution,
+                self.seed,
+                self.methods,
+            )
+        )
+        return hashlib.sha256(cfg.encode()).hexdigest()
+
+    def state(self) -> dict[str, np.ndarray]:
+        """The state of the engine, everything needed to resume the run"""
+        st = {
+            "fingerprint": np.array(self.fingerprint()),
+            "position": np.array(self.clock.position),
+            "portfolio": np.array([self.portfolio.cash, self.portfolio.shares]),
+            "pending": np.array(self.pending),
+            "fills": np.array(self.fills, dtype=np.float64).reshape(-1, 4),
+            "rng": encode_json(self.rng.bit_generator.state),
+        }
+        for i, mw in enumerate(self.methods):
+            for j, s in enumerate(mw.m.states):
+                if s is not None:
+                    st[f"method_{i}_{j}"] = s
+        return st
+
+    def load_state(self, st: dict[str, np.ndarray]):
+        if str(st["fingerprint"]) != self.fingerprint():
+            raise CheckpointError("The checkpoint belongs to a different run")
+        self.portfolio.cash, self.portfolio.shares = st["portfolio"].tolist()
+        self.pending = int(st["pending"])
+        self.fills = [
+            (int(side), qty, px, fee) for side, qty, px, fee in st["fills"].tolist()
+        ]
+        self.rng.bit_generator.state = decode_json(st["rng"])
+        for i, mw in enumerate(self.methods):
+            for j, s in enumerate(mw.m.states):
+                if s is not None:
+                    s[:] = st[f"method_{i}_{j}"]
+
+    def run(
+        self,
+        pa: PriceAction,
+        resume: bool = False,
+        telemetry: Optional[Telemetry] = None,
+        max_bars: Optional[int] = None,
+    ) -> pd.Series:
+        """Start backtesting over |pa|. Every run starts over (see ``reset()``),
+        unless it resumes from a checkpoint
+
+        Args:
+            pa(PriceAction): the price action of the ticker, indexed by the bars'
+                open times
+            resume(bool): resume from ``checkpoint`` if it exists
+            telemetry(optional, Telemetry): report the progress of the run and
+                the time of its stages: align (the bars of |pa| on the clock),
+                compile (the methods' logics & their state), signal (stepping
+                the methods, the streaming indicators included) & simulation
+                (fills)
+            max_bars(optional, int): stop after this many bars, at least 1 (the
+                run can be resumed later)
+
+        Return:
+            pd.Series: the equity at the close of every bar processed so far
+        """
+        if not self.methods:
+            raise InvalidMethodError("No methods are registered")
+        if max_bars is not None and max_bars < 1:
+            raise ValueError(f"max_bars must be at least 1, got {max_bars}")
+        with telemetry.stage("align") if telemetry is not None else nullcontext():
+            rows = self._align(pa)
+            cols = {c: pa.data[c].to_numpy(dtype=np.float64) for c in pa.data.columns}
+        with telemetry.stage("compile") if telemetry is not None else nullcontext():
+            for mw in self.methods:
+                mw.m.reset()
+                _ = mw.m.states  # compile the logics & allocate their state
+
+        self.reset()
+        first = 0
+        ckpt = self.checkpoint
+        if ckpt is not None:
+            if resume and ckpt.exists():
+                st, equity, positions = ckpt.read()
+                self.load_state(st)
+                first = int(st["position"])
+                self.equity[:first] = equity
+                self.positions[:first] = positions
+            else:
+                ckpt.clear()
+        if telemetry is not None:
+            telemetry.advance(first)
+
+        last_ckpt, last_ckpt_time = first, time.monotonic()
+        value = self.equity[first - 1] if first else self.portfolio.cash
+        stop = len(self.equity) if max_bars is None else first + max_bars
+        for _ in self.clock.seek(first):
+            i = self.clock.position - 1
+            r = rows[i]
+            if r >= 0:
+                row = {c: v[r] for c, v in cols.items()}
+                if telemetry is None:
+                    value = self.on_bar(row)
+                else:
+                    value = self._on_bar_staged(row, telemetry)
+            self.equity[i] = value
+            self.positions[i] = self.portfolio.shares > 0
+            if telemetry is not None:
+                telemetry.advance()
+            if ckpt is not None and ckpt.due(i + 1 - last_ckpt, last_ckpt_time):
+                ckpt.write(
+                    self.state(),
+                    self.equity[last_ckpt : i + 1],
+                    self.positions[last_ckpt : i + 1],
+                )
+                last_ckpt, last_ckpt_time = i + 1, time.monotonic()
+            if i + 1 >= stop:
+                break
 
-    def register(self, methods: Method):
-        pass
+        done = self.clock.position
+        if ckpt is not None and done > last_ckpt:
+            ckpt.write(
+                self.state(),
+                self.equity[last_ckpt:done],
+                self.positions[last_ckpt:done],
+            )
+        index = ns_to_index(self.clock.bar_times_ns()[0][:done], self.clock.tz)
+        return pd.Series(self.equity[:done].copy(), index=index, name="Total")
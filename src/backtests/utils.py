@@ -1,7 +1,28 @@
+"""Time utilities. Besides the ``datetime`` helpers, this module holds the int64
+nanosecond time kernel: bar times are kept as int64 UTC nanoseconds since the epoch
+and are converted to ``datetime``/``pd.Timestamp`` only at the edges (e.g
+``Bar.open``), so iterating & aligning bars doesn't allocate Python objects per bar
+"""
+
 import re
+import numpy as np
+import pandas as pd
 from datetime import timedelta, datetime
+from functools import lru_cache
+from typing import Optional, Union
+
+NS_SECOND = 1_000_000_000
+NS_MINUTE = 60 * NS_SECOND
+NS_HOUR = 60 * NS_MINUTE
+NS_DAY = 24 * NS_HOUR
+NS_WEEK = 7 * NS_DAY
 
+_INTERVAL_RE = re.compile(
+    r"^(?:(\d+)w)?\s*(?:(\d+)d)?\s*(?:(\d+)h)?\s*(?:(\d+)m)?\s*(?:(\d+)s)?\s*"
+)
 
+
+@lru_cache(maxsize=256)
 def parse_interval(i: str) -> timedelta:
     """Parses an interval string into a datetime.timedelta object.
 
@@ -22,8 +43,7 @@ def parse_interval(i: str) -> timedelta:
     Raises:
         ValueError: If the string format is invalid or contains unknown units
     """
-    regex = r"^(?:(\d+)w)?\s*(?:(\d+)d)?\s*(?:(\d+)h)?\s*(?:(\d+)m)?\s*(?:(\d+)s)?\s*"
-    m = re.fullmatch(regex, i)
+    m = _INTERVAL_RE.fullmatch(i)
     if not m or all(x is None for x in m.groups()):
         raise ValueError(
             f"Time fmt: {i} is not allowed. "
@@ -39,6 +59,7 @@ def parse_interval(i: str) -> timedelta:
     return timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
 
 
+@lru_cache(maxsize=256)
 def td_to_str(i: timedelta) -> str:
     """Converts a datetime.timedelta into a string representation
 
@@ -90,3 +111,81 @@ def discard_datetime_by_interval(dt: datetime, i: timedelta) -> datetime:
 
     # sub-second intervals: no truncation (microsecond is the smallest unit)
     return dt
+
+
+@lru_cache(maxsize=256)
+def interval_ns(i: Union[str, timedelta]) -> int:
+    """The length of the interval |i| (e.g "5m" or a timedelta) in nanoseconds"""
+    td = parse_interval(i) if isinstance(i, str) else i
+    return td // timedelta(microseconds=1) * 1000
+
+
+def truncation_ns(i: Union[str, timedelta]) -> int:
+    """The precision (in nanoseconds) ``discard_datetime_by_interval`` keeps for
+    the interval |i|
+    """
+    ns = interval_ns(i)
+    if ns <= 0:
+        raise ValueError("interval must be positive")
+    for unit in (NS_DAY, NS_HOUR, NS_MINUTE, NS_SECOND):
+        if ns >= unit:
+            return unit
+    return 1
+
+
+def floor_ns(ns: np.ndarray, step: int, origin: int = 0) -> np.ndarray:
+    """Floor every value of |ns| to a multiple of |step| nanoseconds, counted from
+    |origin|
+    """
+    ns = np.asarray(ns, dtype=np.int64)
+    return ns - (ns - origin) % step
+
+
+def discard_ns_by_interval(ns: np.ndarray, i: Union[str, timedelta]) -> np.ndarray:
+    """Vectorized ``discard_datetime_by_interval`` of wall clock (tz naive)
+    nanoseconds
+    """
+    return floor_ns(ns, truncation_ns(i))
+
+
+def to_ns(t: Union[datetime, pd.Timestamp, np.datetime64, int]) -> int:
+    """A single time as int64 nanoseconds, UTC if it's tz aware"""
+    if isinstance(t, (int, np.integer)):
+        return int(t)
+    return pd.Timestamp(t).value
+
+
+def index_to_ns(index) -> np.ndarray:
+    """The int64 UTC nanoseconds of a DatetimeIndex (or anything that converts
+    to one). Tz naive times are kept as is
+    """
+    return pd.DatetimeIndex(index).asi8
+
+
+def ns_to_index(ns: np.ndarray, tz: Optional[str] = None) -> pd.DatetimeIndex:
+    """The DatetimeIndex of int64 UTC nanoseconds, converted to |tz|"""
+    idx = pd.DatetimeIndex(np.asarray(ns, dtype=np.int64).view("M8[ns]"))
+    return idx if tz is None else idx.tz_localize("UTC").tz_convert(tz)
+
+
+def wall_ns(ns: np.ndarray, tz: Optional[str]) -> np.ndarray:
+    """The wall clock time in |tz| of int64 UTC nanoseconds, e.g to floor them to
+    local days
+    """
+    if tz is None:
+        return np.asarray(ns, dtype=np.int64)
+    return ns_to_index(ns, tz).tz_localize(None).asi8
+
+
+def align_ns(index: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """The position of every value of |targets| inside |index|, -1 if it's
+    missing. Both are int64 nanoseconds, |index| doesn't have to be sorted
+    """
+    index = np.asarray(index, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    if len(index) == 0:
+        return np.full(len(targets), -1, dtype=np.intp)
+    order = np.argsort(index, kind="stable")
+    srt = index[order]
+    pos = np.searchsorted(srt, targets).clip(max=len(srt) - 1)
+    return np.where(srt[pos] == targets, order[pos], -1)
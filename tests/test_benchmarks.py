@@ -0,0 +1,72 @@
+from benchmarks import suites
+from benchmarks.__main__ import main
+from benchmarks.harness import (
+    Benchmark,
+    BenchResult,
+    run_benchmark,
+    compare,
+    save_results,
+    load_results,
+)
+
+
+def test_run_benchmark():
+    b = Benchmark("sum", setup=lambda: list(range(10_000)), run=sum, units=10_000)
+    r = run_benchmark(b)
+    assert r.name == "sum" and r.units == 10_000
+    assert r.seconds > 0 and r.throughput > 0
+    assert r.peak_bytes >= 0
+
+
+def test_compare_and_roundtrip(tmp_path):
+    base = [BenchResult("a", 1.0, 1.0, 100, 1), BenchResult("b", 1.0, 1.0, 100, 1)]
+    path = tmp_path / "baseline.json"
+    save_results(base, path)
+    baseline = load_results(path)
+    assert baseline["a"] == base[0]
+
+    current = [
+        BenchResult("a", 1.2, 1.0, 100, 1),  # within tolerance
+        BenchResult("b", 2.0, 1.0, 200, 1),  # slower & bigger
+        BenchResult("c", 9.0, 1.0, 100, 1),  # not in baseline
+    ]
+    regressions = compare(current, baseline, tolerance=0.25)
+    assert [(r.name, r.metric) for r in regressions] == [
+        ("b", "seconds"),
+        ("b", "peak_bytes"),
+    ]
+
+
+def test_main_fails_on_regression(tmp_path):
+    args = ["--quick", "-s", "simulation", "-k", "simulation.vectorized.1d.*"]
+    out, baseline = str(tmp_path / "out.json"), str(tmp_path / "base.json")
+    assert main([*args, "-o", out, "--baseline", baseline, "--update-baseline"]) == 0
+    results = load_results(baseline)
+    assert list(results) == ["simulation.vectorized.1d.1y"]
+
+    # Make the baseline impossibly fast
+    fast = [r._replace(seconds=r.seconds / 1e6) for r in results.values()]
+    save_results(fast, baseline)
+    assert main([*args, "-o", out, "--baseline", baseline]) == 1
+
+
+def test_main_requires_a_baseline(tmp_path):
+    args = ["--quick", "-s", "clock", "-k", "clock.bars.1d.*", "--no-memory"]
+    args += ["-o", str(tmp_path / "out.json")]
+    missing = str(tmp_path / "missing.json")
+    assert main([*args, "--baseline", missing]) == 1
+    assert main([*args, "--baseline", missing, "--no-compare"]) == 0
+
+
+def test_main_only_builds_selected_benchmarks(tmp_path, monkeypatch):
+    built = []
+    build = suites.synthetic_price_action.__wrapped__
+
+    def tracked(years: int, interval: str = "1m"):
+        built.append((years, interval))
+        return build(years, interval)
+
+    monkeypatch.setattr(suites, "synthetic_price_action", tracked)
+    args = ["-s", "simulation", "-k", "simulation.vectorized.1d.1y", "--no-memory"]
+    assert main([*args, "-o", str(tmp_path / "out.json"), "--no-compare"]) == 0
+    assert built == [(1, "1d")]
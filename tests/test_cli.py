@@ -0,0 +1,113 @@
+# pylint: disable=C0103,W0614,W0401
+import json
+import subprocess
+import sys
+import pytest
+from datetime import datetime
+
+from tests import *
+from src.backtests import cli
+from src.backtests import core
+
+tcs_lazy_imports = TestCases(
+    "test_lazy_imports",
+    [
+        TestCase(
+            "help",
+            code="from src.backtests.cli import parse_args",
+            result=[],
+        ),
+        TestCase(
+            "package",
+            code="import src.backtests.core, src.backtests.trader",
+            result=[],
+        ),
+        TestCase(
+            "clock",
+            code="from src.backtests.core import Clock",
+            result=["pandas"],
+        ),
+        TestCase(
+            "worker",
+            code="from src.backtests.distributed import Worker",
+            result=["pandas"],
+        ),
+    ],
+)
+
+
+@pytest.mark.parametrize("tc", tcs_lazy_imports, ids=tids(tcs_lazy_imports))
+def test_lazy_imports(tc: TestCasesIter):
+    """The heavy dependencies are imported only by the modules that use them"""
+
+    def run(code: str) -> list[str]:
+        heavy = ["pandas", "yfinance", "pydantic", "pandas_market_calendars"]
+        check = f"{code}; import sys; print(' '.join(m for m in {heavy} if m in sys.modules))"
+        out = subprocess.run(
+            [sys.executable, "-c", check], check=True, capture_output=True, text=True
+        )
+        return out.stdout.split()
+
+    tc.case.run_test(run)
+
+
+def test_lazy_exports():
+    assert "Clock" in dir(core) and "Clock" in core.__all__
+    assert core.Clock is core.clock.Clock
+    with pytest.raises(AttributeError):
+        core.NotAnExport  # pylint: disable=W0104
+
+
+def test_sweep_params():
+    cfg = {
+        "fn": "tests.test_distributed:sma_cross",
+        "params": {"log": "runs.log"},
+        "grid": {"ticker": ["SPY", "QQQ"], "fast": [5, 10]},
+        "walk_forward": {
+            "start": "2022-01-01",
+            "end": "2023-01-01",
+            "train_days": 180,
+            "test_days": 60,
+        },
+    }
+    params = cli.sweep_params(cfg)
+    assert len(params) == 2 * 2 * 3
+    assert params[0]["log"] == "runs.log"
+    assert params[0]["test_start"] == datetime(2022, 6, 30)
+
+
+def test_run(tmp_path, capsys):
+    cfg = tmp_path / "spy.json"
+    params = {
+        "ticker": "SPY",
+        "fast": 5,
+        "slow": 20,
+        "test_start": {"__datetime__": "2024-01-01"},
+        "test_end": {"__datetime__": "2024-06-01"},
+        "log": str(tmp_path / "runs.log"),
+    }
+    cfg.write_text(
+        json.dumps({"fn": "tests.test_distributed:sma_cross", "params": params})
+    )
+    assert cli.main(["run", str(cfg), "--store", str(tmp_path / "store")]) == 0
+    assert "sharpe" in capsys.readouterr().out
+    assert (tmp_path / "store" / "spy.npz").exists()
+
+
+def test_fetch(tmp_path, capsys):
+    argv = ["fetch", "SPY", "QQQ", "--start", "2024-01-01", "--end", "2024-02-01"]
+    argv += ["--synthetic", "--cache", str(tmp_path)]
+    assert cli.main(argv) == 0
+    assert cli.main(argv) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert [l.split()[-1] for l in out] == ["fetched"] * 2 + ["cached"] * 2
+
+
+def test_replay(capsys):
+    argv = ["replay", "-n", "3", "--start", "2024-01-02", "--end", "2024-01-03"]
+    argv += ["-i", "30m"]
+    # As fast as possible: the sustainable speed, not a verdict
+    assert cli.main(argv) == 0
+    assert "Sustains up to" in capsys.readouterr().out
+    assert cli.main([*argv, "--speed", "36000", "--tcp"]) == 0
+    assert "Keeps up with the 0.05s bars" in capsys.readouterr().out
@@ -7,7 +7,8 @@ from tests import *
 from tests.utils import get_datetime
 from src.backtests.config import TIME_FMT_DAY
 from src.backtests.core import Bar, Clock
-from src.backtests.exceptions import IntervalNotSupported
+from src.backtests.core.clock import get_schedule
+from src.backtests.exceptions import CalendarNotSupported, IntervalNotSupported
 
 
 _start = datetime(year=2001, month=11, day=1)
@@ -172,3 +173,91 @@ tcs_clock_iters = TestCases(
 def test_clock_iterator(tcs: TestCasesIter):
     iterator = Clock(**tcs.case.meta)
     tcs.case.run_test(iterator)
+
+
+_clock_kwargs = {"start": datetime(2024, 1, 1), "end": datetime(2024, 3, 1)}
+tcs_clock_len = TestCases(
+    "test_clock_len",
+    [
+        TestCase(interval=i, extended=e, **_clock_kwargs)
+        for i in ["1m", "10m", "1h", "1d", "1w"]
+        for e in (False, True)
+    ]
+    + [
+        TestCase(interval=i, calendars=c, **_clock_kwargs)
+        for i in ["10m", "1d", "1w"]
+        for c in (["NYSE", "LSE"], ["JPX"], ["NYSE", "CME_Equity", "JPX"])
+    ],
+)
+
+
+@pytest.mark.parametrize("tc", tcs_clock_len, ids=tids(tcs_clock_len))
+def test_clock_len(tc: TestCasesIter):
+    """``len(clock)`` is computed from the schedule, it must match the iteration"""
+    c = Clock(**tc.case.meta)
+    assert len(c) == sum(1 for _ in c)
+
+
+@pytest.mark.parametrize("tc", tcs_clock_len, ids=tids(tcs_clock_len))
+def test_clock_bar_times(tc: TestCasesIter):
+    """The vectorized bar times must match the iteration"""
+    c = Clock(**tc.case.meta)
+    opens, closes = c.bar_times()
+    assert [Bar(o, cl) for o, cl in zip(opens, closes)] == list(c)
+
+
+def test_clock_extended_hours():
+    c = Clock(**_time_range_1d, interval="1h", extended=True)
+    bars = list(c)
+    assert bars[0] == Bar(_dt("2025-04-07T04:00"), _dt("2025-04-07T05:00"))
+    assert bars[-1] == Bar(_dt("2025-04-07T19:00"), _dt("2025-04-07T20:00"))
+
+
+def test_clock_seek():
+    c = Clock(**_time_range_1wk, interval="1h")
+    bars = list(c)
+    assert c.position == len(bars) == len(c)
+    assert list(c.seek(10)) == bars[10:]
+    assert c.time == bars[-1].open
+    assert list(c) == bars  # seeking only affects a single iteration
+    with pytest.raises(IndexError):
+        c.seek(len(bars) + 1)
+
+
+def _utc(s: str) -> datetime:
+    return get_datetime(s, "%Y-%m-%dT%H:%M", ZoneInfo("UTC"))
+
+
+def test_clock_multi_calendar():
+    c = Clock(
+        **_time_range_1d, interval="1h", calendars=["NYSE", "LSE"], timezone="UTC"
+    )
+    bars = list(c)
+    # One timeline from the LSE open to the NYSE close
+    assert bars[0] == Bar(_utc("2025-04-07T07:00"), _utc("2025-04-07T08:00"))
+    assert bars[-1] == Bar(_utc("2025-04-07T19:00"), _utc("2025-04-07T20:00"))
+    assert all(b.close_ns == n.open_ns for b, n in zip(bars, bars[1:]))
+    flags = c.open_flags()
+    assert flags.index.equals(c.bar_times()[0])
+    # LSE closes 15:30, NYSE opens 13:30 UTC
+    assert flags["LSE"].tolist() == [True] * 9 + [False] * 4
+    assert flags["NYSE"].tolist() == [False] * 6 + [True] * 7
+
+
+def test_clock_calendar_breaks():
+    c = Clock(**_time_range_1d, interval="1h", calendars=["JPX"], timezone="UTC")
+    opens = [b.open for b in c]
+    # The lunch break (02:30 - 03:30 UTC) splits the session
+    assert _utc("2025-04-07T02:00") in opens and _utc("2025-04-07T03:30") in opens
+    assert _utc("2025-04-07T02:30") not in opens
+    assert c.open_flags()["JPX"].all()
+
+
+def test_clock_schedule_cache():
+    get_schedule.cache_clear()
+    Clock(**_time_range_1wk, calendars=["NYSE", "LSE"])
+    Clock(**_time_range_1wk, interval="1h", calendars=["LSE"])
+    info = get_schedule.cache_info()
+    assert (info.misses, info.hits) == (2, 1)
+    with pytest.raises(CalendarNotSupported):
+        Clock(**_time_range_1wk, calendars=["NOPE"])
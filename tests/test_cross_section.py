@@ -0,0 +1,144 @@
+# pylint: disable=C0103,W0614,W0401
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+
+from tests import *
+from src.backtests.core import SyntheticClient, PriceAction
+from src.backtests.exceptions import InvalidUniverseError
+from src.backtests.strategies import (
+    Universe,
+    rank,
+    percentile,
+    zscore,
+    quantile_buckets,
+    top_k,
+    percentile_filter,
+    weights,
+    hold,
+    portfolio_returns,
+)
+
+nan = np.nan
+_x = np.array(
+    [
+        [3.0, 1.0, nan, 2.0],
+        [1.0, 1.0, 5.0, 0.0],
+        [nan, nan, nan, 7.0],
+    ]
+)
+
+
+def test_rank_matches_pandas():
+    x = np.random.default_rng(0).normal(size=(50, 12))
+    x[x < -1.5] = nan
+    expected = pd.DataFrame(x).rank(axis=1, ascending=False, method="first")
+    np.testing.assert_array_equal(rank(x), expected.to_numpy())
+    expected = pd.DataFrame(x).rank(axis=1, method="first")
+    np.testing.assert_array_equal(rank(x, ascending=True), expected.to_numpy())
+
+
+def test_rank_with_nans():
+    np.testing.assert_array_equal(
+        rank(_x), [[1, 3, nan, 2], [2, 3, 1, 4], [nan, nan, nan, 1]]
+    )
+
+
+def test_percentile():
+    np.testing.assert_allclose(
+        percentile(_x), [[1, 0, nan, 0.5], [0.5, 0.5, 1, 0], [nan, nan, nan, 1]]
+    )
+    x = np.random.default_rng(2).integers(0, 5, size=(50, 12)).astype(np.float64)
+    x[x == 4] = nan
+    r = pd.DataFrame(x).rank(axis=1, method="average")
+    n = pd.DataFrame(x).count(axis=1)
+    expected = r.sub(1).div(n - 1, axis=0).to_numpy()
+    np.testing.assert_allclose(percentile(x), expected)
+    # ties share their average rank, wherever they are
+    np.testing.assert_allclose(
+        percentile([[2.0, 7.0, 2.0, nan, 2.0, 7.0]]),
+        [[0.25, 0.875, 0.25, nan, 0.25, 0.875]],
+    )
+
+
+def test_zscore():
+    x = np.random.default_rng(1).normal(size=(20, 8))
+    x[0, :3] = nan
+    df = pd.DataFrame(x)
+    expected = df.sub(df.mean(axis=1), axis=0).div(df.std(axis=1, ddof=0), axis=0)
+    np.testing.assert_allclose(zscore(x), expected.to_numpy())
+    np.testing.assert_array_equal(zscore([[2.0, 2.0, nan]]), [[0, 0, nan]])
+
+
+def test_quantile_buckets():
+    x = np.arange(10, dtype=np.float64)[None, :]
+    np.testing.assert_array_equal(
+        quantile_buckets(x, 5), [[0, 0, 1, 1, 2, 2, 3, 3, 4, 4]]
+    )
+    np.testing.assert_array_equal(quantile_buckets(_x, 2)[0], [1, 0, -1, 1])
+    # tied tickers land in the same bucket
+    np.testing.assert_array_equal(quantile_buckets(_x, 2)[1], [1, 1, 1, 0])
+
+
+def test_top_k_and_filters():
+    np.testing.assert_array_equal(
+        top_k(_x, 2),
+        [[True, False, False, True], [True, False, True, False], [False] * 3 + [True]],
+    )
+    np.testing.assert_array_equal(
+        percentile_filter(_x, low=0.5)[0], [True, False, False, True]
+    )
+    np.testing.assert_array_equal(
+        percentile_filter(_x, high=0.4)[1], [False, False, False, True]
+    )
+    with pytest.raises(InvalidUniverseError):
+        percentile_filter(_x, low=0.6, high=0.5)
+
+
+def test_weights():
+    mask = top_k(_x, 2)
+    w = weights(mask)
+    np.testing.assert_allclose(w.sum(axis=1), [1, 1, 1])
+    np.testing.assert_allclose(w[0], [0.5, 0, 0, 0.5])
+    np.testing.assert_allclose(weights(mask, scores=_x)[0], [0.6, 0, 0, 0.4])
+    vol = np.array([[1.0, 1.0, 1.0, 3.0]] * 3)
+    np.testing.assert_allclose(weights(mask, inverse_vol=vol)[0], [0.75, 0, 0, 0.25])
+    np.testing.assert_allclose(weights(mask, cap=0.3, gross=-1)[0], [-0.3, 0, 0, -0.3])
+    np.testing.assert_array_equal(weights(np.zeros((2, 3), bool)), np.zeros((2, 3)))
+
+
+def test_hold_and_portfolio_returns():
+    w = np.array([[1.0, 0.0], [0.0, 1.0], [0.5, 0.5], [1.0, 0.0]])
+    held = hold(w, every=2, offset=1)
+    np.testing.assert_array_equal(held, [[0, 0], [0, 1], [0, 1], [1, 0]])
+    r = np.array([[nan, nan], [0.1, -0.1], [0.2, 0.05], [0.0, 0.3]])
+    pr = portfolio_returns(held, r, cost=0.01)
+    # bar 2 earns the weights set at the close of bar 1, minus 2 units of turnover
+    np.testing.assert_allclose(pr, [0, -0.01, 0.05, 0.3 - 0.02])
+
+
+def test_universe_alignment():
+    start, end = datetime(2023, 1, 3), datetime(2023, 3, 1)
+    pas = SyntheticClient(seed=2).get_universe(["A", "B", "C"], start, end, "1d")
+    # B misses a few bars
+    b = pas["B"]
+    pas["B"] = PriceAction(
+        ticker="B", data=b.data.iloc[5:].copy(), start=b.start, end=b.end, chunk=None
+    )
+    uni = Universe.from_price_actions(pas)
+    assert uni.shape == (len(pas["A"].data), 3)
+    close = uni.frame("Close")
+    pd.testing.assert_series_equal(
+        close["A"], pas["A"].data["Close"], check_names=False, check_freq=False
+    )
+    assert close["B"].iloc[:5].isna().all()
+    assert (close["B"].iloc[5:] == pas["B"].data["Close"]).all()
+
+    ret = uni.returns(10)
+    expected = close.pct_change(10, fill_method=None).to_numpy()
+    np.testing.assert_allclose(ret, expected)
+    assert np.isnan(rank(ret)[10, 1])  # B has no 10 bar history yet
+
+    with pytest.raises(InvalidUniverseError):
+        uni.field("Missing")
@@ -0,0 +1,159 @@
+# pylint: disable=C0103,W0614,W0401
+import os
+import time
+import pytest
+from datetime import datetime, timedelta
+
+from tests import *
+from src.backtests.analysis import BacktestResult, ResultsStore
+from src.backtests.core import SyntheticClient
+from src.backtests.distributed import (
+    JobQueue,
+    Worker,
+    run_workers,
+    grid,
+    walk_forward,
+    shards,
+    DONE,
+    FAILED,
+    PENDING,
+)
+from src.backtests.trader import ExecutionModel
+from src.backtests.exceptions import JobQueueError
+
+
+# pylint: disable=W0613
+def sma_cross(
+    ticker: str,
+    fast: int,
+    slow: int,
+    test_start: datetime,
+    test_end: datetime,
+    log: str,
+    **window,
+) -> BacktestResult:
+    """The job of the tests, logs every execution to |log|"""
+    with open(log, "a") as f:
+        f.write(f"{ticker},{fast},{slow},{test_start.date()}\n")
+    pa = SyntheticClient(seed=0).get_price_action(ticker, test_start, test_end, "1d")
+    sim = ExecutionModel().simulate(pa, pa.get_sma_cross(fast, slow).position, 1000.0)
+    return BacktestResult.from_simulation("", pa, sim)
+
+
+def flaky(marker: str) -> BacktestResult:
+    """Fails on the first attempt"""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        raise RuntimeError("first attempt")
+    return sma_cross(
+        "SPY", 5, 20, datetime(2024, 1, 1), datetime(2024, 6, 1), os.devnull
+    )
+
+
+def slow(log: str, seconds: float) -> BacktestResult:
+    """Outlives the lease of the tests' queue, unless it's renewed"""
+    with open(log, "a") as f:
+        f.write(f"{os.getpid()}\n")
+    time.sleep(seconds)
+    return sma_cross(
+        "SPY", 5, 20, datetime(2024, 1, 1), datetime(2024, 6, 1), os.devnull
+    )
+
+
+def broken() -> BacktestResult:
+    raise RuntimeError("always")
+
+
+tcs_walk_forward = TestCases(
+    "test_walk_forward",
+    [
+        TestCase(train=365, test=90, step=None, result=4),
+        TestCase(train=365, test=90, step=30, result=10),
+        TestCase(train=800, test=90, step=None, result=0),
+    ],
+)
+
+
+@pytest.mark.parametrize("tc", tcs_walk_forward, ids=tids(tcs_walk_forward))
+def test_walk_forward(tc: TestCasesIter):
+    def run(train, test, step):
+        w = walk_forward(
+            datetime(2020, 1, 1),
+            datetime(2021, 12, 31),
+            timedelta(days=train),
+            timedelta(days=test),
+            step and timedelta(days=step),
+        )
+        assert all(x["train_end"] == x["test_start"] for x in w)
+        return len(w)
+
+    tc.case.run_test(run)
+
+
+def test_workers(tmp_path):
+    log = tmp_path / "runs.log"
+    params = shards(
+        grid(ticker=["SPY", "QQQ"], fast=[5, 10], slow=[20, 40], log=[str(log)]),
+        walk_forward(
+            datetime(2022, 1, 1),
+            datetime(2023, 1, 1),
+            timedelta(days=180),
+            timedelta(days=60),
+        ),
+    )
+    q = JobQueue(tmp_path / "jobs.db")
+    ids = q.submit_many("tests.test_distributed:sma_cross", params)
+    # Resubmitting the same jobs doesn't queue them twice
+    assert q.submit_many("tests.test_distributed:sma_cross", params) == ids
+    assert q.counts()[PENDING] == len(params) == 24
+
+    procs = run_workers(q, tmp_path / "store", 4, poll=0.05)
+    for p in procs:
+        p.join(120)
+    assert q.counts()[DONE] == len(params)
+    # Every job ran exactly once
+    runs = log.read_text().splitlines()
+    assert len(runs) == len(set(runs)) == len(params)
+    store = ResultsStore(tmp_path / "store")
+    assert sorted(store.summary().index) == sorted(ids)
+    assert store.get(ids[0]).params["job"]["ticker"] == "SPY"
+
+
+def test_retries(tmp_path):
+    q = JobQueue(tmp_path / "jobs.db", max_attempts=2)
+    ok = q.submit("tests.test_distributed:flaky", {"marker": str(tmp_path / "m")})
+    bad = q.submit("tests.test_distributed:broken", {})
+    Worker(q, ResultsStore(tmp_path / "store"), poll=0.01).run()
+    jobs = {j["id"]: j for j in q.jobs()}
+    assert jobs[ok]["status"] == DONE and jobs[ok]["attempts"] == 2
+    assert jobs[bad]["status"] == FAILED and jobs[bad]["attempts"] == 2
+    assert "always" in jobs[bad]["error"]
+
+
+def test_lease_expiry(tmp_path):
+    q = JobQueue(tmp_path / "jobs.db", lease_seconds=0.05)
+    job = q.submit("tests.test_distributed:broken", {})
+    assert q.claim("dead").id == job
+    assert q.claim("alive") is None
+    time.sleep(0.1)
+    assert q.claim("alive").attempts == 2
+    # The dead worker can't report the job anymore
+    assert not q.complete(job, "dead")
+    assert q.complete(job, "alive")
+
+
+def test_heartbeat_renews_the_lease(tmp_path):
+    log = tmp_path / "runs.log"
+    q = JobQueue(tmp_path / "jobs.db", lease_seconds=0.6)
+    job = q.submit("tests.test_distributed:slow", {"log": str(log), "seconds": 1.5})
+    procs = run_workers(q, tmp_path / "store", 2, poll=0.05)
+    for p in procs:
+        p.join(60)
+    assert len(log.read_text().splitlines()) == 1
+    (status,) = q.jobs()
+    assert (status["id"], status["status"], status["attempts"]) == (job, DONE, 1)
+
+
+def test_invalid_fn(tmp_path):
+    with pytest.raises(JobQueueError):
+        JobQueue(tmp_path / "jobs.db").submit("no_module_separator", {})
@@ -0,0 +1,124 @@
+# pylint: disable=C0103,W0614,W0401
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import timedelta
+
+from tests import *
+from tests.utils import get_price_action
+from src.backtests.trader import (
+    ExecutionModel,
+    Commission,
+    FixedSpread,
+    PercentSlippage,
+    IntrabarFill,
+)
+from src.backtests.exceptions import InvalidExecutionModelError
+
+
+_close = [10.0, 11.0, 12.0, 11.0, 10.0, 12.0, 13.0, 14.0, 13.0]
+_open = [c - 0.5 for c in _close]
+_signal = np.array([0, 1, 0, 0, -1, 1, 1, 0, -1])
+
+
+def _brute_force(pa, fills, cash: float, fixed: float, rate: float) -> list[float]:
+    """Reference bar by bar simulation of the fills"""
+    by_bar = dict(zip(fills.index.tolist(), zip(fills.side, fills.price)))
+    shares, equity = 0.0, []
+    for t, c in enumerate(pa.data["Close"]):
+        if t in by_bar:
+            side, p = by_bar[t]
+            if side == 1:
+                shares, cash = (cash - fixed) / (p * (1 + rate)), 0.0
+            else:
+                shares, cash = 0.0, shares * p * (1 - rate) - fixed
+        equity.append(cash if shares == 0 else shares * c)
+    return equity
+
+
+tcs_execution = TestCases(
+    "test_execution",
+    [
+        TestCase(
+            "close_no_costs",
+            model=ExecutionModel(fill_at="close"),
+            result=([1, 4, 5, 8], [11.0, 10.0, 12.0, 13.0]),
+        ),
+        TestCase(
+            "next_open_spread",
+            model=ExecutionModel(slippage=FixedSpread(0.2)),
+            result=([2, 5, 6], [11.6, 11.4, 12.6]),
+        ),
+        TestCase(
+            "next_open_pct",
+            model=ExecutionModel(
+                commission=Commission(fixed=1.0, rate=0.01),
+                slippage=PercentSlippage(0.1),
+            ),
+            result=([2, 5, 6], [12.65, 10.35, 13.75]),
+        ),
+    ],
+)
+
+
+def _simulate(model: ExecutionModel):
+    pa = get_price_action(_close, open_=_open)
+    res = model.simulate(pa, _signal, 1000.0)
+    expected = _brute_force(
+        pa, res.fills, 1000.0, model.commission.fixed, model.commission.rate
+    )
+    np.testing.assert_allclose(res.equity.to_numpy(), expected)
+    return res.fills.index.tolist(), np.round(res.fills.price, 6).tolist()
+
+
+@pytest.mark.parametrize("tc", tcs_execution, ids=tids(tcs_execution))
+def test_execution(tc: TestCasesIter):
+    tc.case.run_test(_simulate)
+
+
+def test_no_signals_keeps_cash():
+    pa = get_price_action(_close, open_=_open)
+    res = ExecutionModel().simulate(pa, np.zeros(len(_close)), 100.0)
+    assert (res.equity == 100.0).all()
+    assert len(res.fills.index) == 0
+
+
+def test_invalid_fill_at():
+    with pytest.raises(InvalidExecutionModelError):
+        ExecutionModel(fill_at="whenever")
+
+
+def test_intrabar_requires_next_open():
+    """Fine bars of the signal bar start before the close that fired it"""
+    with pytest.raises(InvalidExecutionModelError):
+        ExecutionModel(fill_at="close", intrabar=IntrabarFill(lambda s, e: None))
+
+
+def test_intrabar_loads_only_fill_bars():
+    loaded = []
+
+    def loader(start, end):
+        loaded.append(start)
+        idx = pd.date_range(start, periods=3, freq="1min")
+        return pd.DataFrame(
+            {"Open": [1.0, 2.0, 3.0], "Close": [2.0, 3.0, 4.0], "Volume": [1, 1, 2]},
+            index=idx,
+        )
+
+    pa = get_price_action(_close, open_=_open)
+    model = ExecutionModel(intrabar=IntrabarFill(loader, delay=timedelta(minutes=1)))
+    fills = model.fill(pa, _signal)
+    assert len(loaded) == len(fills.index) == 3
+    assert fills.price.tolist() == [2.0, 2.0, 2.0]
+
+    vwap = IntrabarFill(loader, window=timedelta(minutes=3))
+    fills = ExecutionModel(intrabar=vwap).fill(pa, _signal)
+    assert fills.price.tolist() == [3.25, 3.25, 3.25]
+
+    # Only the last `cache_size` bars are kept
+    loaded.clear()
+    small = IntrabarFill(loader, cache_size=2)
+    ExecutionModel(intrabar=small).fill(pa, _signal)
+    assert len(small._cache) == 2  # pylint: disable=W0212
+    ExecutionModel(intrabar=small).fill(pa, _signal)
+    assert len(loaded) == 6
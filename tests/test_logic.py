@@ -0,0 +1,127 @@
+# pylint: disable=C0103,W0614,W0401
+import numpy as np
+import pytest
+
+from tests import *
+from tests.utils import get_price_action
+from src.backtests.strategies import (
+    Col,
+    Sma,
+    Compare,
+    CrossUp,
+    CrossDown,
+    Method,
+    Trigger,
+    compile_logic,
+)
+from src.backtests.exceptions import InvalidLogicError, InvalidMethodError
+
+_close = [1.0, 2.0, 3.0, 2.0, 1.0, 2.0, 3.0]
+
+
+def _eval(logic):
+    return logic.evaluate(get_price_action(_close)).tolist()
+
+
+tcs_logic = TestCases(
+    "test_logic",
+    [
+        TestCase(
+            "gt_const",
+            logic=Col("Close") > 2,
+            result=[False, False, True, False, False, False, True],
+        ),
+        TestCase(
+            "le_const",
+            logic=Col("Close") <= 1,
+            result=[True, False, False, False, True, False, False],
+        ),
+        TestCase(
+            "eq_const",
+            logic=Compare(Col("Close"), "==", 2.0 + 0 * Col("Close")),
+            result=[False, True, False, True, False, True, False],
+        ),
+        TestCase(
+            "and_not",
+            logic=(Col("Close") > 1) & ~(Col("Close") > 2),
+            result=[False, True, False, True, False, True, False],
+        ),
+        TestCase(
+            "or",
+            logic=(Col("Close") < 2) | (Col("Close") > 2),
+            result=[True, False, True, False, True, False, True],
+        ),
+        # SMA_2: nan, 1.5, 2.5, 2.5, 1.5, 1.5, 2.5
+        TestCase(
+            "cross_up",
+            logic=CrossUp(Col("Close"), Sma(2)),
+            result=[False, False, False, False, False, True, False],
+        ),
+        TestCase(
+            "cross_down",
+            logic=CrossDown(Col("Close"), Sma(2)),
+            result=[False, False, False, True, False, False, False],
+        ),
+        # NaNs never compare as True, not even with !=
+        TestCase(
+            "ne_nan",
+            logic=Compare(Col("Close"), "!=", Sma(2)),
+            result=[False, True, True, True, True, True, True],
+        ),
+        TestCase("missing_col", logic=Col("Nope") > 1, raises=InvalidLogicError),
+    ],
+)
+
+
+@pytest.mark.parametrize("tc", tcs_logic, ids=tids(tcs_logic))
+def test_logic(tc: TestCasesIter):
+    tc.case.run_test(_eval)
+
+
+def _step(logic, close: list[float]) -> list[bool]:
+    compiled = compile_logic([logic])
+    states = compiled.init_states()
+    return [compiled.step({"Close": c}, states)[0] for c in close]
+
+
+def test_step_matches_evaluate():
+    logic = Compare(Col("Close"), "!=", Sma(2)) | CrossUp(Col("Close"), Sma(2))
+    assert _step(logic, _close) == _eval(logic)
+
+
+def test_step_sma_recovers_from_nans():
+    close = [1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0, np.nan, 9.0, 10.0, 11.0]
+    sma = Sma(3)
+    state = sma.init_state()
+    stepped = [sma.step({"Close": c}, [], state) for c in close]
+    expected = get_price_action(close).get_sma(3).sma.to_numpy()
+    np.testing.assert_allclose(stepped, expected)
+    assert not np.isnan(stepped[-1])
+
+    logic = Col("Close") > Sma(3)
+    assert _step(logic, close) == logic.evaluate(get_price_action(close)).tolist()
+
+
+def test_compile_dedupes_common_subexpressions():
+    a = CrossUp(Sma(2), Sma(3)) & (Col("Close") > Sma(3))
+    b = Col("Close") > Sma(3)
+    compiled = compile_logic([a, b])
+    # Close, SMA_2, SMA_3, cross, compare, and -> `b` is fully shared
+    assert len(compiled.program) == 6
+    res_a, res_b = compiled.evaluate(get_price_action(_close))
+    assert res_b.tolist() == _eval(b)
+    assert res_a.tolist() == _eval(a)
+
+
+def test_method_weighted_trigger():
+    m = Method(ticker="TEST", timed=False, conditioned=True)
+    m.register_trigger(Trigger(weight=1, logic=Col("Close") > 1))
+    m.register_trigger(Trigger(weight=3, logic=Col("Close") > 2))
+    pa = get_price_action(_close)
+    assert m.signals(pa).shape == (2, len(_close))
+    np.testing.assert_allclose(m.trigger(pa), [0.0, 0.25, 1.0, 0.25, 0.0, 0.25, 1.0])
+
+
+def test_method_requires_timed_or_conditioned():
+    with pytest.raises(InvalidMethodError):
+        Method(ticker="TEST", timed=False, conditioned=False)
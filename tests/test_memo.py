@@ -0,0 +1,103 @@
+# pylint: disable=C0103,W0614,W0401
+import os
+import numpy as np
+import pandas as pd
+
+from tests import *
+from tests.test_trader import _trader, _price_action
+from src.backtests.core import PriceAction
+from src.backtests.trader import RunCache, trader_key
+
+
+def test_hit_returns_the_same_run(tmp_path):
+    cache = RunCache(tmp_path)
+    pa = _price_action()
+    first, hit = cache.run(_trader(None), pa)
+    assert not hit
+    again, hit = cache.run(_trader(None), pa)
+    assert hit and (cache.hits, cache.misses) == (1, 1)
+    np.testing.assert_array_equal(first.equity, again.equity)
+    np.testing.assert_array_equal(first.position, again.position)
+    assert first.metrics == again.metrics
+    # The fills are stored too
+    assert len(first.trades) > 0 and first.metrics.turnover > 0
+    np.testing.assert_array_equal(first.trades.records, again.trades.records)
+    flips = np.flatnonzero(np.diff(first.position, prepend=0))
+    np.testing.assert_array_equal(first.trades.records["bar"], flips)
+    assert (first.trades.records["side"][::2] == 1).all()
+    # A cold run gives the same equity
+    fresh = _trader(None).run(pa).to_numpy()
+    np.testing.assert_array_equal(fresh, again.equity)
+
+
+def test_reused_trader(tmp_path):
+    cache = RunCache(tmp_path)
+    pa = _price_action()
+    data = pa.data.copy()
+    data.iloc[10:, data.columns.get_loc("Close")] *= 1.05
+    pa2 = PriceAction(ticker="SPY", data=data, start=pa.start, end=pa.end, chunk=None)
+    trader = _trader(None)
+    first, _ = cache.run(trader, pa)
+    kept = first.equity.copy()
+    second, hit = cache.run(trader, pa2)
+    assert not hit
+    # Both runs start from the cash, as cold runs do
+    np.testing.assert_array_equal(second.equity, _trader(None).run(pa2).to_numpy())
+    np.testing.assert_array_equal(
+        second.position, cache.run(_trader(None), pa2)[0].position
+    )
+    np.testing.assert_array_equal(first.equity, kept)
+    np.testing.assert_array_equal(first.equity, _trader(None).run(pa).to_numpy())
+
+
+def test_key_changes_with_the_inputs():
+    pa = _price_action()
+    key = trader_key(_trader(None), pa)
+    assert key == trader_key(_trader(None), pa)
+    # trader params
+    assert key != trader_key(_trader(None, threshold=0.9), pa)
+    assert key != trader_key(_trader(None, fill_at="next_open"), pa)
+    # the bars
+    data = pa.data.copy()
+    data.iloc[10, data.columns.get_loc("Close")] *= 1.01
+    changed = PriceAction(
+        ticker="SPY", data=data, start=pa.start, end=pa.end, chunk=None
+    )
+    assert key != trader_key(_trader(None), changed)
+    missing = PriceAction(
+        ticker="SPY", data=pa.data.iloc[:-3], start=pa.start, end=pa.end, chunk=None
+    )
+    assert key != trader_key(_trader(None), missing)
+    # bars outside of the clock's range don't matter
+    before = pa.data.iloc[:3].copy()
+    before.index = before.index - pd.Timedelta(days=100)
+    extra = PriceAction(
+        ticker="SPY",
+        data=pd.concat([before, pa.data]),
+        start=pa.start,
+        end=pa.end,
+        chunk=None,
+    )
+    assert key == trader_key(_trader(None), extra)
+
+
+def test_eviction_and_invalidation(tmp_path):
+    cache = RunCache(tmp_path, max_bytes=None)
+    pa = _price_action()
+    result, _ = cache.run(_trader(None), pa)
+    size = cache.size()
+    cache.clear()
+    keys = [f"k{i}" for i in range(4)]
+    for i, k in enumerate(keys):
+        cache.put(k, result)
+        os.utime(cache.path(k), ns=(i, i))
+    cache.get("k0")  # k0 is the most recently used now
+
+    cache.max_bytes = 3 * size
+    cache.evict()
+    assert [k in cache for k in keys] == [True, False, True, True]
+
+    cache.invalidate("k2")
+    assert "k2" not in cache and cache.get("k2") is None
+    cache.invalidate(ticker="SPY")
+    assert cache.size() == 0
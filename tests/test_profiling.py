@@ -0,0 +1,45 @@
+import pytest
+
+from tests.utils import get_price_action
+from src.backtests.telemetry import Profiler, profiled, profile_block, active_profiler
+from src.backtests.exceptions import ProfilerError
+
+
+@profiled("outer")
+def _outer():
+    with profile_block("inner"):
+        return sum(range(1000))
+
+
+def test_hooks_are_noop_without_profiler():
+    assert active_profiler() is None
+    assert _outer() == sum(range(1000))
+
+
+def test_profiler_collects_stats_and_stacks(tmp_path):
+    with Profiler(track_memory=True) as prof:
+        for _ in range(3):
+            _outer()
+        pa = get_price_action([1.0, 2.0, 3.0, 4.0])
+        pa.get_sma_cross(2, 3)
+    assert active_profiler() is None
+
+    report = prof.report()
+    assert report.loc["outer", "calls"] == 3
+    assert report.loc["inner", "calls"] == 3
+    assert report.loc["indicators.get_sma", "calls"] == 2
+    assert report.loc["outer", "total"] >= report.loc["inner", "total"]
+
+    stacks = dict(line.rsplit(" ", 1) for line in prof.collapsed())
+    assert set(stacks) >= {"outer", "outer;inner", "indicators.get_sma_cross"}
+    assert "indicators.get_sma_cross;indicators.get_sma" in stacks
+
+    out = tmp_path / "run.folded"
+    prof.dump_collapsed(out)
+    assert out.read_text().splitlines() == prof.collapsed()
+
+
+def test_single_active_profiler():
+    with Profiler():
+        with pytest.raises(ProfilerError):
+            Profiler().start()
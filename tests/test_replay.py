@@ -0,0 +1,122 @@
+# pylint: disable=C0103,W0614,W0401
+import asyncio
+import time
+import numpy as np
+import pytest
+from datetime import datetime
+
+from tests import *
+from src.backtests.cli import _sma_trader
+from src.backtests.core import Clock, SyntheticClient
+from src.backtests.exceptions import ReplayError
+from src.backtests.replay import ReplayServer, ReplayConsumer, replay
+
+_range = {"start": datetime(2024, 1, 2), "end": datetime(2024, 1, 5)}
+_tickers = ["AAA", "BBB", "CCC"]
+
+
+def _universe(interval: str = "30m"):
+    pas = SyntheticClient(seed=4).get_universe(_tickers, interval=interval, **_range)
+    # BBB misses a few bars, flat & long
+    pas["BBB"].data = pas["BBB"].data.drop(pas["BBB"].data.index[[3, 4, 5, 30, 31]])
+    return pas, Clock(interval=interval, **_range)
+
+
+def _consumer(interval: str = "30m") -> ReplayConsumer:
+    return ReplayConsumer(
+        {t: _sma_trader(t, interval=interval, **_range) for t in _tickers}
+    )
+
+
+def _expected(pas, interval: str = "30m") -> dict[str, np.ndarray]:
+    return {
+        t: _sma_trader(t, interval=interval, **_range).run(pas[t]).to_numpy()
+        for t in _tickers
+    }
+
+
+def _expected_positions(pas, interval: str = "30m") -> dict[str, np.ndarray]:
+    ret = {}
+    for t in _tickers:
+        trader = _sma_trader(t, interval=interval, **_range)
+        trader.run(pas[t])
+        ret[t] = trader.positions
+    return ret
+
+
+def test_queue_replay_matches_run():
+    pas, clock = _universe()
+    consumer = _consumer()
+    report = asyncio.run(replay(ReplayServer.from_clock(pas, clock), consumer))
+    assert report.bars == len(clock)
+    assert report.decision_max >= report.decision_p99 >= report.decision_p50 > 0
+    # ~0.5ms per bar, a loaded machine still keeps up with 30m bars at 36000x
+    assert report.keeps_up(0.05)
+    per_bar = report.lag_p99 + report.decision_p99
+    assert report.max_speed(1800.0) == 1800.0 / per_bar > 36_000
+    equity = consumer.equity()
+    for t, expected in _expected(pas).items():
+        np.testing.assert_array_equal(equity[t].to_numpy(), expected)
+    for t, expected in _expected_positions(pas).items():
+        np.testing.assert_array_equal(consumer.traders[t].positions, expected)
+
+
+def test_replay_twice():
+    """A second replay into the same consumer starts over from the cash"""
+    pas, clock = _universe()
+    consumer = _consumer()
+    for _ in range(2):
+        asyncio.run(replay(ReplayServer.from_clock(pas, clock), consumer))
+        assert consumer.report().bars == len(clock)
+        equity = consumer.equity()
+        for t, expected in _expected(pas).items():
+            np.testing.assert_array_equal(equity[t].to_numpy(), expected)
+
+
+def test_tcp_replay_matches_run():
+    pas, clock = _universe()
+    server = ReplayServer.from_clock(pas, clock)
+    consumers = [_consumer(), _consumer()]
+
+    async def main():
+        srv = await server.serve()
+        async with srv:
+            host, port = srv.sockets[0].getsockname()[:2]
+            await asyncio.gather(*(c.connect(host, port) for c in consumers))
+
+    asyncio.run(main())
+    expected = _expected(pas)
+    for c in consumers:
+        assert c.report().bars == len(clock)
+        for t in _tickers:
+            np.testing.assert_array_equal(c.equity()[t].to_numpy(), expected[t])
+
+
+def test_speed():
+    pas, clock = _universe("1m")
+    server = ReplayServer.from_clock(pas, clock, speed=600.0, max_gap=60.0)
+    events = []
+
+    async def main():
+        queue: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(server.stream(queue))
+        while len(events) < 6:
+            events.append(await queue.get())
+            events[-1] = (events[-1], time.monotonic())
+        task.cancel()
+
+    asyncio.run(main())
+    # 1m bars at 600x are 0.1s apart
+    gaps = np.diff([t for _, t in events])
+    assert (gaps > 0.08).all() and (gaps < 0.3).all()
+
+
+def test_invalid():
+    pas, clock = _universe()
+    with pytest.raises(ReplayError):
+        ReplayServer.from_clock(pas, clock, speed=0)
+    short = ReplayConsumer(
+        {"AAA": _sma_trader("AAA", _range["start"], datetime(2024, 1, 4), "30m")}
+    )
+    with pytest.raises(ReplayError):
+        short.start(ReplayServer.from_clock(pas, clock).handshake)
@@ -0,0 +1,99 @@
+# pylint: disable=C0103,W0614,W0401
+import numpy as np
+import pytest
+
+from tests import *
+from tests.utils import get_price_action
+from src.backtests.analysis import (
+    StreamingMetrics,
+    compute_metrics,
+    BacktestResult,
+    ResultsStore,
+)
+from src.backtests.analysis import metrics
+from src.backtests.trader import ExecutionModel, Commission
+from src.backtests.exceptions import ResultNotFoundError
+
+
+_equity = np.array([100.0, 110.0, 99.0, 105.0, 120.0, 90.0, 95.0])
+
+tcs_metrics = TestCases(
+    "test_metrics",
+    [
+        TestCase("max_drawdown", f=metrics.max_drawdown, result=0.25),
+        TestCase("max_drawdown_duration", f=metrics.max_drawdown_duration, result=2),
+        TestCase("cagr", f=lambda e: metrics.cagr(e, periods_per_year=6), result=-0.05),
+    ],
+)
+
+
+@pytest.mark.parametrize("tc", tcs_metrics, ids=tids(tcs_metrics))
+def test_metrics(tc: TestCasesIter):
+    f = tc.case.meta["f"]
+    assert np.isclose(f(_equity), tc.case.result)
+
+
+def test_metrics_are_vectorized_over_paths():
+    paths = np.vstack([_equity, _equity * 2, _equity[::-1]])
+    np.testing.assert_allclose(
+        metrics.sharpe(paths), [metrics.sharpe(p) for p in paths]
+    )
+    np.testing.assert_array_equal(
+        metrics.max_drawdown_duration(paths),
+        [metrics.max_drawdown_duration(p) for p in paths],
+    )
+
+
+def test_streaming_metrics_match_batch():
+    rng = np.random.default_rng(0)
+    equity = 100 * np.cumprod(1 + rng.normal(0, 0.01, 500))
+    position = rng.integers(0, 2, 500)
+    traded = np.where(rng.random(500) < 0.05, 1000.0, 0.0)
+    s = StreamingMetrics()
+    s.update_many(equity[:200], position[:200], traded[:200])
+    s.update_many(equity[200:], position[200:], traded[200:])
+    batch = compute_metrics(equity, position, traded).as_dict()
+    for k, v in s.metrics().as_dict().items():
+        assert np.isclose(v, batch[k]), k
+
+
+def _result(name: str = "smas") -> BacktestResult:
+    close = [10.0, 11.0, 12.0, 11.0, 10.0, 12.0, 13.0, 14.0, 13.0]
+    pa = get_price_action(close, open_=close)
+    model = ExecutionModel(commission=Commission(fixed=1.0), fill_at="close")
+    sim = model.simulate(pa, np.array([0, 1, 0, 0, -1, 1, 0, 0, 0]), 1000.0)
+    return BacktestResult.from_simulation(name, pa, sim, params={"fast": 1})
+
+
+def test_result_from_simulation():
+    res = _result()
+    assert res.position.tolist() == [0, 1, 1, 1, 0, 1, 1, 1, 1]
+    assert res.trades.records["side"].tolist() == [1, -1, 1]
+    assert res.trades.records["commission"].tolist() == [1.0, 1.0, 1.0]
+    assert np.isclose(res.metrics.exposure, 7 / 9)
+
+
+def test_results_store(tmp_path):
+    store = ResultsStore(tmp_path)
+    res = _result()
+    store.put(res)
+    store.put(_result("other"))
+    assert "smas" in store
+    loaded = store.get("smas")
+    np.testing.assert_array_equal(loaded.equity, res.equity)
+    np.testing.assert_array_equal(loaded.trades.records, res.trades.records)
+    assert loaded.params == {"ticker": "TEST", "fast": 1}
+    summary = store.summary()
+    assert list(summary.index) == ["smas", "other"]
+    assert np.isclose(summary.loc["smas", "sharpe"], res.metrics.sharpe)
+    with pytest.raises(ResultNotFoundError):
+        store.get("nope")
+
+
+def test_result_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    res = _result()
+    res.save_parquet(tmp_path)
+    loaded = BacktestResult.load_parquet(tmp_path)
+    np.testing.assert_array_equal(loaded.equity, res.equity)
+    np.testing.assert_array_equal(loaded.trades.records, res.trades.records)
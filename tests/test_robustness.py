@@ -0,0 +1,85 @@
+# pylint: disable=C0103,W0614,W0401
+import numpy as np
+import pytest
+
+from tests import *
+from src.backtests.analysis import (
+    MonteCarlo,
+    block_bootstrap,
+    shuffle,
+    summarize,
+    perturb_params,
+)
+from src.backtests.exceptions import InvalidRobustnessConfigError
+
+_returns = np.random.default_rng(0).normal(0.001, 0.01, 250)
+
+
+def test_block_bootstrap_keeps_blocks():
+    r = np.arange(10, dtype=np.float64)
+    paths = block_bootstrap(r, 50, 5, np.random.default_rng(1))
+    assert paths.shape == (50, 10)
+    # inside a block the values are consecutive (circularly)
+    assert ((paths[:, 1:5] - paths[:, :4]) % 10 == 1).all()
+
+
+def test_shuffle_is_a_permutation():
+    paths = shuffle(_returns, 20, np.random.default_rng(1))
+    assert paths.shape == (20, len(_returns))
+    assert np.allclose(np.sort(paths, axis=1), np.sort(_returns))
+
+
+def test_summarize():
+    res = summarize(np.array([[0.1, -0.5, 0.2], [0.0, 0.0, 0.0]]), cash=100.0)
+    np.testing.assert_allclose(res.final_equity, [66.0, 100.0])
+    np.testing.assert_allclose(res.max_drawdown, [0.5, 0.0])
+
+
+def test_shuffle_keeps_final_equity():
+    """Compounding doesn't care about order, only the drawdowns change"""
+    res = MonteCarlo(_returns, method="shuffle", n_paths=100, seed=3).run()
+    np.testing.assert_allclose(res.final_equity, np.prod(1 + _returns))
+
+
+def test_run_is_deterministic_across_chunks_and_workers():
+    kwargs = {"n_paths": 300, "seed": 7, "memory_cap": 250 * 8 * 4 * 64}
+    a = MonteCarlo(_returns, **kwargs).run()
+    b = MonteCarlo(_returns, workers=2, **kwargs).run()
+    assert MonteCarlo(_returns, **kwargs).chunk_size == 64
+    assert len(a.final_equity) == 300
+    np.testing.assert_array_equal(a.final_equity, b.final_equity)
+    np.testing.assert_array_equal(a.max_drawdown, b.max_drawdown)
+
+
+def test_paths_are_the_paths_of_run():
+    for method in ("bootstrap", "shuffle"):
+        mc = MonteCarlo(
+            _returns, method=method, n_paths=300, seed=7, memory_cap=250 * 8 * 4 * 64
+        )
+        expected = summarize(mc.paths(), mc.cash)
+        res = mc.run()
+        np.testing.assert_array_equal(res.final_equity, expected.final_equity)
+        np.testing.assert_array_equal(res.max_drawdown, expected.max_drawdown)
+
+
+def test_perturb_params():
+    params = perturb_params({"fast": 50, "slow": 100, "stop": 0.02}, 10, seed=1)
+    assert len(params) == 10
+    for p in params:
+        assert isinstance(p["fast"], int) and p["fast"] >= 1
+        assert isinstance(p["stop"], float)
+
+
+tcs_monte_carlo_config = TestCases(
+    "test_monte_carlo_config",
+    [
+        TestCase(returns=_returns, method="nope", raises=InvalidRobustnessConfigError),
+        TestCase(returns=np.array([np.nan]), raises=InvalidRobustnessConfigError),
+        TestCase(returns=_returns, n_paths=0, raises=InvalidRobustnessConfigError),
+    ],
+)
+
+
+@pytest.mark.parametrize("tc", tcs_monte_carlo_config, ids=tids(tcs_monte_carlo_config))
+def test_monte_carlo_config(tc: TestCasesIter):
+    tc.case.run_test(MonteCarlo)
@@ -0,0 +1,103 @@
+# pylint: disable=C0103,W0614,W0401
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from tests import *
+from src.backtests.core import (
+    PriceAction,
+    SharedPriceAction,
+    SyntheticClient,
+    shared_price_action,
+)
+
+_range = {"start": datetime(2024, 1, 2), "end": datetime(2024, 2, 1)}
+
+
+def _price_action() -> PriceAction:
+    return SyntheticClient(seed=2).get_price_action("SPY", **_range, interval="5m")
+
+
+def _base(pa: PriceAction, handle: SharedPriceAction, col: str) -> np.ndarray:
+    """The shared buffer of |col|"""
+    offset = {c.name: c.offset for c in handle.columns}[col]
+    dtype = {c.name: c.dtype for c in handle.columns}[col]
+    return np.ndarray(handle.rows, np.dtype(dtype), pa.buffer.buf, offset)
+
+
+def _sma_in_worker(handle: SharedPriceAction) -> tuple[bool, float]:
+    pa = handle.attach()
+    pa.get_sma(20)
+    shared = np.shares_memory(pa.data["Close"].to_numpy(), _base(pa, handle, "Close"))
+    return shared, float(pa.data["SMA_20"].iat[-1])
+
+
+tcs_shared = TestCases(
+    "test_shared",
+    [
+        TestCase("all_columns", columns=None, indicators=False),
+        TestCase("some_columns", columns=["Open", "Close"], indicators=False),
+        TestCase("indicators", columns=None, indicators=True),
+    ],
+)
+
+
+@pytest.mark.parametrize("tc", tcs_shared, ids=tids(tcs_shared))
+def test_shared(tc: TestCasesIter):
+    meta = tc.case.meta
+    pa = _price_action()
+    if meta["indicators"]:
+        pa.get_sma_cross(10, 20)
+    with shared_price_action(pa, meta["columns"]) as handle:
+        attached = handle.attach()
+        expected = pa.data if meta["columns"] is None else pa.data[meta["columns"]]
+        pd.testing.assert_frame_equal(attached.data, expected, check_freq=False)
+        assert (attached.ticker, attached.start) == (pa.ticker, pa.start)
+        assert attached.active_smas == (pa.active_smas if meta["indicators"] else set())
+        for c in attached.data.columns:
+            arr = attached.data[c].to_numpy()
+            assert np.shares_memory(arr, _base(attached, handle, c))
+            assert not arr.flags.writeable
+
+        # Indicators are new local columns, the shared ones stay untouched
+        attached.get_sma(5)
+        attached.calc_return("Return")
+        assert np.shares_memory(
+            attached.data["Close"].to_numpy(), _base(attached, handle, "Close")
+        )
+        with pytest.raises(ValueError):
+            attached.data["Close"].to_numpy()[0] = 0.0
+
+
+@pytest.mark.parametrize("ctx", ["fork", "spawn"])
+def test_shared_across_processes(ctx: str):
+    pa = _price_action()
+    with shared_price_action(pa) as handle, ProcessPoolExecutor(
+        2, mp_context=mp.get_context(ctx)
+    ) as pool:
+        results = list(pool.map(_sma_in_worker, [handle] * 4))
+    expected = float(pa.get_sma(20).sma.iat[-1])
+    assert results == [(True, expected)] * 4
+
+
+def test_arrow_memory_map(tmp_path):
+    pytest.importorskip("pyarrow")
+    pa = _price_action()
+    pa.save(tmp_path / "spy.arrow")
+    loaded = PriceAction.load(tmp_path / "spy.arrow")
+    assert loaded.buffer is not None
+    assert not loaded.data["Close"].to_numpy().flags.writeable
+    loaded.get_sma_cross(10, 20)
+    np.testing.assert_array_equal(
+        loaded.data["SMA_10"].to_numpy(), pa.get_sma(10).sma.to_numpy()
+    )
+
+
+def test_not_numeric():
+    pa = _price_action()
+    pa.data["Note"] = "x"
+    with pytest.raises(TypeError):
+        SharedPriceAction.create(pa)
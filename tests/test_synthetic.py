@@ -0,0 +1,86 @@
+# pylint: disable=C0103,W0614,W0401
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+
+from tests import *
+from src.backtests.core import Clock, PriceAction, SyntheticClient
+from src.backtests.exceptions import (
+    InvalidSyntheticModelError,
+    UnsupportedFileFormatError,
+)
+
+_range = {"start": datetime(2024, 11, 25), "end": datetime(2024, 12, 6)}
+
+tcs_synthetic = TestCases(
+    "test_synthetic",
+    [
+        TestCase(model=m, interval=i, extended=e)
+        for m in ["gbm", "jump", "regime"]
+        for i, e in [("1m", False), ("5m", True), ("1d", False), ("1w", False)]
+    ],
+)
+
+
+@pytest.mark.parametrize("tc", tcs_synthetic, ids=tids(tcs_synthetic))
+def test_synthetic(tc: TestCasesIter):
+    meta = tc.case.meta
+    client = SyntheticClient(model=meta["model"], seed=3)
+    pa = client.get_price_action(
+        "SPY", **_range, interval=meta["interval"], extended=meta["extended"]
+    )
+    d = pa.data
+    opens, _ = Clock(
+        **_range, interval=meta["interval"], extended=meta["extended"]
+    ).bar_times()
+    assert d.index.equals(opens)
+    assert (d["High"] >= d[["Open", "Close"]].max(axis=1)).all()
+    assert (d["Low"] <= d[["Open", "Close"]].min(axis=1)).all()
+    assert (d["Volume"] >= 0).all() and (d["Close"] > 0).all()
+    again = client.get_price_action(
+        "SPY", **_range, interval=meta["interval"], extended=meta["extended"]
+    )
+    pd.testing.assert_frame_equal(d, again.data)
+
+
+def test_synthetic_half_day_and_universe():
+    universe = SyntheticClient(seed=1).get_universe(
+        ["SPY", "QQQ"], **_range, interval="1m"
+    )
+    spy, qqq = universe["SPY"].data, universe["QQQ"].data
+    # Black friday closes at 13:00
+    assert len(spy.loc["2024-11-29"]) == 210
+    assert spy.index.equals(qqq.index)
+    assert not np.allclose(spy["Close"], qqq["Close"])
+
+
+def test_synthetic_no_sessions():
+    client = SyntheticClient(model="regime")
+    weekend = {"start": datetime(2024, 12, 28), "end": datetime(2024, 12, 29)}
+    pa = client.get_price_action("SPY", **weekend, interval="1d")
+    assert pa.data.empty
+    assert list(pa.data.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert pa.data.index.tz is not None
+    christmas = {"start": datetime(2024, 12, 25), "end": datetime(2024, 12, 25, 23)}
+    universe = client.get_universe(["SPY", "QQQ"], **christmas, interval="1m")
+    assert all(p.data.empty for p in universe.values())
+
+
+def test_synthetic_invalid_model():
+    with pytest.raises(InvalidSyntheticModelError):
+        SyntheticClient(model="nope")
+
+
+@pytest.mark.parametrize("suffix", [".npz", ".parquet", ".arrow"])
+def test_price_action_save_load(tmp_path, suffix):
+    if suffix in (".parquet", ".arrow"):
+        pytest.importorskip("pyarrow")
+    pa = SyntheticClient().get_price_action("SPY", **_range, interval="1h")
+    path = tmp_path / f"spy{suffix}"
+    pa.save(path)
+    loaded = PriceAction.load(path)
+    pd.testing.assert_frame_equal(loaded.data, pa.data, check_freq=False)
+    assert (loaded.ticker, loaded.start, loaded.end) == (pa.ticker, pa.start, pa.end)
+    with pytest.raises(UnsupportedFileFormatError):
+        pa.save(tmp_path / "spy.csv")
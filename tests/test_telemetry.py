@@ -0,0 +1,55 @@
+import io
+import time
+
+from src.backtests.telemetry import (
+    Telemetry,
+    ConsoleProgress,
+    JsonLinesSink,
+    ProgressSnapshot,
+    format_progress,
+    read_json_lines,
+)
+from src.backtests.telemetry.progress import STAGES
+from tests.test_trader import _trader, _price_action
+
+
+def test_telemetry_publishes_to_sinks():
+    out = io.StringIO()
+    with Telemetry(10, sinks=[JsonLinesSink(out)], interval=0.01) as t:
+        for _ in range(10):
+            with t.stage("signal"):
+                time.sleep(0.002)
+            t.advance()
+        time.sleep(0.03)
+    out.seek(0)
+    snaps = read_json_lines(out)
+    assert len(snaps) >= 2
+    last = snaps[-1]
+    assert (last.total, last.processed, last.eta) == (10, 10, 0.0)
+    assert last.stages["signal"] >= 0.02
+    assert last.stages["fetch"] == 0.0
+    assert [s.processed for s in snaps] == sorted(s.processed for s in snaps)
+
+
+def test_console_progress():
+    out = io.StringIO()
+    with Telemetry(4, sinks=[ConsoleProgress(stream=out)], interval=60) as t:
+        t.advance(2)
+    assert "2/4" in out.getvalue()
+
+
+def test_format_progress():
+    snap = ProgressSnapshot(100, 25, 5.0, 5.0, 15.0, {})
+    assert format_progress(snap, "run", width=4) == (
+        "run [#...] 25/100 (25%) 5 bars/s ETA 15s"
+    )
+
+
+def test_trader_reports_stage_times():
+    trader = _trader(None)
+    with Telemetry(len(trader.clock)) as t:
+        trader.run(_price_action(), telemetry=t)
+    assert t.processed == len(trader.clock)
+    assert t.stages["fetch"] == 0.0  # the caller's stage
+    assert all(t.stages[s] > 0 for s in STAGES if s != "fetch"), t.stages
+    assert t.stages["signal"] > t.stages["compile"]
@@ -0,0 +1,126 @@
+# pylint: disable=C0103,W0614,W0401
+import numpy as np
+import pytest
+from datetime import datetime
+
+from tests import *
+from src.backtests.core import SyntheticClient
+from src.backtests.strategies import Method, MethodWeighted, Trigger, Col, Sma, CrossUp
+from src.backtests.trader import (
+    Trader,
+    CheckpointPolicy,
+    ExecutionModel,
+    Commission,
+    RandomSlippage,
+    IntrabarFill,
+)
+from src.backtests.exceptions import CheckpointError, InvalidExecutionModelError
+
+_range = {"start": datetime(2024, 1, 2), "end": datetime(2024, 3, 1)}
+
+
+def _trader(path, fill_at: str = "close", threshold: float = 0.5) -> Trader:
+    t = Trader(
+        "SPY",
+        **_range,
+        interval="30m",
+        threshold=threshold,
+        execution=ExecutionModel(
+            Commission(1.0, 0.001), RandomSlippage(0.001), fill_at
+        ),
+        seed=7,
+        checkpoint=CheckpointPolicy(path, every_bars=37) if path else None,
+    )
+    m = Method("SPY", timed=False, conditioned=True)
+    m.register_trigger(Trigger(2, Col("Close") > Sma(20)))
+    m.register_trigger(Trigger(1, CrossUp(Sma(5), Sma(20))))
+    t.register(MethodWeighted(m, 1))
+    return t
+
+
+def _price_action():
+    return SyntheticClient(seed=1).get_price_action("SPY", **_range, interval="30m")
+
+
+tcs_resume = TestCases(
+    "test_resume",
+    [
+        TestCase(fill_at=f, stop=s)
+        for f in ["close", "next_open"]
+        for s in [1, 100, 337]
+    ],
+)
+
+
+@pytest.mark.parametrize("tc", tcs_resume, ids=tids(tcs_resume))
+def test_resume(tc: TestCasesIter, tmp_path):
+    meta = tc.case.meta
+    pa = _price_action()
+    full_trader = _trader(tmp_path / "full.npz", meta["fill_at"])
+    full = full_trader.run(pa)
+    assert not np.isnan(full.to_numpy()).any()
+
+    path = tmp_path / "run.npz"
+    part = _trader(path, meta["fill_at"]).run(pa, max_bars=meta["stop"])
+    assert len(part) == meta["stop"]
+    trader = _trader(path, meta["fill_at"])
+    resumed = trader.run(pa, resume=True)
+    assert np.array_equal(resumed.to_numpy(), full.to_numpy())
+    assert resumed.index.equals(full.index)
+    # the bars before the resume keep their positions
+    assert meta["stop"] == 1 or full_trader.positions[: meta["stop"]].any()
+    np.testing.assert_array_equal(trader.positions, full_trader.positions)
+    assert trader.fills == full_trader.fills
+
+
+def test_trades():
+    pa = _price_action()
+    t = _trader(None, threshold=0.6)
+    equity = t.run(pa)
+    assert len(equity) == len(pa.data)
+    assert equity.iat[0] == 1000.0
+    assert equity.nunique() > 1
+
+
+def test_rerun():
+    """A second run on the same trader starts over, and doesn't overwrite the
+    equity returned by the first one
+    """
+    pa = _price_action()
+    trader = _trader(None, "next_open")
+    first = trader.run(pa)
+    before = first.to_numpy().copy()
+    assert first.iloc[0] == trader.cash
+    second = trader.run(pa)
+    np.testing.assert_array_equal(first.to_numpy(), before)
+    np.testing.assert_array_equal(second.to_numpy(), before)
+    np.testing.assert_array_equal(_trader(None, "next_open").run(pa), before)
+
+
+def test_max_bars():
+    pa = _price_action()
+    assert len(_trader(None).run(pa, max_bars=1)) == 1
+    for n in (0, -1):
+        with pytest.raises(ValueError):
+            _trader(None).run(pa, max_bars=n)
+
+
+def test_intrabar_is_rejected():
+    model = ExecutionModel(intrabar=IntrabarFill(lambda s, e: None))
+    with pytest.raises(InvalidExecutionModelError):
+        Trader("SPY", **_range, interval="30m", execution=model)
+
+
+def test_resume_other_run(tmp_path):
+    pa = _price_action()
+    path = tmp_path / "run.npz"
+    _trader(path).run(pa, max_bars=50)
+    with pytest.raises(CheckpointError):
+        _trader(path, threshold=0.9).run(pa, resume=True)
+
+
+def test_policy():
+    with pytest.raises(CheckpointError):
+        CheckpointPolicy("x.npz")
+    with pytest.raises(CheckpointError):
+        CheckpointPolicy("x.npz", every_bars=0)
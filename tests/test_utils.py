@@ -1,9 +1,18 @@
 # pylint: disable=C0103,W0614,W0401
+import numpy as np
 import pytest
 from datetime import timedelta, datetime
 
 from tests import *
 from src.backtests.utils import parse_interval, td_to_str, discard_datetime_by_interval
+from src.backtests.utils import (
+    NS_MINUTE,
+    align_ns,
+    discard_ns_by_interval,
+    floor_ns,
+    ns_to_index,
+    to_ns,
+)
 
 
 _exc_msg_1 = "Allowed formats must have one of these units included: w,d,h,m,s"
@@ -98,3 +107,40 @@ tcs_discard_datetime_by_interval = TestCases(
 )
 def test_discard_datetime_by_interval(tc: TestCasesIter):
     tc.case.run_test(discard_datetime_by_interval)
+
+
+@pytest.mark.parametrize(
+    "tc", tcs_discard_datetime_by_interval, ids=tids(tcs_discard_datetime_by_interval)
+)
+def test_discard_ns_by_interval(tc: TestCasesIter):
+    """The vectorized version must match ``discard_datetime_by_interval``"""
+
+    def discard(dt: datetime, i: timedelta) -> datetime:
+        ns = discard_ns_by_interval(np.array([to_ns(dt)] * 3), i)
+        assert (ns == ns[0]).all()
+        return ns_to_index(ns)[0].to_pydatetime()
+
+    tc.case.run_test(discard)
+
+
+tcs_align_ns = TestCases(
+    "align_ns",
+    [
+        TestCase(index=[10, 20, 30], targets=[20, 30, 10], result=[1, 2, 0]),
+        TestCase(index=[30, 10, 20], targets=[10, 15, 40], result=[1, -1, -1]),
+        TestCase(index=[], targets=[1, 2], result=[-1, -1]),
+    ],
+)
+
+
+@pytest.mark.parametrize("tc", tcs_align_ns, ids=tids(tcs_align_ns))
+def test_align_ns(tc: TestCasesIter):
+    tc.case.run_test(lambda index, targets: align_ns(index, targets).tolist())
+
+
+def test_floor_ns():
+    ns = np.array([-7, -5, 0, 4, 5, 9]) * NS_MINUTE
+    step = 5 * NS_MINUTE
+    assert (floor_ns(ns, step) // NS_MINUTE).tolist() == [-10, -5, 0, 0, 5, 5]
+    shifted = floor_ns(ns, step, origin=NS_MINUTE) // NS_MINUTE
+    assert shifted.tolist() == [-9, -9, -4, 1, 1, 6]
@@ -11,3 +11,26 @@ def get_datetime(s: str, fmt: str, tz: Optional[ZoneInfo] = None) -> datetime:
     if tz:
         d = d.replace(tzinfo=tz)
     return d
+
+
+def get_price_action(
+    close: list[float], ticker: str = "TEST", open_: Optional[list[float]] = None
+):
+    """Build an offline ``PriceAction`` out of a list of close prices (daily bars)
+    and optionally, open prices
+    """
+    # pylint: disable=C0415
+    import pandas as pd
+    from src.backtests.core import PriceAction
+
+    idx = pd.date_range("2025-01-01", periods=len(close), freq="D")
+    data = pd.DataFrame({"Close": close}, index=idx, dtype="float64")
+    if open_ is not None:
+        data.insert(0, "Open", open_)
+    return PriceAction(
+        ticker=ticker,
+        data=data,
+        start=idx[0].to_pydatetime(),
+        end=idx[-1].to_pydatetime(),
+        chunk=None,
+    )